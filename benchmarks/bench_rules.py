@@ -0,0 +1,285 @@
+"""
+Benchmarks for the rules hot paths.
+
+Run from the repository root:
+
+    python benchmarks/bench_rules.py                       # print results
+    python benchmarks/bench_rules.py --save baseline.json  # record a baseline
+    python benchmarks/bench_rules.py --compare baseline.json --threshold 0.15
+
+With --compare, any benchmark whose ops/sec fell by more than the threshold
+is reported as a regression and the script exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bitboard import BitBoard
+from board import Board
+from color import Color
+from decision_service import LinearModel
+from decision_service import np
+from decision_service import play_batched
+from dice import DiceSet
+from dice import game_rng
+from player import Player
+from qwixx_sim import QwixxSim
+from replay import ReplayWriter
+from row import Row
+from square import Square
+from strategies import greedy_strategy
+
+
+def played_board(board_type):
+    """
+    Returns a board part way through a game, so benchmarks see realistic state.
+    """
+    board = board_type(set())
+    for (r, c) in [(0, 1), (0, 3), (1, 0), (1, 4), (2, 2), (3, 5), (3, 6)]:
+        board.mark(r, c)
+    return board
+
+def bench_board_valid(board_type):
+    def setup(number):
+        board = played_board(board_type)
+        return lambda: board.valid((Color.NO_COLOR, 8), 1, 6, True)
+    return setup
+
+def bench_board_placements(board_type):
+    def setup(number):
+        board = played_board(board_type)
+        return lambda: board.placements((Color.NO_COLOR, 8), True)
+    return setup
+
+def bench_valid_placements(board_type):
+    def setup(number):
+        player = Player("bench", played_board(board_type))
+        dice = DiceSet(game_rng(0))
+        dice.throw()
+        return lambda: player.valid_placements(dice, False)
+    return setup
+
+def bench_board_score(board_type):
+    def setup(number):
+        board = played_board(board_type)
+        return board.score
+    return setup
+
+def bench_row_mark(number):
+    # Each call marks the next square of a fresh row, so every call succeeds.
+    n_rows = number // 10 + 1
+    rows = [Row([Square(Color.RED, v) for v in range(2, 13)], set()) for _ in range(n_rows)]
+    calls = iter([(row, col) for row in rows for col in range(10)])
+    def op():
+        row, col = next(calls)
+        row.mark(col)
+    return op
+
+def bench_row_score(number):
+    row = Row([Square(Color.RED, v) for v in range(2, 13)], set())
+    for col in [0, 2, 3, 7]:
+        row.mark(col)
+    return row.score
+
+def bench_dice_roll(number):
+    dice = DiceSet(game_rng(0))
+    return dice.roll
+
+def bench_game(board_type):
+    def setup(number):
+        games = iter(range(number))
+        def op():
+            game = QwixxSim(["a", "b"], [greedy_strategy, greedy_strategy],
+                            board_type, game_rng(0, next(games)))
+            game.play_game()
+        return op
+    return setup
+
+def bench_logged_game(board_type):
+    # Same games as bench_game, streaming a replay log to the null device.
+    def setup(number):
+        games = iter(range(number))
+        log = ReplayWriter(os.devnull)
+        def op():
+            game = QwixxSim(["a", "b"], [greedy_strategy, greedy_strategy],
+                            board_type, game_rng(0, next(games)), log=log)
+            game.play_game()
+        return op
+    return setup
+
+def bench_linear_game(board_type):
+    def setup(number):
+        games = iter(range(number))
+        model = LinearModel()
+        def op():
+            game = QwixxSim(["a", "b"], [model, model], board_type, game_rng(0, next(games)))
+            game.play_game()
+        return op
+    return setup
+
+def bench_batched_games(board_type, n_games):
+    # Same decisions as bench_linear_game, made for n_games games at a time.
+    def setup(number):
+        games = iter(range(number * n_games))
+        model = LinearModel()
+        def op():
+            play_batched([QwixxSim(["a", "b"], [model, model], board_type,
+                                   game_rng(0, next(games))) for _ in range(n_games)], model)
+        return op
+    return setup
+
+BENCHMARKS = {
+    "Board.valid": bench_board_valid(Board),
+    "Board.placements": bench_board_placements(Board),
+    "Player.valid_placements": bench_valid_placements(Board),
+    "Row.mark": bench_row_mark,
+    "Row.score": bench_row_score,
+    "Board.score": bench_board_score(Board),
+    "DiceSet.roll": bench_dice_roll,
+    "game (Board)": bench_game(Board),
+    "BitBoard.valid": bench_board_valid(BitBoard),
+    "BitBoard.placements": bench_board_placements(BitBoard),
+    "Player.valid_placements (BitBoard)": bench_valid_placements(BitBoard),
+    "BitBoard.score": bench_board_score(BitBoard),
+    "game (BitBoard)": bench_game(BitBoard),
+    "game (BitBoard, logged)": bench_logged_game(BitBoard),
+    "game (BitBoard, linear)": bench_linear_game(BitBoard),
+}
+if np is not None:
+    BENCHMARKS["256 games (BitBoard, linear, batched)"] = bench_batched_games(BitBoard, 256)
+
+
+def time_calls(setup, number):
+    """
+    Times `number` calls of the operation built by `setup`.
+
+    Returns:
+    float: Elapsed seconds.
+    """
+    op = setup(number)
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return time.perf_counter() - start
+
+def measure(setup, min_time=0.2, repeat=3):
+    """
+    Measures throughput and memory use of one benchmark.
+
+    The call count grows tenfold until one run takes at least `min_time`
+    seconds, then the best of `repeat` runs is kept. Memory is the traced
+    peak of a single call, after a warm-up call.
+
+    Returns:
+    dict: "ops_per_sec" and "peak_alloc_bytes".
+    """
+    number = 1
+    while time_calls(setup, number) < min_time:
+        number *= 10
+    best = min(time_calls(setup, number) for _ in range(repeat))
+
+    op = setup(2)
+    op()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"ops_per_sec": number / best, "peak_alloc_bytes": max(0, peak - before)}
+
+def run(names=None, min_time=0.2):
+    """
+    Runs the selected benchmarks.
+
+    Parameters:
+    names (list of str): Benchmarks to run. Default is all of them.
+    min_time (float): Minimum seconds per timed run.
+
+    Returns:
+    dict: Results keyed by benchmark name.
+    """
+    names = names or list(BENCHMARKS)
+    return {name: measure(BENCHMARKS[name], min_time) for name in names}
+
+def compare(results, baseline, threshold):
+    """
+    Finds benchmarks that got slower than the baseline by more than `threshold`.
+
+    Parameters:
+    results (dict): Current results from `run`.
+    baseline (dict): Earlier results from `run`.
+    threshold (float): Allowed fractional drop in ops/sec, such as 0.15.
+
+    Returns:
+    list of tuple: (name, baseline ops/sec, current ops/sec) for each regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["ops_per_sec"]
+        new = current["ops_per_sec"]
+        if new < old * (1 - threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+def report(results, baseline=None):
+    """
+    Formats results as a table, with the change against a baseline if given.
+
+    Returns:
+    str: The formatted table.
+    """
+    width = max(len(name) for name in results)
+    lines = [f"{'benchmark'.ljust(width)}  {'ops/sec':>14}  {'peak bytes':>10}  {'change':>8}"]
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline:
+            change = f"{result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:+.1%}"
+        lines.append(f"{name.ljust(width)}  {result['ops_per_sec']:>14,.0f}  "
+                     f"{result['peak_alloc_bytes']:>10}  {change:>8}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Qwixx rules hot paths.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--save", metavar="PATH", help="write results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fractional ops/sec drop that counts as a regression")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds per timed run")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}; choose from {list(BENCHMARKS)}")
+
+    results = run(args.benchmarks, args.min_time)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print(report(results, baseline))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "results": results}, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old:,.0f} -> {new:,.0f} ops/sec")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,39 @@
+from board import Board
+
+class BitBoard(Board):
+    """
+    The bitmask Qwixx board. `board.Board` keeps each row as an integer bitmask
+    together with the index of its rightmost mark and its mark count, so BitBoard
+    shares all of its rules, scoring, make/unmake, encoding and hashing, and only
+    adds views of the row state as one list per field.
+
+    Attributes:
+        masks (list of int): Bit `i` of `masks[r]` is set if square `i` of row `r` is marked.
+        rightmost (list of int): Index of the rightmost mark in each row, or -1 if unmarked.
+        counts (list of int): Number of marks in each row.
+    """
+    __slots__ = ()
+
+    @property
+    def masks(self):
+        return [row.mask for row in self.rows]
+
+    @property
+    def rightmost(self):
+        return [row.rightmost for row in self.rows]
+
+    @property
+    def counts(self):
+        return [row.n_marked for row in self.rows]
+
+    def what_is_locked(self, row_index):
+        """
+        Returns the color that is locked by a row, if any.
+
+        Parameters:
+        row_index (int): Index of the row to check.
+
+        Returns:
+        Color or None: The color that is locked or None if no color is locked.
+        """
+        return self.rows[row_index].what_is_locked()
@@ -1,11 +1,14 @@
 from row import Row
-from square import Square
 from color import Color
 from utils import A1_to_coord
 from utils import coord_to_A1
 from utils import valid_A1
+from layout import standard_layout
+from zobrist import PENALTY_KEYS
+from zobrist import lock_hash
 from enum import Enum
 import shutil
+import struct
 from utils import ansi_center
 
 class BoardState(Enum):
@@ -23,7 +26,8 @@ class BoardState(Enum):
 
 class Board:
     """
-    Represents a Qwixx board for one player. Contains many Squares.
+    Represents a Qwixx board for one player. Contains four Rows, which share
+    their colors, values and scoring with the board's layout.
     
     Attributes:
         rows (list of Row): A list of rows, each containing squares of different colors.
@@ -32,7 +36,26 @@ class Board:
         MAX_PENALTIES (int): Maximum number of penalties allowed.
         MAX_LOCK (int): Maximum number of locked rows allowed.
         locked_colors (set of Color): Colors that are locked for marking on the board.
+        layout (BoardLayout): The shared arrangement of colors and values on the board.
+        current_score (int): The board's score, kept up to date by `add_penalty` and by
+            the rows, which report every change to their marks.
+        history (list of int): Undo records for `make_mark`, `make_penalty` and `make_lock`.
+        zobrist (int): The Zobrist key of the penalty count, kept up to date by
+            `add_penalty`; the rows keep their own. See `zobrist_hash`.
     """
+    # Undo records for make/unmake are single ints: the kind in the low two
+    # bits, then the row, then the column and the previous rightmost mark.
+    _UNDO_MARK = 0
+    _UNDO_PENALTY = 1
+    _UNDO_LOCK = 2
+    _UNDO_NOTHING = 3
+
+    # Encoded form: one 16-bit mark mask per row, then the penalty count
+    _STATE = struct.Struct("<4HB")
+
+    __slots__ = ("rows", "penalty_val", "penalties", "MAX_PENALTIES", "MAX_LOCK",
+                 "locked_colors", "layout", "current_score", "history", "zobrist")
+
     def __init__(self, locked_colors):
         """
         Initializes a Qwixx board with default rows and settings.
@@ -41,18 +64,12 @@ class Board:
         locked_colors (set of Color): Colors that are initially locked on the board.
         """
         lc = locked_colors
-        # Generate rows of Squares
-        red_row =    Row([Square(Color.RED,    dice_val) 
-                          for dice_val in range(2, 13)], lc)
-        yellow_row = Row([Square(Color.YELLOW, dice_val) 
-                          for dice_val in range(2, 13)], lc)
-        green_row =  Row([Square(Color.GREEN,  dice_val) 
-                          for dice_val in range(12, 1, -1)], lc)
-        blue_row =   Row([Square(Color.BLUE,   dice_val) 
-                          for dice_val in range(12, 1, -1)], lc)
-
-        # Stack rows, save as self.rows
-        self.rows = [red_row, yellow_row, green_row, blue_row]
+        self.layout = standard_layout()
+        # Generate rows from the shared layout
+        self.rows = [Row.from_layout(self.layout, row_index, lc)
+                     for row_index in range(self.layout.n_rows())]
+        for row in self.rows:
+            row.board = self
         self.penalty_val = 5
         self.penalties = 0
 
@@ -60,6 +77,9 @@ class Board:
         self.MAX_LOCK = 1
 
         self.locked_colors = locked_colors
+        self.current_score = 0
+        self.history = []
+        self.zobrist = 0
     
     
     def term_rep(self, sq_width=6):
@@ -105,12 +125,79 @@ class Board:
         Returns:
             bool: True if the maximum number of penalties has been surpassed, False otherwise.
         """
+        self.zobrist ^= PENALTY_KEYS[self.penalties] ^ PENALTY_KEYS[self.penalties + 1]
         self.penalties += 1
+        self.current_score -= self.penalty_val
         return self.penalties > self.MAX_PENALTIES
     
-    # TODO
     def __str__(self):
-        return 0 
+        """
+        Returns a plain text representation of the board, one row per line.
+
+        Returns:
+        str: A string representation of the board.
+        """
+        lines = [chr(65 + row_index) + " " + str(row)
+                 for row_index, row in enumerate(self.rows)]
+        lines.append(f"Penalties: {self.penalties}")
+        return "\n".join(lines)
+
+    def row_score(self, row_index):
+        """
+        Calculates the current score of one row, including the locking bonus.
+
+        Parameters:
+        row_index (int): Index of the row to score.
+
+        Returns:
+        int: The current score of the row.
+        """
+        return self.rows[row_index].score()
+
+    def encode(self):
+        """
+        Encodes the board's marks and penalties as 9 bytes: one 16-bit mask per
+        row, then the penalty count. Locked colors belong to the game and are not included.
+
+        Returns:
+        bytes: The encoded board.
+        """
+        return self._STATE.pack(*[row.mask for row in self.rows], self.penalties)
+
+    def load(self, data):
+        """
+        Replaces the board's marks and penalties with ones saved by `encode`.
+
+        Parameters:
+        data (bytes): An encoded board.
+
+        Returns:
+        Board: This board.
+        """
+        *masks, penalties = self._STATE.unpack(data)
+        self.current_score += (self.penalties - penalties) * self.penalty_val
+        self.penalties = penalties
+        # Each row adds the change of its score
+        for row, mask in zip(self.rows, masks):
+            row.load_mask(mask)
+        self.zobrist = PENALTY_KEYS[self.penalties]
+        self.history = []
+        return self
+
+    @classmethod
+    def decode(cls, data, locked_colors):
+        """
+        Creates a board from bytes saved by `encode`.
+
+        Parameters:
+        data (bytes): An encoded board.
+        locked_colors (set of Color): Colors that are locked on the board.
+
+        Returns:
+        Board: The decoded board.
+        """
+        return cls(locked_colors).load(data)
+
     
     def __iter__(self):
         """
@@ -151,7 +238,157 @@ class Board:
         bool: True if marking was successful, False otherwise.
         """
         return self.rows[row_index].mark(col_index)
+
+    def make_mark(self, row_index, col_index):
+        """
+        Marks a square, as `mark` does, and records how to undo it with `unmake`.
+        Lock events fire as usual; use `make_lock` to lock the color in place.
+
+        Parameters:
+        row_index (int): Index of the row containing the square to mark.
+        col_index (int): Index of the square to mark within the row.
+
+        Returns:
+        bool: True if marking was successful, False otherwise. Nothing is recorded on failure.
+        """
+        previous = self.last_marked(row_index)
+        if not self.mark(row_index, col_index):
+            return False
+        self.history.append(self._UNDO_MARK | row_index << 2 | col_index << 6
+                            | (previous + 1) << 10)
+        return True
+
+    def make_penalty(self):
+        """
+        Adds a penalty, as `add_penalty` does, and records how to undo it with `unmake`.
+
+        Returns:
+            bool: True if the maximum number of penalties has been surpassed, False otherwise.
+        """
+        self.history.append(self._UNDO_PENALTY)
+        return self.add_penalty()
+
+    def make_lock(self, color):
+        """
+        Locks a color, as `color_lock` does, and records how to undo it with `unmake`.
+        The locked colors set is shared between boards, so the undo reaches them too.
+
+        Parameters:
+        color (Color): The color to lock.
+
+        Returns:
+        bool: True if the color was newly locked, False if it was already locked.
+        """
+        if color in self.locked_colors:
+            self.history.append(self._UNDO_NOTHING)
+            return False
+        self.history.append(self._UNDO_LOCK | self.layout.rows_by_color[color] << 2)
+        self.color_lock(color)
+        return True
+
+    def unmake(self):
+        """
+        Restores the board to its state before the most recent `make_mark`,
+        `make_penalty` or `make_lock`.
+        """
+        record = self.history.pop()
+        kind = record & 3
+        if kind == self._UNDO_MARK:
+            row_index = (record >> 2) & 15
+            col_index = (record >> 6) & 15
+            self._unmark(row_index, col_index, (record >> 10) - 1)
+        elif kind == self._UNDO_PENALTY:
+            self.zobrist ^= PENALTY_KEYS[self.penalties] ^ PENALTY_KEYS[self.penalties - 1]
+            self.penalties -= 1
+            self.current_score += self.penalty_val
+        elif kind == self._UNDO_LOCK:
+            self.locked_colors.discard(self.layout.colors[(record >> 2) & 15])
+
+    def _unmark(self, row_index, col_index, rightmost):
+        self.rows[row_index].unmark(col_index, rightmost)
+
+    def score_delta(self, row_index, col_index):
+        """
+        Returns how much the score would change by marking a square, without marking it.
+        Does not check that the mark is valid.
+
+        Parameters:
+        row_index (int): Index of the row containing the square.
+        col_index (int): Index of the square within the row.
+
+        Returns:
+        int: The change in score.
+        """
+        row = self.rows[row_index]
+        marks = row.n_marked
+        # Marking the last square also earns the locking bonus
+        gained = 2 if col_index == len(row) - 1 else 1
+        return row.scoring[marks + gained] - row.scoring[marks]
     
+    def zobrist_hash(self):
+        """
+        Returns a 64-bit Zobrist hash of the board: its marks, penalties and locked
+        colors. Equal positions hash equally on `Board` and `BitBoard`.
+
+        Returns:
+        int: The hash.
+        """
+        h = self.zobrist
+        for row in self.rows:
+            h ^= row.zobrist
+        return h ^ lock_hash(self.layout, self.locked_colors)
+
+    def marked(self, row_index, col_index):
+        """
+        Checks if a square is marked.
+
+        Parameters:
+        row_index (int): Index of the row containing the square.
+        col_index (int): Index of the square within the row.
+
+        Returns:
+        bool: True if the square is marked, False otherwise.
+        """
+        return bool((self.rows[row_index].mask >> col_index) & 1)
+
+    def last_marked(self, row_index):
+        """
+        Returns the index of the rightmost marked square in a row.
+
+        Parameters:
+        row_index (int): Index of the row to check.
+
+        Returns:
+        int: The column of the rightmost mark, or -1 if the row is unmarked.
+        """
+        return self.rows[row_index].rightmost
+
+    def n_marked(self, row_index):
+        """
+        Returns the number of marked squares in a row.
+
+        Parameters:
+        row_index (int): Index of the row to check.
+
+        Returns:
+        int: The number of marks in the row.
+        """
+        return self.rows[row_index].n_marked
+
+    def lockable(self, row_index, extra_marks=0):
+        """
+        Checks if a row has enough marks for its last square to be marked.
+
+        Parameters:
+        row_index (int): Index of the row to check.
+        extra_marks (int): Marks to add to the row's current count. Default is 0.
+
+        Returns:
+        bool: True if the row could be locked, False otherwise.
+        """
+        row = self.rows[row_index]
+        return row.n_marked + extra_marks >= row.lock_min
+
     def valid(self, option, row_index, sq_index, white_turn=True):
         """
         Checks if a given option (Color, value) can be played on a specific square on the board.
@@ -166,7 +403,7 @@ class Board:
         bool: True if the option can be played on the square, False otherwise.
         """
         row = self.rows[row_index]
-        square = row[sq_index]
+        square_color = row.colors[sq_index]
         color, value = option
 
         # If white turn, must be white dice
@@ -174,19 +411,22 @@ class Board:
         # If color turn, must be color dice
         if (not white_turn) and (color == Color.NO_COLOR): return False
         # Must be of a compatible color 
-        color_cond     = (Color.compatible(color, square.color))
+        color_cond     = (Color.compatible(color, square_color))
         # Must not be of a locked color
-        not_locked     = (square.color not in self.locked_colors)
+        not_locked     = (square_color not in self.locked_colors)
         # Must share square value
-        value_cond     = (value == square.value)
+        value_cond     = (value == row.values[sq_index])
         # No squares marked here or to the right
-        placement_cond = (True not in [sq.marked for sq in row[sq_index:]])
-        
-        return color_cond and not_locked and value_cond and placement_cond
+        placement_cond = (sq_index > row.rightmost)
+        # Locking requires at least row.lock_min marks, as in Row.mark
+        lock_cond      = (sq_index != len(row) - 1 or row.n_marked >= row.lock_min)
+
+        return color_cond and not_locked and value_cond and placement_cond and lock_cond
     
     def placements(self, option, white_turn=True):
         """
         Finds all valid placements for a given option (Color, value) on the board.
+        Uses the layout's column index, so each row costs one lookup.
 
         Parameters:
         option (tuple): A tuple containing Color and value to check.
@@ -197,27 +437,38 @@ class Board:
         """
         color, value = option
         placements = []
-        for row_index, row in enumerate(self.rows):
-            for col_index, square in enumerate(row):
-                if self.valid(option, row_index, col_index, white_turn):
-                    placements.append((row_index, col_index))
+        # If white turn, must be white dice. If color turn, must be color dice.
+        if white_turn != (color == Color.NO_COLOR):
+            return placements
+        # A colored option can only be placed in the row of its color
+        if white_turn:
+            row_indices = range(len(self.rows))
+        else:
+            row_indices = (self.layout.rows_by_color[color],)
+        for row_index in row_indices:
+            row = self.rows[row_index]
+            if self.layout.colors[row_index] in self.locked_colors:
+                continue
+            col_index = self.layout.columns[row_index].get(value, -1)
+            # Must be right of the rightmost mark
+            if col_index <= row.rightmost:
+                continue
+            # Locking requires at least row.lock_min marks
+            if col_index == len(row) - 1 and row.n_marked < row.lock_min:
+                continue
+            placements.append((row_index, col_index))
         return placements
 
     def score(self):
         """
-        Calculates the current score of the board.
+        Returns the current score of the board. The score is updated as squares are
+        marked, through any of the board, row or square methods, and as penalties are
+        added, so this does not rescan the rows.
 
         Returns:
         int: The current score of the board.
         """
-        score = 0
-        # Score rows
-        for row in self.rows:
-            score += row.score()
-        # Score penalties
-        score -= self.penalties * self.penalty_val
-
-        return score
+        return self.current_score
 
     def get_state(self):
         """
@@ -226,11 +477,10 @@ class Board:
         Returns:
         BoardState: The current state of the board (CONTINUE, LOCKED, or PENALTIES).
         """
-        # Count locked rows
-        colors = [row[-1].color for row in self.rows]
-        N_locked = sum([(color in self.locked_colors) for color in colors])
+        # Only row colors are ever locked, so the set size is the locked row count
+        N_locked = len(self.locked_colors)
 
-        if N_locked > self.MAX_LOCK:             return BoardState.LOCKED
+        if N_locked > self.MAX_LOCK:                return BoardState.LOCKED
         elif self.penalties > self.MAX_PENALTIES:   return BoardState.PENALTIES
         else:                                       return BoardState.CONTINUE
     
@@ -249,6 +499,8 @@ class Board:
     def update_lock(self):
         """
         Updates the set of locked colors based on the current state of each row.
+        Games propagate locks through lock events instead; this polls the rows
+        for boards used outside a game.
 
         Returns:
         set of Color: The updated set of locked colors.
@@ -258,6 +510,17 @@ class Board:
             if locked_color: self.color_lock(locked_color)
         return self.locked_colors
 
+    def set_lock_listener(self, callback):
+        """
+        Registers a callback for lock events. Each row calls it with its color
+        when its last square is marked.
+
+        Parameters:
+        callback (callable): Called with the Color of the row that was locked, or None to stop.
+        """
+        for row in self.rows:
+            row.on_lock = callback
+
     def color_lock(self, color):
         """
         Locks a color for marking on the board.
@@ -7,6 +7,9 @@ class Color(Enum):
     BLUE = 'B'
     NO_COLOR = 'W'
     locked = False
+    # Members are singletons, so identity hashing is safe and skips Enum's
+    # pure-Python __hash__ on every set lookup.
+    __hash__ = object.__hash__
 
     def __str__(self):
         return self.value
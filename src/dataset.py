@@ -0,0 +1,284 @@
+from bitboard import BitBoard
+from layout import standard_layout
+from qwixx_game import PASS_MOVE
+from replay import GameLog
+from replay import replay
+from array import array
+import os
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed to load a dataset back
+    np = None
+
+_ENDIAN = "<" if sys.byteorder == "little" else ">"
+
+# Every column of the dataset, one row per decision, as
+# name -> (.npy dtype description, array typecode, values per row).
+# A typecode of None marks a column collected as raw bytes.
+COLUMNS = {
+    "game": (_ENDIAN + "i8", "q", 1),        # Game index under the master seed
+    "turn": (_ENDIAN + "u4", "I", 1),        # Turn number, from 1
+    "seat": ("|u1", "B", 1),                 # The deciding player's seat
+    "phase": ("|u1", "B", 1),                # qwixx_game.OFFTURN, WHITE or COLOR
+    "locked": ("|u1", "B", 1),               # Locked colors, as a bitmask of rows
+    "score": (_ENDIAN + "i2", "h", 1),       # The deciding player's score before the move
+    "board": (None, None, 1),                # The deciding player's `Board.encode()`
+    "dice": ("|u1", None, 6),                # Die faces, white dice first
+    "action": ("|u1", None, 2),              # (row, col) marked, or `PASS_MOVE`
+    "final_score": (_ENDIAN + "i2", "h", 1), # The deciding player's final score
+    "won": ("|u1", "B", 1),                  # 1 if the deciding player had the top final score
+}
+
+# Room for the .npy magic, version, header length and header dict, padded so the
+# data starts on a 64 byte boundary. Fixed so the header can be rewritten in place.
+_NPY_HEADER_SIZE = 128
+
+
+def _board_descr(n_rows):
+    # A structured dtype matching `Board.encode()`: little-endian row masks, then penalties.
+    return [("masks", "<u2", (n_rows,)), ("penalties", "|u1")]
+
+def _npy_header(descr, shape):
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape})
+    header = header.ljust(_NPY_HEADER_SIZE - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class DatasetWriter:
+    """
+    Writes one row per decision of many games as columnar `.npy` files, one per
+    entry of `COLUMNS`, that NumPy can memory-map back with `Dataset`.
+
+    It takes the same `start_game`/`write` calls as `replay.ReplayWriter`, so it can
+    be passed as `log=` to `QwixxSim`, or fed games read back from a replay log.
+    Games played with the writer as their log collect each row as the decision is
+    made; logged games are replayed on a `BitBoard` to recover the board before
+    every decision. Rows are collected in flat byte buffers and appended to the
+    column files in chunks, so no Python object is kept per row.
+
+    Attributes:
+        directory (str): The folder holding the column files.
+        chunk_rows (int): Rows to collect before appending to the files.
+        rows (int): Number of rows written so far, including buffered ones.
+        games (int): Number of games written so far.
+    """
+    def __init__(self, directory, chunk_rows=1 << 16, layout=None):
+        """
+        Creates the column files, replacing any in `directory`.
+
+        Parameters:
+        directory (str): The folder for the column files. Created if missing.
+        chunk_rows (int): Rows to collect before appending to the files. Default is 65536.
+        layout (BoardLayout): The layout of the boards. Default is `standard_layout()`.
+        """
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.games = 0
+        self._written = 0
+        layout = layout if layout is not None else standard_layout()
+        self._descrs = {name: descr if descr is not None else _board_descr(layout.n_rows())
+                        for name, (descr, typecode, width) in COLUMNS.items()}
+        self._widths = {name: width for name, (descr, typecode, width) in COLUMNS.items()}
+        self._buffers = {name: array(typecode) if typecode else bytearray()
+                         for name, (descr, typecode, width) in COLUMNS.items()}
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        for name in COLUMNS:
+            f = open(os.path.join(directory, name + ".npy"), "wb")
+            f.write(self._header(name))
+            self._files[name] = f
+
+    def _header(self, name):
+        shape = (self._written,) if self._widths[name] == 1 else (self._written, self._widths[name])
+        return _npy_header(self._descrs[name], shape)
+
+    def start_game(self, seed, game_index, names, order):
+        """
+        Begins the record of a game. See `replay.ReplayWriter.start_game`.
+
+        Returns:
+        GameLog: The empty record, which collects a row for each decision as the game
+            fills it in, to pass to `write`.
+        """
+        return _GameRows(seed, game_index, names, order)
+
+    def write(self, game_log):
+        """
+        Adds a row for each decision of a finished game.
+
+        Parameters:
+        game_log (GameLog): The game to add. A game played with this writer as its
+            log has its rows already; any other is replayed to collect them.
+        """
+        if not isinstance(game_log, _GameRows):
+            rows = _GameRows(game_log.seed, game_log.game_index, game_log.names,
+                             game_log.order)
+            result = replay(game_log, BitBoard, rows.observe)
+            rows.scores = result.scores
+            game_log = rows
+
+        buffers = self._buffers
+        for name, buffer in game_log.buffers.items():
+            buffers[name] += buffer
+        scores = game_log.scores
+        top = max(scores)
+        buffers["final_score"].extend([scores[seat] for seat in game_log.seats])
+        buffers["won"].extend([scores[seat] == top for seat in game_log.seats])
+
+        self.rows += len(game_log.seats)
+        self.games += 1
+        if self.rows - self._written >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the buffered rows to the column files and updates their headers.
+        """
+        self._written = self.rows
+        for name, f in self._files.items():
+            buffer = self._buffers[name]
+            f.write(buffer)
+            del buffer[:]
+            f.seek(0)
+            f.write(self._header(name))
+            f.seek(0, os.SEEK_END)
+            f.flush()
+
+    def close(self):
+        """
+        Writes any buffered rows and closes the column files.
+        """
+        if self._files:
+            self.flush()
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _GameRows(GameLog):
+    """
+    The record of a game that also collects the dataset row of each decision,
+    apart from the final result, as the decision is made.
+
+    Attributes:
+        buffers (dict: str -> array or bytearray): The columns collected so far.
+        seats (list of int): The deciding seat of each row.
+    """
+    # Columns known only once the game is over
+    _RESULT_COLUMNS = ("final_score", "won")
+
+    def __init__(self, seed, game_index, names, order):
+        super().__init__(seed, game_index, names, order)
+        self.buffers = {name: array(typecode) if typecode else bytearray()
+                        for name, (descr, typecode, width) in COLUMNS.items()
+                        if name not in self._RESULT_COLUMNS}
+        self.seats = []
+
+    def add_decision(self, game, player, phase, move):
+        """
+        Records a decision, and its row, before it is applied.
+        """
+        super().add_decision(game, player, phase, move)
+        self.observe(game, player, phase, move)
+
+    def observe(self, game, player, phase, move):
+        """
+        Collects the row of a decision from the game before the move is applied.
+
+        Parameters:
+        game (QwixxGame): The game being played.
+        player (Player): The player deciding.
+        phase (int): `qwixx_game.OFFTURN`, `WHITE` or `COLOR`.
+        move (tuple): The (row, col) to mark, or None for a pass.
+        """
+        buffers = self.buffers
+        board = player.board
+        locked = 0
+        for row_index, color in enumerate(board.layout.colors):
+            if color in game.locked_colors:
+                locked |= 1 << row_index
+        seat = game.seats[player]
+        self.seats.append(seat)
+        buffers["game"].append(self.game_index)
+        buffers["turn"].append(game.turn)
+        buffers["seat"].append(seat)
+        buffers["phase"].append(phase)
+        buffers["locked"].append(locked)
+        buffers["score"].append(board.score())
+        buffers["board"] += board.encode()
+        buffers["dice"] += bytes([die.last_roll for die in game.dice.dice])
+        buffers["action"] += bytes(move or PASS_MOVE)
+
+
+def export(games, directory, chunk_rows=1 << 16):
+    """
+    Writes a dataset from logged games, such as those from `replay.read_games`.
+
+    Parameters:
+    games (iterable of GameLog): The games to export.
+    directory (str): The folder for the column files.
+    chunk_rows (int): Rows to collect before appending to the files. Default is 65536.
+
+    Returns:
+    int: Number of rows written.
+    """
+    with DatasetWriter(directory, chunk_rows) as writer:
+        for game_log in games:
+            writer.write(game_log)
+    return writer.rows
+
+
+class Dataset:
+    """
+    A dataset written by `DatasetWriter`, with each column memory-mapped on first use.
+
+    Columns are NumPy arrays with one row per decision; see `COLUMNS`. The "board"
+    column is structured, with fields "masks" and "penalties".
+    """
+    def __init__(self, directory):
+        """
+        Opens a dataset. No column is read until it is used.
+
+        Parameters:
+        directory (str): The folder holding the column files.
+        """
+        if np is None:
+            raise ImportError("Dataset requires NumPy.")
+        self.directory = directory
+        self._columns = {}
+
+    def __getitem__(self, name):
+        """
+        Returns a column, memory-mapping it on first use.
+
+        Parameters:
+        name (str): A name from `COLUMNS`.
+
+        Returns:
+        numpy.memmap: The read-only column.
+        """
+        if name not in COLUMNS:
+            raise KeyError(name)
+        if name not in self._columns:
+            path = os.path.join(self.directory, name + ".npy")
+            self._columns[name] = np.load(path, mmap_mode="r")
+        return self._columns[name]
+
+    def __len__(self):
+        """
+        Returns the number of rows.
+
+        Returns:
+        int: The number of decisions in the dataset.
+        """
+        return self["game"].shape[0]
@@ -0,0 +1,255 @@
+from layout import standard_layout
+from itertools import chain
+import asyncio
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batched evaluation
+    np = None
+
+# Default weights of LinearModel's features: points gained, squares skipped,
+# whether the move locks its row, and whether passing takes a penalty.
+DEFAULT_WEIGHTS = (1.0, -1.5, 0.0, -5.0)
+
+
+class LinearModel:
+    """
+    Values each candidate move as a weighted sum of a few board features, and picks
+    the best one, or passes if passing is worth more.
+
+    Features of marking (row, col):
+        gain: Points the mark earns, including the locking bonus.
+        skipped: Unmarked squares left behind to the left of the mark.
+        lock: 1 if the mark is the row's last square, else 0.
+    Passing has only the feature penalty: 1 if it is the active player's color
+    decision after passing on the white roll, else 0.
+
+    A model is a strategy (see `strategies`), deciding one move at a time in plain
+    Python. `evaluate` makes the same decisions for a whole batch in one NumPy pass.
+
+    Attributes:
+        weights (tuple of float): The weights of gain, skipped, lock and penalty.
+        layout (BoardLayout): The layout of the boards being evaluated.
+    """
+    def __init__(self, weights=DEFAULT_WEIGHTS, layout=None):
+        """
+        Initializes a model.
+
+        Parameters:
+        weights (tuple of float): The weights of gain, skipped, lock and penalty.
+            Default is `DEFAULT_WEIGHTS`.
+        layout (BoardLayout): The layout of the boards. Default is `standard_layout()`.
+        """
+        self.weights = tuple(weights)
+        self.layout = layout if layout is not None else standard_layout()
+        self._tables = None
+
+    def value(self, gain, skipped, lock, penalty):
+        """
+        Returns the value of a move from its features.
+
+        Returns:
+        float: The weighted sum of the features.
+        """
+        w_gain, w_skipped, w_lock, w_penalty = self.weights
+        return gain * w_gain + skipped * w_skipped + lock * w_lock + penalty * w_penalty
+
+    def __call__(self, game, player, placements, white_turn):
+        """
+        Decides one move, as a strategy.
+
+        Returns:
+        tuple or None: The chosen placement, or None to pass.
+        """
+        board = player.board
+        penalty = int(not white_turn and game.active_player is player and game.white_passed)
+        best, best_value = None, self.value(0, 0, 0, penalty)
+        for (row_index, col_index) in placements:
+            lock = int(col_index == len(self.layout.values[row_index]) - 1)
+            value = self.value(board.score_delta(row_index, col_index),
+                               col_index - board.last_marked(row_index) - 1, lock, 0)
+            if value > best_value:
+                best, best_value = (row_index, col_index), value
+        return best
+
+    def _lookup_tables(self):
+        # Built on first use: the scoring table, each row's last column, and the
+        # mark count and rightmost mark of every possible row mask.
+        if self._tables is None:
+            width = max(len(values) for values in self.layout.values)
+            masks = range(1 << width)
+            self._tables = (
+                np.array(self.layout.scoring, dtype=np.int64),
+                np.array([len(values) - 1 for values in self.layout.values], dtype=np.intp),
+                np.array([bin(mask).count("1") for mask in masks], dtype=np.intp),
+                np.array([mask.bit_length() - 1 for mask in masks], dtype=np.intp),
+            )
+        return self._tables
+
+    def evaluate(self, requests):
+        """
+        Decides a batch of moves at once. Gives the same answers as calling the
+        model on each request, but the features and values of every candidate in
+        the batch are computed in a single vectorized pass.
+
+        Parameters:
+        requests (list of tuple): (game, player, placements, white_turn) for each decision.
+
+        Returns:
+        list: The chosen placement, or None to pass, for each request.
+        """
+        if np is None:
+            raise ImportError("LinearModel.evaluate requires NumPy.")
+        n_requests = len(requests)
+        if n_requests == 0:
+            return []
+        scoring, last_col, popcount, highest = self._lookup_tables()
+        w_gain, w_skipped, w_lock, w_penalty = self.weights
+
+        # Each board's row masks, from the boards' compact encoding
+        n_rows = self.layout.n_rows()
+        encoded = b"".join([player.board.encode() for game, player, placements, white_turn
+                            in requests])
+        board_dtype = np.dtype([("masks", "<u2", (n_rows,)), ("penalties", "u1")])
+        masks = np.frombuffer(encoded, dtype=board_dtype)["masks"].astype(np.intp)
+
+        penalty = np.array([not white_turn and game.active_player is player and game.white_passed
+                            for game, player, placements, white_turn in requests], dtype=np.int64)
+        pass_values = penalty * w_penalty
+
+        sizes = np.array([len(placements) for game, player, placements, white_turn in requests],
+                         dtype=np.intp)
+        candidates = list(chain.from_iterable(placements for game, player, placements, white_turn
+                                              in requests))
+        moves = [None] * n_requests
+        if not candidates:
+            return moves
+        rows, cols = np.array(candidates, dtype=np.intp).T
+        owner = np.repeat(np.arange(n_requests), sizes)
+
+        # Features and values of every candidate
+        marks = popcount[masks[owner, rows]]
+        lock = (cols == last_col[rows]).astype(np.int64)
+        gain = scoring[marks + 1 + lock] - scoring[marks]
+        skipped = cols - highest[masks[owner, rows]] - 1
+        values = gain * w_gain + skipped * w_skipped + lock * w_lock + 0 * w_penalty
+
+        # The first best candidate of each request, if it beats passing
+        has_candidates = sizes > 0
+        starts = np.cumsum(sizes) - sizes
+        best_values = np.full(n_requests, -np.inf)
+        best_values[has_candidates] = np.maximum.reduceat(values, starts[has_candidates])
+        is_best = np.flatnonzero(values == best_values[owner])
+        owners, first = np.unique(owner[is_best], return_index=True)
+        for request, index in zip(owners.tolist(), is_best[first].tolist()):
+            if best_values[request] > pass_values[request]:
+                moves[request] = candidates[index]
+        return moves
+
+
+class DecisionService:
+    """
+    Collects decision requests from many games and answers them in batches with
+    `LinearModel.evaluate`.
+
+    Coroutines call `decide`, and every request made during the same turn of the
+    event loop is answered by one batch. A service is also an async strategy, so
+    it can be given as a bot to server tables.
+
+    Attributes:
+        model (LinearModel): The model answering the requests.
+        max_batch (int): Largest batch; a full batch is answered at once.
+        batches (int): Number of batches evaluated.
+        decisions (int): Number of requests answered.
+    """
+    def __init__(self, model=None, max_batch=4096):
+        """
+        Initializes a service.
+
+        Parameters:
+        model (LinearModel): The model. Default is a `LinearModel` with default weights.
+        max_batch (int): Largest batch. Default is 4096.
+        """
+        self.model = model if model is not None else LinearModel()
+        self.max_batch = max_batch
+        self.batches = 0
+        self.decisions = 0
+        self._pending = []
+
+    def __call__(self, game, player, placements, white_turn):
+        return self.decide(game, player, placements, white_turn)
+
+    async def decide(self, game, player, placements, white_turn):
+        """
+        Queues a decision and waits for its batch to be evaluated.
+
+        Returns:
+        tuple or None: The chosen placement, or None to pass.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((game, player, placements, white_turn), future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif len(self._pending) == 1:
+            asyncio.get_running_loop().call_soon(self.flush)
+        return await future
+
+    def flush(self):
+        """
+        Evaluates every queued request as one batch. If the model fails, every
+        request of the batch raises its error.
+        """
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            moves = self.model.evaluate([request for request, future in batch])
+        except Exception as error:
+            for request, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.batches += 1
+        self.decisions += len(batch)
+        for (request, future), move in zip(batch, moves):
+            if not future.done():
+                future.set_result(move)
+
+
+def play_batched(games, model):
+    """
+    Plays many headless games in lockstep. At each step the pending decisions of
+    every unfinished game are evaluated together by `model.evaluate`.
+
+    Parameters:
+    games (list of QwixxSim): The games to play. Every player's strategy is set to
+        `model`, so their decisions are counted under it in the games' metrics.
+    model (LinearModel): The model making every decision.
+
+    Returns:
+    list of GameResult: The outcome of each game, aligned with `games`.
+    """
+    results = [None] * len(games)
+    running = []
+    for index, game in enumerate(games):
+        game.strategies = dict.fromkeys(game.players, model)
+        order = game.rng.sample(game.players, len(game.players))
+        steps = game.turn_steps(order)
+        running.append((index, game, steps, next(steps)))
+
+    while running:
+        batch = [(game, player, placements, white_turn)
+                 for index, game, steps, requests in running
+                 for player, white_turn, placements in requests]
+        moves = model.evaluate(batch)
+        still_running = []
+        position = 0
+        for index, game, steps, requests in running:
+            answer = moves[position:position + len(requests)]
+            position += len(requests)
+            try:
+                still_running.append((index, game, steps, steps.send(answer)))
+            except StopIteration as stop:
+                results[index] = game.result(stop.value)
+        running = still_running
+    return results
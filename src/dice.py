@@ -1,10 +1,36 @@
 from color import Color
 import random
+import hashlib
 from itertools import combinations
 from itertools import product
+from functools import lru_cache
 import shutil
 from utils import ansi_center
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for RollBatch
+    np = None
+
+def game_rng(master_seed, game_index=0):
+    """
+    Creates the random number generator for one game of a seeded run.
+
+    The generator's seed is a hash of the master seed and the game index, so
+    every game can be replayed on its own, and games handed to different
+    worker processes draw from unrelated streams.
+
+    Parameters:
+    master_seed (int): The seed of the whole run.
+    game_index (int): The index of the game within the run. Default is 0.
+
+    Returns:
+    random.Random: A generator seeded for this game.
+    """
+    key = f"{master_seed}:{game_index}".encode()
+    seed = int.from_bytes(hashlib.blake2b(key, digest_size=16).digest(), "little")
+    return random.Random(seed)
+
 class Die:
     """
     A Qwixx die.
@@ -13,21 +39,24 @@ class Die:
         color (Color): The color of the die.
         sides (int): The number of sides on the die.
         last_roll (int): The result of the last roll of the die.
+        rng (random.Random): The random number generator used to roll the die.
 
     Methods:
         roll(): Rolls the die, saving and returning a value between 1 and the number of sides.
     """
 
-    def __init__(self, color=Color.NO_COLOR, sides=6):
+    def __init__(self, color=Color.NO_COLOR, sides=6, rng=None):
         """
         Initializes a Die instance with a specified color and number of sides.
 
         Parameters:
         color (Color): The color of the die. Default is Color.NO_COLOR.
         sides (int): The number of sides on the die. Default is 6.
+        rng (random.Random): The generator to roll with. Default is the global `random` module.
         """
         self.color = color
         self.sides = sides
+        self.rng = rng if rng is not None else random
         self.last_roll = 0
         self.roll()
     
@@ -38,7 +67,7 @@ class Die:
         Returns:
         int: The result of the die roll.
         """
-        self.last_roll = random.randint(1, self.sides)
+        self.last_roll = self.rng.randint(1, self.sides)
         return self.last_roll
     
     def __int__(self):
@@ -81,6 +110,86 @@ class Die:
         return Color.color_text(self.color, ":" + str(self.last_roll) + ":")
 
 
+class RollBatch:
+    """
+    Dice pre-rolled for many turns of many games with NumPy.
+
+    Games are rolled in fixed chunks of `CHUNK_GAMES`, each with one vectorized call
+    to a generator keyed by the seed and the chunk's index. A batch rolls the whole
+    chunks covering its games and keeps its own, so a game's rolls depend only on
+    the seed and the game's index within the run, not on the batch it is part of.
+    Turns are drawn first, so rolling fewer turns gives the first turns of the same
+    games.
+
+    The faces are not those `game_rng(seed, i)` would roll: NumPy's generators stand
+    apart from Python's `random`, and a game played from a batch only matches other
+    games played from the same seed's batches. Without a seed, the batch is drawn
+    from fresh OS entropy and is not reproducible. A `DiceSet` that runs out of a
+    game's pre-rolled turns rolls on with its own generator, which is the global
+    `random` module if it was given none.
+
+    Attributes:
+        rolls (ndarray of int8): Die faces, shape (n_games, n_turns, 6), in `DiceSet.dice`
+            order: white, white, red, yellow, green, blue.
+        white_sums (ndarray of int8): Sum of the white dice, shape (n_games, n_turns).
+        color_sums (ndarray of int8): Colored sums, shape (n_games, n_turns, 8), in
+            `DiceSet.color_options` order: red + each white, yellow + each white, and so on.
+    """
+    # Games rolled together by one call to a generator
+    CHUNK_GAMES = 4096
+
+    def __init__(self, n_games, n_turns, seed=None, first_game=0):
+        """
+        Rolls the dice for every turn of every game.
+
+        Parameters:
+        n_games (int): Number of games to roll for.
+        n_turns (int): Number of turns to roll for in each game.
+        seed (int or sequence of int): Master seed for `numpy.random.SeedSequence`.
+            Default is unseeded.
+        first_game (int): Index of the batch's first game within the run. Default is 0.
+        """
+        if np is None:
+            raise ImportError("RollBatch requires NumPy.")
+        entropy = np.random.SeedSequence(seed).entropy
+        size = self.CHUNK_GAMES
+        self.rolls = np.empty((n_games, n_turns, 6), dtype=np.int8)
+        stop = first_game + n_games
+        for chunk in range(first_game // size, -(-stop // size)):
+            key = np.random.SeedSequence(entropy, spawn_key=(chunk,))
+            faces = np.random.default_rng(key).integers(1, 7, size=(n_turns, size, 6),
+                                                        dtype=np.int8)
+            # The chunk's games that fall within the batch
+            begin, end = max(first_game, chunk * size), min(stop, (chunk + 1) * size)
+            self.rolls[begin - first_game:end - first_game] = \
+                faces[:, begin - chunk * size:end - chunk * size].transpose(1, 0, 2)
+        white = self.rolls[..., :2]
+        colored = self.rolls[..., 2:]
+        self.white_sums = white.sum(axis=-1, dtype=np.int8)
+        self.color_sums = (colored[..., :, None] + white[..., None, :]).reshape(n_games, n_turns, 8)
+
+    def __len__(self):
+        """
+        Returns the number of games in the batch.
+
+        Returns:
+        int: The number of games in the batch.
+        """
+        return self.rolls.shape[0]
+
+    def game_rolls(self, game_index):
+        """
+        Returns one game's rolls as plain Python lists, for fast per-turn access.
+
+        Parameters:
+        game_index (int): The game to return.
+
+        Returns:
+        list of list of int: The die faces for each turn of the game.
+        """
+        return self.rolls[game_index].tolist()
+
+
 class DiceSet:
     """
     Implements a set of six Qwixx dice.
@@ -89,18 +198,35 @@ class DiceSet:
         dice (list): A list of Die instances representing the dice set.
         white_dice (list): A list of Die instances representing the white dice.
         colored_dice (list): A list of Die instances representing the colored dice.
+        rng (random.Random): The random number generator shared by the dice.
+        pending (list of list of int): Pre-rolled faces still to be used, last turn first.
 
     Methods:
         roll(): Rolls all the dice in the set.
+        throw(): Rolls all the dice in the set without formatting the result.
         white_options(): Returns colorless play options based on the last roll.
         color_options(): Returns colored play options based on the last roll.
         term_rep(): Returns a terminal-friendly string representation of the dice set.
     """
 
-    def __init__(self):
+    def __init__(self, rng=None, batch=None, game_index=0):
         """
         Initializes a DiceSet instance with six dice: two white and four colored (red, yellow, green, blue).
+
+        If a batch is given, rolls replay that game's pre-rolled faces in order,
+        and fall back to `rng` once they run out.
+
+        Parameters:
+        rng (random.Random): The generator to roll with, usually from `game_rng`.
+            Default is the global `random` module.
+        batch (RollBatch): Pre-rolled dice to replay. Default is None.
+        game_index (int): The game of `batch` to replay. Default is 0.
         """
+        self.rng = rng if rng is not None else random
+        self.pending = []
+        if batch is not None:
+            self.pending = batch.game_rolls(game_index)
+            self.pending.reverse()
         colors = [
             Color.NO_COLOR,
             Color.NO_COLOR,
@@ -116,7 +242,7 @@ class DiceSet:
         self.white_dice = []
         self.colored_dice = []
         for (c, s) in zip(colors, sides):
-            d = Die(c, s)
+            d = Die(c, s, self.rng)
             self.dice.append(d)
             if d.color == Color.NO_COLOR:
                 self.white_dice.append(d)
@@ -156,9 +282,22 @@ class DiceSet:
         Returns:
         str: A string representation of the dice set after rolling.
         """
-        for die in self.dice:
-            die.roll()
+        self.throw()
         return str(self)
+
+    def throw(self):
+        """
+        Rolls all the dice in the set, using pre-rolled faces while any remain.
+
+        Returns:
+        list of int: The faces of the dice, white dice first.
+        """
+        if self.pending:
+            faces = self.pending.pop()
+            for die, face in zip(self.dice, faces):
+                die.last_roll = face
+            return faces
+        return [die.roll() for die in self.dice]
     
     def white_options(self):
         """
@@ -197,4 +336,76 @@ class DiceSet:
         Returns:
         iterator: An iterator over the dice in the set.
         """
-        return iter(self.dice)
\ No newline at end of file
+        return iter(self.dice)
+
+
+class RollOutcome:
+    """
+    One class of equivalent rolls: every roll in the class offers the same play options.
+
+    Attributes:
+        white_options (tuple): The colorless (Color, value) option, as from `DiceSet.white_options`.
+        color_options (tuple): The distinct colored (Color, value) options of unlocked colors,
+            in die order and then by value.
+        count (int): Number of the 6^6 raw rolls in this class.
+        probability (float): Probability that a roll falls in this class.
+    """
+    def __init__(self, white_options, color_options, count):
+        self.white_options = white_options
+        self.color_options = color_options
+        self.count = count
+        self.probability = count / 6 ** 6
+
+
+@lru_cache(maxsize=None)
+def _roll_outcomes(locked_colors):
+    colors = [c for c in (Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE)
+              if c not in locked_colors]
+    # Each locked die multiplies every class by its six faces.
+    weight = 6 ** (4 - len(colors))
+    faces = range(1, 7)
+
+    counts = {}
+    for w1, w2 in product(faces, faces):
+        white = ((Color.NO_COLOR, w1 + w2),)
+        for colored in product(faces, repeat=len(colors)):
+            options = []
+            for color, c in zip(colors, colored):
+                options.append((color, c + min(w1, w2)))
+                if w1 != w2:
+                    options.append((color, c + max(w1, w2)))
+            key = (white, tuple(options))
+            counts[key] = counts.get(key, 0) + weight
+
+    return tuple(RollOutcome(white, options, count)
+                 for (white, options), count in counts.items())
+
+def roll_outcomes(locked_colors=()):
+    """
+    Returns the exact distribution of play options for the next roll of a DiceSet.
+
+    The 6^6 raw rolls collapse into classes that offer identical options, since
+    swapping the white dice changes nothing. With no colors locked there are
+    27,216 classes; each locked color divides that by six. The table for each
+    set of locked colors is built once and cached.
+
+    Parameters:
+    locked_colors (iterable of Color): Colors whose dice are out of play. Default is none.
+
+    Returns:
+    tuple of RollOutcome: The outcome classes; their probabilities sum to 1.
+    """
+    return _roll_outcomes(frozenset(locked_colors))
+
+def expectation(fn, locked_colors=()):
+    """
+    Computes the exact expected value of a function of the next roll.
+
+    Parameters:
+    fn (callable): Maps a RollOutcome to a number.
+    locked_colors (iterable of Color): Colors whose dice are out of play. Default is none.
+
+    Returns:
+    float: The probability-weighted sum of `fn` over all outcome classes.
+    """
+    return sum(outcome.probability * fn(outcome) for outcome in roll_outcomes(locked_colors))
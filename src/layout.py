@@ -0,0 +1,90 @@
+from color import Color
+from row import Row
+from functools import lru_cache
+
+class BoardLayout:
+    """
+    The fixed arrangement of colors and values on a Qwixx board.
+
+    Because each row's colors and values never change, the layout holds them
+    once for every board built from it, along with the scoring table and an
+    index from each value to its column. Boards keep only their marks and penalties.
+
+    Attributes:
+        colors (tuple of Color): The color of each row.
+        values (tuple of tuple of int): The dice sum required for each square of each row.
+        square_colors (tuple of tuple of Color): The color of each square of each row.
+        scoring (tuple of int): The shared scoring table, from `Row.default_metric`.
+        columns (tuple of dict: int -> int): For each row, maps a dice sum to its column.
+        rows_by_color (dict: Color -> int): Maps each row color to its row index.
+    """
+    def __init__(self, colors, values):
+        """
+        Initializes a layout from row colors and row values.
+
+        Parameters:
+        colors (list of Color): The color of each row.
+        values (list of list of int): The dice sum required for each square of each row.
+        """
+        self.colors = tuple(colors)
+        self.values = tuple(tuple(row_values) for row_values in values)
+        self.square_colors = tuple((color,) * len(row_values)
+                                   for color, row_values in zip(self.colors, self.values))
+        self.scoring = Row.default_metric(max(len(row_values) for row_values in self.values))
+        self.columns = tuple(
+            {value: col_index for col_index, value in enumerate(row_values)}
+            for row_values in self.values
+        )
+        self.rows_by_color = {color: row_index
+                              for row_index, color in enumerate(self.colors)}
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("BoardLayout is shared between boards and cannot be changed.")
+        super().__setattr__(name, value)
+
+    def __deepcopy__(self, memo):
+        # Immutable, so copies of a board keep sharing it
+        return self
+
+    def __reduce__(self):
+        return (BoardLayout, (self.colors, self.values))
+
+    def n_rows(self):
+        """
+        Returns the number of rows in the layout.
+
+        Returns:
+        int: The number of rows in the layout.
+        """
+        return len(self.values)
+
+    def column(self, row_index, value):
+        """
+        Looks up the column holding a dice sum in a row.
+
+        Parameters:
+        row_index (int): Index of the row.
+        value (int): The dice sum.
+
+        Returns:
+        int: The column index, or -1 if the value does not appear in the row.
+        """
+        return self.columns[row_index].get(value, -1)
+
+
+@lru_cache(maxsize=None)
+def standard_layout():
+    """
+    Returns the shared default Qwixx layout: red and yellow rows run 2..12,
+    green and blue rows run 12..2.
+
+    Returns:
+    BoardLayout: The default layout.
+    """
+    ascending = range(2, 13)
+    descending = range(12, 1, -1)
+    return BoardLayout(
+        [Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE],
+        [ascending, ascending, descending, descending],
+    )
@@ -0,0 +1,159 @@
+from collections import Counter
+from time import perf_counter_ns
+import json
+
+# The turn phases timed by `QwixxGame.turn_steps`, in the order they happen.
+# Decision phases include the time the caller took to decide.
+PHASES = (
+    "roll",       # Rolling the dice
+    "movegen",    # Player.valid_placements; counted once per call
+    "offturn",    # Other players' white decisions; counted once per player
+    "white",      # The active player's white decision
+    "color",      # The active player's colored decision
+    "penalty",    # Penalizing a player who passed both decisions
+    "locks",      # Resolving lock events
+    "end_check",  # Board.get_state
+)
+
+
+def strategy_name(strategy):
+    """
+    Returns the name decisions of a strategy are counted under.
+
+    Parameters:
+    strategy (callable): A strategy function or object.
+
+    Returns:
+    str: The function's name, or the object's class name.
+    """
+    return getattr(strategy, "__name__", type(strategy).__name__)
+
+
+class Metrics:
+    """
+    Counters and nanosecond timers for the phases of the turn loop.
+
+    Attach one as `metrics=` to a game, such as `QwixxSim` or `qwixx_term.QwixxTerm`,
+    or set it as the game's `metrics`, to collect it; games without one skip
+    every measurement. Results of many games, or of worker processes, are combined
+    with `merge`, and reported with `to_json` or `to_prometheus`.
+
+    Attributes:
+        calls (dict: str -> int): Times each phase of `PHASES` ran.
+        nanoseconds (dict: str -> int): Time spent in each phase.
+        decisions (Counter): Decisions made by each strategy, by `strategy_name`, or
+            under "human" for players without one.
+        games (int): Number of games finished.
+        turns (int): Number of turns played.
+    """
+    def __init__(self):
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.nanoseconds = dict.fromkeys(PHASES, 0)
+        self.decisions = Counter()
+        self.games = 0
+        self.turns = 0
+
+    def lap(self, phase, start, calls=1):
+        """
+        Charges the time since `start` to a phase.
+
+        Parameters:
+        phase (str): A name from `PHASES`.
+        start (int): When the phase began, from `time.perf_counter_ns`.
+        calls (int): Times the phase ran in that span. Default is 1.
+
+        Returns:
+        int: The current time, to start the next phase from.
+        """
+        now = perf_counter_ns()
+        self.calls[phase] += calls
+        self.nanoseconds[phase] += now - start
+        return now
+
+    def count_decisions(self, names):
+        """
+        Counts one decision for each name given.
+
+        Parameters:
+        names (list of str): What made each decision, from `QwixxGame.decider`.
+        """
+        self.decisions.update(names)
+
+    def merge(self, other):
+        """
+        Adds the measurements of another Metrics.
+
+        Parameters:
+        other (Metrics): The measurements to add.
+
+        Returns:
+        Metrics: This object, updated.
+        """
+        for phase in PHASES:
+            self.calls[phase] += other.calls[phase]
+            self.nanoseconds[phase] += other.nanoseconds[phase]
+        self.decisions.update(other.decisions)
+        self.games += other.games
+        self.turns += other.turns
+        return self
+
+    def as_dict(self):
+        """
+        Returns the measurements as plain data.
+
+        Returns:
+        dict: Games, turns, each phase's calls and seconds, and decisions by strategy.
+        """
+        return {
+            "games": self.games,
+            "turns": self.turns,
+            "phases": {phase: {"calls": self.calls[phase],
+                               "seconds": self.nanoseconds[phase] / 1e9}
+                       for phase in PHASES},
+            "decisions": dict(sorted(self.decisions.items())),
+        }
+
+    def to_json(self):
+        """
+        Returns the measurements as JSON text. See `as_dict`.
+
+        Returns:
+        str: The JSON document.
+        """
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_prometheus(self, prefix="qwixx"):
+        """
+        Returns the measurements in the Prometheus text exposition format.
+
+        Parameters:
+        prefix (str): The prefix of every metric name. Default is "qwixx".
+
+        Returns:
+        str: One counter family per measurement, ending with a newline.
+        """
+        lines = [
+            f"# HELP {prefix}_games_total Games finished.",
+            f"# TYPE {prefix}_games_total counter",
+            f"{prefix}_games_total {self.games}",
+            f"# HELP {prefix}_turns_total Turns played.",
+            f"# TYPE {prefix}_turns_total counter",
+            f"{prefix}_turns_total {self.turns}",
+            f"# HELP {prefix}_phase_calls_total Times each turn phase ran.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{phase}"}} {self.calls[phase]}'
+                  for phase in PHASES]
+        lines += [
+            f"# HELP {prefix}_phase_seconds_total Time spent in each turn phase.",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} '
+                  f'{self.nanoseconds[phase] / 1e9!r}' for phase in PHASES]
+        lines += [
+            f"# HELP {prefix}_decisions_total Decisions made by each strategy.",
+            f"# TYPE {prefix}_decisions_total counter",
+        ]
+        lines += [f'{prefix}_decisions_total{{strategy="{name}"}} {count}'
+                  for name, count in sorted(self.decisions.items())]
+        return "\n".join(lines) + "\n"
@@ -62,14 +62,80 @@ class Player:
         white_turn (bool): Indicates if it's the white dice turn. Default is True.
 
         Returns:
-        list: A list of valid placements.
+        list: A sorted list of distinct valid placements.
         """
         options = dice.white_options() if white_turn else dice.color_options()
+        # Each (color, value) option maps to at most one column per row, so
+        # distinct options never produce the same placement twice.
         valid_placements = []
-        for option in options:
+        for option in dict.fromkeys(options):
             valid_placements += self.board.placements(option, white_turn)
-        return list(set(valid_placements))
+        valid_placements.sort()
+        return valid_placements
     
+    def turn_moves(self, dice, pending_locks=()):
+        """
+        Generates every legal joint move for this player's own turn: a white move
+        followed by a color move, where either may be a pass.
+
+        Color moves are checked against the board as it would be after the white
+        move, without copying the board: a color move in the same row must lie to
+        the right of the white mark, and that extra mark can make the row's lock
+        square legal. Colors in `pending_locks` lock before the color roll, so their
+        color moves are left out. A white move that brings the locked rows past the
+        limit ends the game before the color roll, as in `QwixxGame.turn_steps`, so
+        no color move follows it.
+
+        Parameters:
+        dice (DiceSet): The dice set used in the game, after rolling.
+        pending_locks (collection of Color): Colors locked during this roll but not
+            yet applied to the board. Default is none.
+
+        Yields:
+        tuple: (white move, color move), each a (row_index, col_index) tuple or None
+            for a pass. (None, None) is yielded first and means taking a penalty.
+        """
+        board = self.board
+        layout = board.layout
+        white_moves = self.valid_placements(dice, True)
+        color_moves = [move for move in self.valid_placements(dice, False)
+                       if layout.colors[move[0]] not in pending_locks]
+
+        # Lock squares that become legal once a white mark is added to their row
+        lock_moves = []
+        for (color, value) in dict.fromkeys(dice.color_options()):
+            row_index = layout.rows_by_color[color]
+            last = len(layout.values[row_index]) - 1
+            if (layout.column(row_index, value) == last
+                    and color not in board.locked_colors
+                    and color not in pending_locks
+                    and not board.lockable(row_index)
+                    and board.lockable(row_index, 1)):
+                lock_moves.append((row_index, last))
+
+        # Colors locked once the white roll is resolved, besides any lock the white mark makes
+        locked = board.locked_colors.union(pending_locks)
+        if len(locked) > board.MAX_LOCK:
+            color_moves = lock_moves = []
+
+        yield (None, None)
+        for color_move in color_moves:
+            yield (None, color_move)
+
+        for white_move in white_moves:
+            yield (white_move, None)
+            white_row, white_col = white_move
+            if (white_col == len(layout.values[white_row]) - 1
+                    and len(locked | {layout.colors[white_row]}) > board.MAX_LOCK):
+                # This white mark locks a row and ends the game
+                continue
+            for color_move in color_moves:
+                if color_move[0] != white_row or color_move[1] > white_col:
+                    yield (white_move, color_move)
+            for color_move in lock_moves:
+                if color_move[0] == white_row and color_move[1] > white_col:
+                    yield (white_move, color_move)
+
     def valid_A1(self, A1_coord):
         """
         Checks if the provided A1 coordinate is valid and within the board bounds.
@@ -4,22 +4,89 @@ from board import Board
 from board import BoardState
 from color import Color
 import random
+import struct
+from time import perf_counter_ns
 from abc import ABC, abstractmethod
 
+# Decision phases, as recorded in replay logs
+OFFTURN = 0  # Another player's white roll
+WHITE = 1    # The active player's white roll
+COLOR = 2    # The active player's colored roll
+# The (row, col) recorded for a pass
+PASS_MOVE = (255, 0)
+
 class QwixxGame(ABC):
     """
     An abstract class that manages a game of Qwixx.
     An implementation would run the game in a terminal, browser, or app.
+
+    Locking is event driven: marking the last square of a row raises a lock
+    event, which is held in `pending_locks` until the game calls
+    `resolve_locks` at the end of a dice action. Every player may still lock
+    the same color during that action, and the lock then reaches all boards once.
+
+    Attributes:
+        turn (int): Number of turns started so far.
+        active_player (Player): The player whose turn it is, or None between games.
+        player_order (list of Players): The turn order of the game in progress, or None.
+        white_passed (bool): Whether the active player passed on the white roll this turn.
+        seats (dict: Player -> int): Each player's index in `players`.
+        log (replay.ReplayWriter): Where to stream the game's rolls and decisions, or None.
+        record (replay.GameLog): The log record of the game in progress, or None.
+        seed (int): The master seed of the game's dice, recorded in the log, or None.
+        game_index (int): The index of the game under the master seed.
+        metrics (metrics.Metrics): Where to count and time the turn phases, or None.
     """
+    # Encoded state header: player count, active player index (255 for none),
+    # locked colors as a bitmask of rows, turn index, then the six die faces.
+    _STATE_HEADER = struct.Struct("<BBBI6B")
+
     @abstractmethod
     def __init__(self, players, dice, lc):
         self.players = players
         self.dice = dice
         self.locked_colors = lc
         self.N_players = len(self.players)
+        self.seats = {player: seat for seat, player in enumerate(self.players)}
+        self.pending_locks = []
+        self.turn = 0
+        self.active_player = None
+        self.player_order = None
+        self.white_passed = False
+        self.log = None
+        self.record = None
+        self.seed = None
+        self.game_index = 0
+        self.metrics = None
+        for player in self.players:
+            player.board.set_lock_listener(self.lock_event)
 
     def lock(self, color):
         self.locked_colors.add(color)
+
+    def lock_event(self, color):
+        """
+        Records that a row of `color` was locked during the current dice action.
+
+        Args:
+            color (Color): The color of the locked row.
+        """
+        if color not in self.pending_locks:
+            self.pending_locks.append(color)
+
+    def resolve_locks(self):
+        """
+        Broadcasts the colors locked during the current dice action to every board.
+
+        Returns:
+            list of Color: The colors that were newly locked.
+        """
+        resolved = self.pending_locks
+        self.pending_locks = []
+        for color in resolved:
+            for player in self.players:
+                player.board.color_lock(color)
+        return resolved
     
     @abstractmethod
     def display_player_order(self, player_order):
@@ -67,6 +134,269 @@ class QwixxGame(ABC):
     def penalize(self, player):
         player.penalize()
 
+    def decision_phase(self, player, white_turn):
+        """
+        Returns which decision of the turn `player` is making.
+
+        Args:
+            player (Player): The player deciding.
+            white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+
+        Returns:
+            int: `OFFTURN`, `WHITE` or `COLOR`.
+        """
+        if not white_turn:
+            return COLOR
+        return WHITE if player is self.active_player else OFFTURN
+
+    def record_start(self, player_order):
+        """
+        Logs the start of a game, if a log is attached.
+
+        Args:
+            player_order (list of Players): The order of the players.
+        """
+        if self.log is not None:
+            self.record = self.log.start_game(self.seed, self.game_index,
+                                              [p.name for p in self.players],
+                                              [self.seats[p] for p in player_order])
+
+    def record_roll(self):
+        """
+        Logs the current dice, if a log is attached.
+        """
+        if self.record is not None:
+            self.record.rolls.append(tuple([die.last_roll for die in self.dice.dice]))
+
+    def record_decision(self, player, phase, move):
+        """
+        Logs a player's decision, if a log is attached. Called before the move is applied.
+
+        Args:
+            player (Player): The player who decided.
+            phase (int): `OFFTURN`, `WHITE` or `COLOR`.
+            move (tuple): The (row, col) marked, or None for a pass.
+        """
+        if self.record is not None:
+            self.record.add_decision(self, player, phase, move)
+
+    def record_end(self, state):
+        """
+        Logs the end of a game, if a log is attached.
+
+        Args:
+            state (BoardState): The board state that ended the game.
+        """
+        if self.record is not None:
+            self.record.turns = self.turn
+            self.record.end_state = state
+            self.record.scores = [p.score() for p in self.players]
+            self.log.write(self.record)
+            self.record = None
+
+    def decider(self, player):
+        """
+        Returns the name a player's decisions are counted under in `metrics`.
+
+        Args:
+            player (Player): The deciding player.
+
+        Returns:
+            str: "human". Games that give players strategies name them instead.
+        """
+        return "human"
+
+    def apply_move(self, player, phase, options, move):
+        """
+        Records, counts and marks a player's decision.
+
+        Args:
+            player (Player): The player who decided.
+            phase (int): `OFFTURN`, `WHITE` or `COLOR`.
+            options (list of tuple): The valid (row, col) placements the player had.
+            move (tuple): The (row, col) to mark, or None for a pass.
+
+        Returns:
+            bool: True if the player passed, False if a square was marked.
+        """
+        if move is not None and move not in options:
+            raise RuntimeError(f"{player.name} chose an invalid move {move}.")
+        if self.metrics is not None:
+            self.metrics.count_decisions([self.decider(player)])
+        self.record_decision(player, phase, move)
+        if move is None:
+            return True
+        if not player.board.mark(*move):
+            raise RuntimeError("Turn validation failed!")
+        return False
+
+    def turn_steps(self, player_order, resume=None):
+        """
+        Runs the turn structure of a game as a generator, so any caller can supply
+        the decisions: a plain loop, a strategy, or a coroutine awaiting a remote player.
+
+        Decisions are yielded in batches, as a list of `(player, white_turn, options)`
+        requests, and the caller sends back a list with the chosen (row, col) from
+        each request's options, or None to pass. The other players' white dice
+        choices are independent, so they form one batch that may be decided
+        concurrently; every player in it sees the boards from before the batch, and
+        the moves are applied together afterwards. The active player's white and
+        colored choices are batches of one. Dice are rolled with `roll_dice`, and
+        locks, penalties and logging are applied here.
+
+        Args:
+            player_order (list of Players): The order of the players.
+            resume (int): Continue the game in progress from this decision of the current
+                turn, `OFFTURN`, `WHITE` or `COLOR`, rather than starting a new game.
+                The game is as `decode_state` restored it, with `white_passed` and
+                `pending_locks` set as they were at that decision. Default is None.
+
+        Yields:
+            list of tuple: (Player, bool, list of tuple) for each decision of a batch.
+
+        Returns:
+            BoardState: The board state that ended the game, as the StopIteration value.
+        """
+        if resume is None:
+            # Apply any locks made before the game started
+            self.resolve_locks()
+            self.record_start(player_order)
+            self.turn = 0
+            first = 0
+        else:
+            first = player_order.index(self.active_player)
+        self.player_order = player_order
+        # Each phase is timed only when metrics are attached
+        metrics = self.metrics
+
+        state = BoardState.CONTINUE
+        while True:
+            for p_index in range(first, self.N_players):
+                p = player_order[p_index]
+                if resume is None:
+                    self.turn += 1
+                    self.active_player = p
+                    self.white_passed = False
+                    if metrics is not None: t = perf_counter_ns()
+                    self.roll_dice()
+                    if metrics is not None: t = metrics.lap("roll", t)
+                elif metrics is not None:
+                    t = perf_counter_ns()
+
+                if resume is None or resume == OFFTURN:
+                    # Let other players use white roll, all at once
+                    requests = [(other_p, True, other_p.valid_placements(self.dice, True))
+                                for other_p in self.get_other_players(player_order, p, p_index)]
+                    if metrics is not None: t = metrics.lap("movegen", t, len(requests))
+                    moves = yield requests
+                    for (other_p, white_turn, options), move in zip(requests, moves):
+                        self.apply_move(other_p, OFFTURN, options, move)
+                        if metrics is not None: t = metrics.lap("offturn", t)
+
+                        # Possible game end point
+                        state = other_p.board.get_state()
+                        if metrics is not None: t = metrics.lap("end_check", t)
+                        if state != BoardState.CONTINUE:
+                            break
+
+                    # Possible game end point
+                    if state != BoardState.CONTINUE:
+                        break
+
+                if resume != COLOR:
+                    # Let this player use roll
+                    options = p.valid_placements(self.dice, True)
+                    if metrics is not None: t = metrics.lap("movegen", t)
+                    moves = yield [(p, True, options)]
+                    self.white_passed = self.apply_move(p, WHITE, options, moves[0])
+                    if metrics is not None: t = metrics.lap("white", t)
+
+                    # Locks from the white roll take effect before the color roll
+                    self.resolve_locks()
+                    if metrics is not None: t = metrics.lap("locks", t)
+                    state = p.board.get_state()
+                    if metrics is not None: t = metrics.lap("end_check", t)
+                    if state != BoardState.CONTINUE:
+                        break
+                resume = None
+
+                options = p.valid_placements(self.dice, False)
+                if metrics is not None: t = metrics.lap("movegen", t)
+                moves = yield [(p, False, options)]
+                pass_color = self.apply_move(p, COLOR, options, moves[0])
+                if metrics is not None: t = metrics.lap("color", t)
+                if self.white_passed and pass_color:
+                    self.penalize(p)
+                    if metrics is not None: t = metrics.lap("penalty", t)
+
+                # Update locking
+                self.resolve_locks()
+                if metrics is not None: t = metrics.lap("locks", t)
+
+                # Possible game end point
+                state = p.board.get_state()
+                if metrics is not None: t = metrics.lap("end_check", t)
+                if state != BoardState.CONTINUE:
+                    break
+
+            # Possible game end point
+            if state != BoardState.CONTINUE:
+                break
+            first = 0
+
+        if metrics is not None:
+            metrics.games += 1
+            metrics.turns += self.turn
+        self.record_end(state)
+        self.active_player = None
+        return state
+
+    def encode_state(self):
+        """
+        Encodes the full game state between dice actions as bytes: players, active
+        player, locked colors, turn index, current dice, then each player's board
+        from `Board.encode`. Two players take 31 bytes and four take 49.
+
+        Returns:
+            bytes: The encoded state, usable as a dict key.
+        """
+        layout = self.players[0].board.layout
+        locked = 0
+        for row_index, color in enumerate(layout.colors):
+            if color in self.locked_colors:
+                locked |= 1 << row_index
+        active = 255 if self.active_player is None else self.seats[self.active_player]
+        header = self._STATE_HEADER.pack(self.N_players, active, locked, self.turn,
+                                         *[die.last_roll for die in self.dice])
+        return header + b"".join([player.board.encode() for player in self.players])
+
+    def decode_state(self, data):
+        """
+        Restores a state saved by `encode_state` into this game, in place.
+
+        Args:
+            data (bytes): An encoded state from a game with the same number of players.
+        """
+        n_players, active, locked, self.turn, *faces = self._STATE_HEADER.unpack_from(data)
+        if n_players != self.N_players:
+            raise ValueError(f"State is for {n_players} players, not {self.N_players}.")
+        for die, face in zip(self.dice, faces):
+            die.last_roll = face
+        self.active_player = None if active == 255 else self.players[active]
+
+        layout = self.players[0].board.layout
+        self.locked_colors.clear()
+        for row_index, color in enumerate(layout.colors):
+            if locked >> row_index & 1:
+                self.locked_colors.add(color)
+        self.pending_locks = []
+
+        offset = self._STATE_HEADER.size
+        for player in self.players:
+            size = player.board._STATE.size
+            player.board.load(data[offset:offset + size])
+            offset += size
+
     @abstractmethod
     def play_game(self, player_order=None):
         """
@@ -0,0 +1,504 @@
+from bitboard import BitBoard
+from decision_service import DecisionService
+from dice import game_rng
+from qwixx_sim import QwixxSim
+from strategies import STRATEGIES
+import argparse
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Protocol: one JSON object per line, in both directions, each with a "type".
+#
+# Client requests:
+#   {"type": "create", "seats": [{"name": "ann"}, {"name": "bot", "strategy": "greedy"}],
+#    "seed": 1}                                   Opens a table; "seed" is optional
+#   {"type": "join", "table": 1, "name": "ann"}   Takes the human seat named "ann"
+#   {"type": "watch", "table": 1}                 Receives a table's updates without a seat
+#   {"type": "list"}                              Lists the open tables
+#   {"type": "move", "table": 1, "seat": 0, "move": [0, 3]}
+#                                                 Answers a seat's "decide"; null passes
+#
+# Server messages:
+#   {"type": "created", "table": 1}
+#   {"type": "joined", "table": 1, "seat": 0}
+#   {"type": "tables", "tables": [{"table": 1, "seats": [...], "open": [...], "started": false}]}
+#   {"type": "state", "table": 1, ...}            Sent to everyone at the table on each new turn
+#   {"type": "decide", "table": 1, "seat": 0, "white": true, "options": [[0, 3], ...]}
+#   {"type": "timeout", "table": 1, "seat": 0}   The decision passed for lack of an answer
+#   {"type": "end", "table": 1, "scores": [...], "winners": [...], "end_state": "PENALTIES"}
+#   {"type": "error", "message": "..."}
+#
+# A game starts once every human seat is taken. Bots decide instantly; a server
+# given a `decision_service.DecisionService` also offers the "batched" strategy,
+# whose decisions from every table are evaluated together. The other
+# players' white dice choices are asked for together, and each human has the
+# server's decision timeout to answer before passing. A human who disconnects
+# during a game passes for the rest of it.
+
+
+class Connection:
+    """
+    A connected client.
+
+    Attributes:
+        writer (asyncio.StreamWriter): The client's stream.
+        tables (set of Table): The tables the client sits at or watches.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self.tables = set()
+
+    def send(self, message):
+        """
+        Queues a message for the client. Writes are buffered by the transport,
+        so a slow client never blocks a table.
+
+        Parameters:
+        message (dict): The message, which must serialize to JSON.
+        """
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+
+class Table:
+    """
+    One game hosted by the server, driven by `QwixxGame.turn_steps` as a coroutine.
+
+    Attributes:
+        table_id (int): The table's number.
+        game (QwixxSim): The game. Human seats have no strategy.
+        bots (list of callable): The strategy of each seat, or None for a human seat.
+            A strategy may return an awaitable, such as a `DecisionService` does.
+        clients (list of Connection): The client in each human seat, or None.
+        watchers (set of Connection): Clients receiving updates without a seat.
+        started (bool): Whether the game has started.
+        task (asyncio.Task): The running game, once started.
+        decision_timeout (float): Seconds a human has for each decision before passing.
+    """
+    def __init__(self, table_id, names, bots, seed=None, board_type=BitBoard,
+                 decision_timeout=60.0):
+        self.table_id = table_id
+        self.decision_timeout = decision_timeout
+        rng = game_rng(seed, table_id) if seed is not None else None
+        self.game = QwixxSim(names, bots, board_type, rng)
+        self.bots = bots
+        self.clients = [None for name in names]
+        self.watchers = set()
+        self.started = False
+        self.task = None
+        self._waiting = {}  # seat -> (future, options)
+
+    def open_seats(self):
+        """
+        Returns the human seats nobody has taken yet.
+
+        Returns:
+        list of int: The open seats.
+        """
+        if self.started:
+            return []
+        return [seat for seat, bot in enumerate(self.bots)
+                if bot is None and self.clients[seat] is None]
+
+    def broadcast(self, message):
+        """
+        Sends a message to every client at the table.
+
+        Parameters:
+        message (dict): The message.
+        """
+        message["table"] = self.table_id
+        for client in set(self.clients) | self.watchers:
+            if client is not None:
+                client.send(message)
+
+    def state(self):
+        """
+        Describes the game as a "state" message.
+
+        Returns:
+        dict: Turn, active seat, dice, locked colors and every board.
+        """
+        game = self.game
+        boards = []
+        for player in game.players:
+            board = player.board
+            boards.append({
+                "name": player.name,
+                "marks": [[col for col in range(len(values)) if board.marked(row, col)]
+                          for row, values in enumerate(board.layout.values)],
+                "penalties": board.penalties,
+                "score": board.score(),
+            })
+        return {
+            "type": "state",
+            "turn": game.turn,
+            "active": None if game.active_player is None else game.seats[game.active_player],
+            "dice": [die.last_roll for die in game.dice],
+            "locked": sorted(color.name for color in game.locked_colors),
+            "boards": boards,
+        }
+
+    async def decide(self, seat, white_turn, options):
+        """
+        Waits for a human seat to choose a move.
+
+        Parameters:
+        seat (int): The deciding seat.
+        white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+        options (list of tuple): The valid (row, col) placements.
+
+        Returns:
+        tuple: The chosen (row, col), or None to pass.
+        """
+        client = self.clients[seat]
+        if client is None:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[seat] = (future, options)
+        client.send({"type": "decide", "table": self.table_id, "seat": seat,
+                     "white": white_turn, "options": [list(option) for option in options]})
+        try:
+            return await future
+        finally:
+            self._waiting.pop(seat, None)
+
+    def submit(self, client, seat, move):
+        """
+        Hands a client's move to the seat waiting for it.
+
+        Parameters:
+        client (Connection): The client who sent the move.
+        seat (int): The seat the move is for, which the client must hold.
+        move (list of int): The (row, col) to mark, or None to pass.
+
+        Raises:
+        ValueError: If the seat is not the client's, has no decision pending, or the
+            move is not valid.
+        """
+        waiting = self._waiting.get(seat)
+        if waiting is None or waiting[0].done() or self.clients[seat] is not client:
+            raise ValueError(f"No decision is pending for you in seat {seat!r} "
+                             f"at table {self.table_id}.")
+        future, options = waiting
+        if move is not None:
+            move = tuple(move)
+            if move not in options:
+                raise ValueError(f"{list(move)} is not a valid move.")
+        future.set_result(move)
+
+    def leave(self, client):
+        """
+        Removes a disconnected client. Before the game, their seat opens up again;
+        during it, they pass from then on.
+
+        Parameters:
+        client (Connection): The client who left.
+        """
+        self.watchers.discard(client)
+        for seat, seated in enumerate(self.clients):
+            if seated is client:
+                self.clients[seat] = None
+                waiting = self._waiting.get(seat)
+                if waiting is not None and not waiting[0].done():
+                    waiting[0].set_result(None)
+
+    async def choose(self, player, white_turn, options):
+        """
+        Gets one decision: from a bot directly, or from a human within the
+        table's decision timeout, passing if none arrives in time.
+
+        Parameters:
+        player (Player): The deciding player.
+        white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+        options (list of tuple): The valid (row, col) placements.
+
+        Returns:
+        tuple: The chosen (row, col), or None to pass.
+        """
+        seat = self.game.seats[player]
+        bot = self.bots[seat]
+        if bot is not None:
+            move = bot(self.game, player, options, white_turn)
+            if inspect.isawaitable(move):
+                return await move
+            # Let other tables run between bot decisions
+            await asyncio.sleep(0)
+            return move
+        try:
+            return await asyncio.wait_for(self.decide(seat, white_turn, options),
+                                          self.decision_timeout)
+        except asyncio.TimeoutError:
+            client = self.clients[seat]
+            if client is not None:
+                client.send({"type": "timeout", "table": self.table_id, "seat": seat})
+            return None
+
+    async def run(self):
+        """
+        Plays the game, asking bots directly and humans over their connections.
+        The decisions of a batch from `turn_steps`, such as every other player's
+        use of the white roll, are collected concurrently.
+
+        Returns:
+        GameResult: The final scores and how the game ended.
+        """
+        game = self.game
+        order = game.rng.sample(game.players, len(game.players))
+        steps = game.turn_steps(order)
+        turn = None
+        try:
+            requests = next(steps)
+            while True:
+                if game.turn != turn:
+                    turn = game.turn
+                    self.broadcast(self.state())
+                if len(requests) == 1:
+                    moves = [await self.choose(*requests[0])]
+                else:
+                    moves = await asyncio.gather(*[self.choose(*request) for request in requests])
+                requests = steps.send(moves)
+        except StopIteration as stop:
+            result = game.result(stop.value)
+        self.broadcast(self.state())
+        self.broadcast({"type": "end", "scores": result.scores, "winners": result.winners,
+                        "end_state": result.end_state.name})
+        return result
+
+
+class QwixxServer:
+    """
+    Hosts many concurrent tables on one asyncio event loop, speaking line-delimited
+    JSON over TCP. See the protocol notes at the top of this module.
+
+    Attributes:
+        tables (dict: int -> Table): The tables that have not finished.
+        board_type (type): The board backend for new tables.
+        decision_timeout (float): Seconds a human has for each decision before passing.
+        strategies (dict: str -> callable): The bot strategies seats may ask for. With
+            a `DecisionService`, "batched" seats at every table share its batches.
+    """
+    def __init__(self, board_type=BitBoard, decision_timeout=60.0, service=None):
+        self.tables = {}
+        self.board_type = board_type
+        self.decision_timeout = decision_timeout
+        self.strategies = dict(STRATEGIES)
+        if service is not None:
+            self.strategies["batched"] = service
+        self._table_ids = itertools.count(1)
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=7777):
+        """
+        Starts listening.
+
+        Parameters:
+        host (str): The interface to listen on. Default is localhost only.
+        port (int): The port. 0 picks a free one. Default is 7777.
+
+        Returns:
+        int: The port the server listens on.
+        """
+        self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Serves clients until cancelled.
+        """
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening and cancels the tables still playing.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for table in list(self.tables.values()):
+            if table.task is not None:
+                table.task.cancel()
+
+    async def handle(self, reader, writer):
+        """
+        Serves one client connection until it closes.
+
+        Parameters:
+        reader (asyncio.StreamReader): The client's input.
+        writer (asyncio.StreamWriter): The client's output.
+        """
+        client = Connection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("Each message must be a JSON object.")
+                    self.dispatch(client, message)
+                except (ValueError, KeyError, TypeError) as error:
+                    client.send({"type": "error", "message": str(error)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for table in client.tables:
+                table.leave(client)
+            writer.close()
+
+    def dispatch(self, client, message):
+        """
+        Handles one request.
+
+        Parameters:
+        client (Connection): The client who sent it.
+        message (dict): The decoded request.
+
+        Raises:
+        ValueError: If the request is malformed or not allowed.
+        """
+        kind = message.get("type")
+        if kind == "create":
+            self.create(client, message["seats"], message.get("seed"))
+        elif kind == "join":
+            self.join(client, self.table(message), message["name"])
+        elif kind == "watch":
+            table = self.table(message)
+            table.watchers.add(client)
+            client.tables.add(table)
+        elif kind == "list":
+            client.send({"type": "tables", "tables": [
+                {"table": table_id, "seats": [p.name for p in table.game.players],
+                 "open": table.open_seats(), "started": table.started}
+                for table_id, table in self.tables.items()
+            ]})
+        elif kind == "move":
+            self.table(message).submit(client, message["seat"], message["move"])
+        else:
+            raise ValueError(f"Unknown message type {kind!r}.")
+
+    def table(self, message):
+        table_id = message["table"]
+        if table_id not in self.tables:
+            raise ValueError(f"No open table {table_id}.")
+        return self.tables[table_id]
+
+    def create(self, client, seats, seed=None):
+        """
+        Opens a table. The creating client watches it.
+
+        Parameters:
+        client (Connection): The client creating the table.
+        seats (list of dict): Each seat's "name", and "strategy" for a bot.
+        seed (int): The master seed for the table's dice. Default is unseeded.
+
+        Returns:
+        Table: The new table.
+
+        Raises:
+        ValueError: If the seats are malformed or ask for an unknown strategy.
+        """
+        if not isinstance(seats, list) or not 2 <= len(seats) <= 5:
+            raise ValueError("A table needs a list of 2 to 5 seats.")
+        bots = []
+        names = []
+        for seat in seats:
+            if not isinstance(seat, dict) or not isinstance(seat.get("name"), str):
+                raise ValueError(f"Each seat must be an object with a string \"name\", "
+                                 f"not {seat!r}.")
+            strategy = seat.get("strategy")
+            if strategy is not None and (not isinstance(strategy, str)
+                                         or strategy not in self.strategies):
+                raise ValueError(f"Unknown strategy {strategy!r}. "
+                                 f"Choose from {sorted(self.strategies)}.")
+            bots.append(self.strategies[strategy] if strategy is not None else None)
+            names.append(seat["name"])
+
+        table = Table(next(self._table_ids), names, bots, seed, self.board_type,
+                      self.decision_timeout)
+        self.tables[table.table_id] = table
+        table.watchers.add(client)
+        client.tables.add(table)
+        client.send({"type": "created", "table": table.table_id})
+        self.start_if_ready(table)
+        return table
+
+    def join(self, client, table, name):
+        """
+        Seats a client in the open human seat with the given name.
+
+        Parameters:
+        client (Connection): The joining client.
+        table (Table): The table to join.
+        name (str): The name of the seat to take.
+        """
+        for seat in table.open_seats():
+            if table.game.players[seat].name == name:
+                break
+        else:
+            raise ValueError(f"No open seat named {name!r} at table {table.table_id}.")
+        table.clients[seat] = client
+        client.tables.add(table)
+        client.send({"type": "joined", "table": table.table_id, "seat": seat})
+        self.start_if_ready(table)
+
+    def start_if_ready(self, table):
+        """
+        Starts a table's game once every human seat is taken.
+
+        Parameters:
+        table (Table): The table to check.
+        """
+        if table.started or table.open_seats():
+            return
+        table.started = True
+        table.task = asyncio.get_running_loop().create_task(self.play(table),
+                                                               name=f"table {table.table_id}")
+        table.task.add_done_callback(self.finished)
+
+    def finished(self, task):
+        """
+        Logs a table's game that failed, so its error is not lost with the task.
+
+        Parameters:
+        task (asyncio.Task): The table's finished task.
+        """
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("%s failed", task.get_name(), exc_info=task.exception())
+
+    async def play(self, table):
+        try:
+            await table.run()
+        finally:
+            del self.tables[table.table_id]
+            for client in set(table.clients) | table.watchers:
+                if client is not None:
+                    client.tables.discard(table)
+
+
+async def main(host, port, decision_timeout, batched):
+    service = DecisionService() if batched else None
+    server = QwixxServer(decision_timeout=decision_timeout, service=service)
+    port = await server.start(host, port)
+    print(f"Serving Qwixx on {host}:{port}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host Qwixx tables over line-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=7777, help="port to listen on")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="seconds a player has for each decision before passing")
+    parser.add_argument("--batched", action="store_true",
+                        help="offer the \"batched\" bot, which needs NumPy")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.timeout, args.batched))
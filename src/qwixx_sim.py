@@ -0,0 +1,170 @@
+from player import Player
+from dice import DiceSet
+from dice import game_rng
+from board import Board
+from board import BoardState
+from metrics import strategy_name
+import random
+from qwixx_game import QwixxGame
+
+
+class GameResult:
+    """
+    The outcome of one headless game.
+
+    Attributes:
+        names (list of str): Names of the players, in the order they were given.
+        scores (list of int): Final score of each player, aligned with `names`.
+        penalties (list of int): Final penalty count of each player, aligned with `names`.
+        winners (list of int): Indices into `names` of the players with the top score.
+        turns (int): Number of turns played.
+        end_state (BoardState): The board state that ended the game.
+    """
+    def __init__(self, names, scores, penalties, turns, end_state):
+        self.names = names
+        self.scores = scores
+        self.penalties = penalties
+        top = max(scores)
+        self.winners = [i for i, score in enumerate(scores) if score == top]
+        self.turns = turns
+        self.end_state = end_state
+
+
+class QwixxSim(QwixxGame):
+    """
+    Runs a game of Qwixx without any input or output, with every decision made
+    by a strategy callable. See `strategies` for the strategy interface.
+
+    Attributes:
+        strategies (dict: Player -> callable): The strategy deciding for each player.
+        rng (random.Random): The generator for the dice and the player order.
+        strategy_rng (random.Random): The generator for strategies that need randomness,
+            kept apart from `rng` so their draws never shift the dice.
+    """
+
+    def __init__(self, names, strategies, board_type=Board, rng=None, batch=None, game_index=0,
+                 seed=None, log=None, metrics=None, strategy_rng=None):
+        """
+        Initializes the game using the players' names and strategies, default boards, and default dice.
+
+        Args:
+            names (list of str): Names of the players.
+            strategies (list of callable): The strategy for each player, aligned with `names`.
+            board_type (type): The board backend, `Board` or `BitBoard`. Default is `Board`.
+            rng (random.Random): The game's generator, usually from `dice.game_rng`.
+                Default is `game_rng(seed, game_index)` if a seed is given, else an unseeded generator.
+            batch (dice.RollBatch): Pre-rolled dice to play with. Default is None.
+            game_index (int): The game of `batch`, and of `seed`, to play. Default is 0.
+            seed (int): The master seed, recorded in the log. Default is None.
+            log (replay.ReplayWriter): Where to stream the game's rolls and decisions. Default is None.
+            metrics (metrics.Metrics): Where to count and time the turn phases. Default is None.
+            strategy_rng (random.Random): The strategies' generator. Default is one seeded
+                from `rng` before any roll.
+        """
+        if len(names) != len(strategies):
+            raise ValueError("Each player needs exactly one strategy.")
+        if rng is None:
+            rng = game_rng(seed, game_index) if seed is not None else random.Random()
+        self.rng = rng
+        if strategy_rng is None:
+            # Drawn once, before anything else, so a game's dice depend only on its seed
+            strategy_rng = random.Random(rng.getrandbits(128))
+        self.strategy_rng = strategy_rng
+        lc = set()
+        players = [Player(name, board_type(lc)) for name in names]
+        dice = DiceSet(self.rng, batch, game_index)
+        super().__init__(players, dice, lc)
+        self.strategies = dict(zip(self.players, strategies))
+        self.log = log
+        self.metrics = metrics
+        self.seed = seed
+        self.game_index = game_index
+
+    def display_intro(self):
+        pass
+
+    def display_player_order(self, player_order):
+        pass
+
+    def roll_dice(self):
+        """
+        Rolls the dice for the current turn.
+        """
+        faces = self.dice.throw()
+        if self.record is not None:
+            self.record.rolls.append(faces)
+
+    def display_dice(self):
+        pass
+
+    def display_white_dice(self):
+        pass
+
+    def display_all_options(self, player):
+        pass
+
+    def display_board(self, player):
+        pass
+
+    def display_boards(self):
+        pass
+
+    def display_podium(self):
+        pass
+
+    def play_game(self, player_order=None):
+        """
+        Plays a complete game, asking each player's strategy for every decision
+        of `QwixxGame.turn_steps`.
+
+        Args:
+            player_order (list of Players): The order of the players. Random if not given.
+
+        Returns:
+            GameResult: The final scores and how the game ended.
+        """
+        # If no player_order is provided, use a random order
+        if player_order == None:
+            player_order = self.rng.sample(self.players, len(self.players))
+
+        strategies = self.strategies
+        steps = self.turn_steps(player_order)
+        try:
+            requests = next(steps)
+            while True:
+                requests = steps.send([strategies[player](self, player, options, white_turn)
+                                       for player, white_turn, options in requests])
+        except StopIteration as stop:
+            return self.result(stop.value)
+
+    def decider(self, player):
+        """
+        Returns the name a player's decisions are counted under in `metrics`.
+
+        Args:
+            player (Player): The deciding player.
+
+        Returns:
+            str: The `metrics.strategy_name` of the player's strategy, or "human" if
+                it has none.
+        """
+        strategy = self.strategies[player]
+        return "human" if strategy is None else strategy_name(strategy)
+
+    def result(self, end_state):
+        """
+        Collects the outcome of a finished game.
+
+        Args:
+            end_state (BoardState): The board state that ended the game.
+
+        Returns:
+            GameResult: The final scores and how the game ended.
+        """
+        return GameResult(
+            [p.name for p in self.players],
+            [p.score() for p in self.players],
+            [p.board.penalties for p in self.players],
+            self.turn,
+            end_state,
+        )
@@ -1,7 +1,6 @@
 from player import Player
 from dice import DiceSet
 from board import Board
-from board import BoardState
 from color import Color
 import random
 from qwixx_game import QwixxGame
@@ -12,34 +11,73 @@ from utils import bold
 from utils import coord_to_A1
 from utils import A1_to_coord
 from utils import valid_A1
-from utils import clear_terminal  # TODO: rename "utils" as "termutils" or similar
+from renderer import TermRenderer
 import time
 
 
 class QwixxTerm(QwixxGame):
     """
     Runs a game of Qwixx in the terminal.
+
+    The rules run in `QwixxGame.turn_steps`; this class only shows the game and
+    answers each decision from the keyboard. Output is composed into frames and
+    drawn by a `TermRenderer`, which only rewrites the lines that changed. A frame
+    is shown before each pause or prompt.
+
+    Attributes:
+        screen (TermRenderer): The renderer that draws the game.
     """
 
-    def __init__(self, names):
+    def __init__(self, names, log=None, metrics=None):
         """
         Initializes the Qwixx game using the players' names, default boards, and default dice.
         
         Args:
             names (list of str): Names of the players.
+            log (replay.ReplayWriter): Where to stream the game's rolls and decisions. Default is None.
+            metrics (metrics.Metrics): Where to count and time the turn phases. Default is None.
         """
         lc = set()
         players = [Player(name, Board(lc)) for name in names]
         dice = DiceSet()
         super().__init__(players, dice, lc)
+        self.log = log
+        self.metrics = metrics
+        self.screen = TermRenderer()
+
+    def pause(self, seconds):
+        """
+        Shows the current frame, then waits.
+
+        Args:
+            seconds (float): How long to wait.
+        """
+        self.screen.present()
+        time.sleep(seconds)
+
+    def ask(self, message):
+        """
+        Shows the current frame, then reads a line of input below it.
+
+        Args:
+            message (str): The prompt.
+
+        Returns:
+            str: The line the user entered.
+        """
+        self.screen.present()
+        user_input = input(message)
+        # Keep the answered prompt in the frame, where the terminal already shows it
+        self.screen.write(message + user_input)
+        return user_input
 
     def display_intro(self):
         """
         Displays an introduction to the Qwixx game.
         """
         terminal_size = shutil.get_terminal_size().columns
-        clear_terminal()
-        print(
+        self.screen.new_frame()
+        self.screen.write(
             ansi_center(
                 "Welcome to "
                 + Color.color_text(Color.RED, "Q")
@@ -62,13 +100,14 @@ class QwixxTerm(QwixxGame):
         text = "The player order will be:"
         for index, player in enumerate(player_order):
             text += f"\n\t{index+1}. {player.name}"
-        print(text)
+        self.screen.write(text)
 
     def roll_dice(self):
         """
         Rolls the dice for the current turn.
         """
         self.dice.roll()
+        self.record_roll()
 
     def display_dice(self):
         """
@@ -79,7 +118,7 @@ class QwixxTerm(QwixxGame):
         for d in self.dice:
             if d.color not in self.locked_colors:
                 output += self.show_die(d) + " "
-        print(ansi_center(output, terminal_size))
+        self.screen.write(ansi_center(output, terminal_size))
 
     def display_white_dice(self):
         """
@@ -92,7 +131,7 @@ class QwixxTerm(QwixxGame):
                 output += self.show_die(d) + " "
             elif d.color not in self.locked_colors:
                 output += strikethrough(self.show_die(d)) + " "
-        print(ansi_center(output, terminal_size))
+        self.screen.write(ansi_center(output, terminal_size))
 
     def show_die(self, die):
         """
@@ -114,78 +153,34 @@ class QwixxTerm(QwixxGame):
             choices (list of tuple): List of (row, column) tuples representing available choices.
         """
         choices_A1 = [coord_to_A1(*c) for c in choices]
-        print(", ".join(choices_A1))
+        self.screen.write(", ".join(choices_A1))
 
-    def choice_offturn(self, this_player, turn_player):
-        """
-        Allows a player to choose their move using white dice options.
-        
-        Args:
-            this_player (Player): The current player making the choice.
-            turn_player (Player): The player whose turn it is.
-        
-        Returns:
-            bool: True if a square was marked, False otherwise.
+    def choose(self, player, white_turn, options):
         """
-        white_turn = True  # Offturn is always white only.
-        options = this_player.valid_placements(self.dice, white_turn)
+        Reads a player's decision from the keyboard until it is a pass or one of `options`.
 
-        valid_choice = False
-        pass_turn = False
-        while not valid_choice:
-            message = "Choose your move (\"-\" to opt out): "
-            user_input = input(message)
-            if user_input.strip() == "-":
-                valid_choice = True
-                pass_turn = True
-            elif this_player.valid_A1(user_input):
-                r, c = A1_to_coord(user_input)
-                if (r, c) in options:
-                    pass_turn = False
-                    valid_choice = True
-                    mark_success = this_player.board.mark(r, c)
-                    if not mark_success:
-                        raise RuntimeError("Turn validation failed!")
-                else:
-                    valid_choice = False
-        return pass_turn
-
-    def choice_onturn(self, this_player, white_turn=True):
-        """
-        Allows a player to choose their move using either white or colored dice options.
-        
         Args:
-            this_player (Player): The current player making the choice.
+            player (Player): The player deciding.
             white_turn (bool): True if it's the white dice turn, False for colored dice turn.
-        
+            options (list of tuple): The valid (row, col) placements.
+
         Returns:
-            bool: True if a square was marked, False otherwise.
-        """
-        options = this_player.valid_placements(self.dice, white_turn)
-
-        valid_choice = False
-        pass_turn = False
-        while not valid_choice:
-            message = None
-            if white_turn:
-                message = "Choose your white move (\"-\" to opt out): "
-            else:
-                message = "Choose your color move (\"-\" to opt out): "
-            user_input = input(message)
+            tuple or None: The chosen (row, col), or None to pass.
+        """
+        if player is not self.active_player:
+            message = "Choose your move (\"-\" to opt out): "
+        elif white_turn:
+            message = "Choose your white move (\"-\" to opt out): "
+        else:
+            message = "Choose your color move (\"-\" to opt out): "
+        while True:
+            user_input = self.ask(message)
             if user_input.strip() == "-":
-                valid_choice = True
-                pass_turn = True
-            elif this_player.valid_A1(user_input):
-                r, c = A1_to_coord(user_input)
-                if (r, c) in options:
-                    pass_turn = False
-                    valid_choice = True
-                    mark_success = this_player.board.mark(r, c)
-                    if not mark_success:
-                        raise RuntimeError("Turn validation failed!")
-                else:
-                    valid_choice = False
-        return pass_turn
+                return None
+            if player.valid_A1(user_input):
+                move = A1_to_coord(user_input)
+                if move in options:
+                    return move
 
     def penalize(self, player):
         """
@@ -197,13 +192,6 @@ class QwixxTerm(QwixxGame):
         player.penalize()
         self.display_penalize(player)
 
-    def update_lock(self):
-        """
-        Updates the lock status of the boards for all players.
-        """
-        for p in self.players:
-            p.board.update_lock()
-
     def display_penalize(self, player):
         """
         Displays a message indicating that a player has taken a penalty.
@@ -212,7 +200,7 @@ class QwixxTerm(QwixxGame):
             player (Player): The player who took a penalty.
         """
         terminal_size = shutil.get_terminal_size().columns
-        print(f"{player.name} took a penalty!".center(terminal_size))
+        self.screen.write(f"{player.name} took a penalty!".center(terminal_size))
 
     def display_all_options(self, player):
         """
@@ -223,10 +211,8 @@ class QwixxTerm(QwixxGame):
         """
         white_options = player.valid_white_options(self.dice)
         color_options = player.valid_color_options(self.dice)
-        print("White: ", end="")
-        self.display_choices(white_options)
-        print("Colored: ", end="")
-        self.display_choices(color_options)
+        self.screen.write("White: " + ", ".join([coord_to_A1(*c) for c in white_options]))
+        self.screen.write("Colored: " + ", ".join([coord_to_A1(*c) for c in color_options]))
 
     def display_board(self, player):
         """
@@ -242,7 +228,7 @@ class QwixxTerm(QwixxGame):
         max_row_len = max([len(row) for row in board.rows])
         lmargin = 3
 
-        print(ansi_center(f"~~~ {str(player.name)} ~~~", terminal_size))
+        self.screen.write(ansi_center(f"~~~ {str(player.name)} ~~~", terminal_size))
 
         text = ""
         text_row = ' ' * lmargin
@@ -259,16 +245,16 @@ class QwixxTerm(QwixxGame):
             text += text_row + "\n"
 
         text += f"Penalties: {board.penalties}".center(terminal_size)
-        print(text)
+        self.screen.write(text)
 
     def display_boards(self):
         """
         Displays the boards of all players.
         """
-        clear_terminal()
+        self.screen.new_frame()
         for player in self.players:
             self.display_board(player)
-            print()
+            self.screen.write()
     
     def display_podium(self):
         """
@@ -278,7 +264,7 @@ class QwixxTerm(QwixxGame):
         # Display final scores. Sort scores in reverse order (1st is first)
         scored = [(p, p.board.score()) for p in self.players]
         scored.sort(key=lambda x: x[1], reverse=True)
-        print(ansi_center("~~~ PODIUM ~~~", terminal_size))
+        self.screen.write(ansi_center("~~~ PODIUM ~~~", terminal_size))
         # TODO: make ordinals more robust for support of larger arbitrary numbers
         ordinals = {
             1: "1st", 
@@ -292,11 +278,11 @@ class QwixxTerm(QwixxGame):
         }
         # TODO: allow ties
         place = 1
-        print(ansi_center(f"Congratulations, {bold(scored[0][0].name)}!", terminal_size))
+        self.screen.write(ansi_center(f"Congratulations, {bold(scored[0][0].name)}!", terminal_size))
         for (player, score) in scored:
             score_statement = (f"{ordinals[place]} place: "
                                f"{bold(player.name)} with a score of {bold(score)}.")
-            print(score_statement)
+            self.screen.write(score_statement)
             place += 1
 
     def display_intro(self):
@@ -304,8 +290,8 @@ class QwixxTerm(QwixxGame):
         Displays an introduction to the Qwixx game.
         """
         terminal_size = shutil.get_terminal_size().columns
-        clear_terminal()
-        print(ansi_center("Welcome to " +
+        self.screen.new_frame()
+        self.screen.write(ansi_center("Welcome to " +
               Color.color_text(Color.RED, 'Q') +
               Color.color_text(Color.YELLOW, 'W') +
               Color.color_text(Color.NO_COLOR, 'I') +
@@ -315,103 +301,121 @@ class QwixxTerm(QwixxGame):
             terminal_size)
         )
 
+    def display_turn_start(self):
+        """
+        Shows the active player their roll, then waits for the others' white decisions.
+        """
+        p = self.active_player
+        terminal_size = shutil.get_terminal_size().columns
+        self.screen.new_frame()
+        self.screen.write(ansi_center(f"{bold(p.name)}, it is your turn.", terminal_size))
+        self.pause(0.5)
+        self.display_board(p)
+        self.pause(0.5)
+        self.display_dice() # Let this player see the roll they made
+        self.pause(0.5)
+        self.screen.write(ansi_center(
+            (f"{bold(p.name)}, wait as other players "
+            "decide if they will use the white roll."), terminal_size)
+        )
+        self.ask("Press enter to continue.".center(terminal_size))
+
+    def display_turn_end(self, player):
+        """
+        Shows a player's board after their turn.
+
+        Args:
+            player (Player): The player whose turn ended.
+        """
+        terminal_size = shutil.get_terminal_size().columns
+        self.display_board(player)
+        self.pause(1)
+        self.ask("Press enter to continue.".center(terminal_size))
+
+    def decide(self, player, white_turn, options):
+        """
+        Shows a player what they may mark and reads their decision.
+
+        Args:
+            player (Player): The player deciding.
+            white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+            options (list of tuple): The valid (row, col) placements.
+
+        Returns:
+            tuple or None: The chosen (row, col), or None to pass.
+        """
+        terminal_size = shutil.get_terminal_size().columns
+        if player is not self.active_player:
+            self.screen.new_frame()
+            self.screen.write(ansi_center(
+                (f"{bold(player.name)}, choose how/if you will "
+                "use the white roll."), terminal_size)
+            )
+            self.display_board(player)
+            self.display_white_dice()
+            move = self.choose(player, white_turn, options)
+            self.pause(0.5)
+            return move
+        if white_turn:
+            self.screen.new_frame()
+            self.screen.write(ansi_center(
+                (f"{bold(player.name)}, you may now decide how "
+                "you will use your roll."), terminal_size)
+            )
+            self.pause(0.5)
+            self.display_board(player)
+            self.display_white_dice()
+        else:
+            self.display_board(player) # Update board
+            self.display_dice()
+        return self.choose(player, white_turn, options)
+
     def play_game(self, player_order=None):
-        # Update locking
-        self.update_lock()
+        """
+        Plays a game at the terminal, answering each decision of
+        `QwixxGame.turn_steps` from the keyboard.
 
+        Args:
+            player_order (list of Players): The order of the players. Random if not given.
+
+        Returns:
+            BoardState: The board state that ended the game.
+        """
         terminal_size = shutil.get_terminal_size().columns
         self.display_intro()
-        time.sleep(1)
+        self.pause(1)
 
         # If no player_order is provided, use a random order
         if player_order == None:
             player_order = random.sample(self.players, len(self.players))
-        
+
         self.display_player_order(player_order)
-        time.sleep(1)
-        input("Press enter to continue.".center(terminal_size))
+        self.pause(1)
+        self.ask("Press enter to continue.".center(terminal_size))
+
+        steps = self.turn_steps(player_order)
+        turn = 0
+        active = None
+        try:
+            requests = next(steps)
+            while True:
+                # The first decision of each turn follows its roll
+                if self.turn != turn:
+                    if active is not None:
+                        self.display_turn_end(active)
+                    turn, active = self.turn, self.active_player
+                    self.display_turn_start()
+                requests = steps.send([self.decide(player, white_turn, options)
+                                       for player, white_turn, options in requests])
+        except StopIteration as stop:
+            state = stop.value
 
-        # TODO: implement mutiplayer locking with boardstates
-        # Begin turns
-        state = BoardState.CONTINUE
-        while True:
-            for p_index, p in enumerate(player_order):
-                clear_terminal()
-                terminal_size = shutil.get_terminal_size().columns
-                print(ansi_center(f"{bold(p.name)}, it is your turn.", terminal_size))
-                time.sleep(0.5)
-                self.display_board(p)
-                time.sleep(0.5)
-                self.roll_dice()
-                self.display_dice() # Let this player see the roll they made
-                time.sleep(0.5)
-
-                # Let other players use white roll
-                other_players = self.get_other_players(player_order, p, p_index)
-                print(ansi_center(
-                    (f"{bold(p.name)}, wait as other players "
-                    "decide if they will use the white roll."), terminal_size)
-                )
-                input("Press enter to continue.".center(terminal_size))
-                for other_p in other_players:
-                    clear_terminal()
-                    print(ansi_center(
-                        (f"{bold(other_p.name)}, choose how/if you will "
-                        "use the white roll."), terminal_size)
-                    )
-                    self.display_board(other_p)
-                    self.display_white_dice()
-                    self.choice_offturn(other_p, p)
-                    time.sleep(0.5)
-
-                    # Possible game end point
-                    state = other_p.board.get_state()
-                    if state != BoardState.CONTINUE:
-                        break
-
-                # Possible game end point
-                if state != BoardState.CONTINUE:
-                    break
-
-                # Let this player use roll
-                clear_terminal()
-                print(ansi_center(
-                    (f"{bold(p.name)}, you may now decide how "
-                    "you will use your roll."), terminal_size)
-                )
-                time.sleep(0.5)
-                self.display_board(p)
-                self.display_white_dice()
-                pass_white = self.choice_onturn(p, True)
-                
-                self.display_board(p) # Update board
-                self.display_dice()
-                pass_color = self.choice_onturn(p, False)
-                if pass_white and pass_color: self.penalize(p)
-
-                # Update locking
-                self.update_lock()
-
-                # Display updated board
-                self.display_board(p)
-                time.sleep(1)
-
-                # Possible game end point
-                state = p.board.get_state()
-                if state != BoardState.CONTINUE:
-                    break
-
-                input("Press enter to continue.".center(terminal_size))
-            
-            # Possible game end point
-            if state != BoardState.CONTINUE:
-                break
-            
         # Show final boards
         self.display_boards()
         # Show final scores
         self.display_podium()
-    
+        self.screen.present()
+        return state
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+from utils import CLEAR_SCREEN
+from utils import ansi_str_length
+import shutil
+import sys
+
+# ANSI escape sequences used to update the screen in place
+CLEAR_LINE = "\033[K"      # Clear from the cursor to the end of the line
+CLEAR_BELOW = "\033[J"     # Clear from the cursor to the end of the screen
+
+
+def move_to(line):
+    """
+    Returns the ANSI escape sequence that moves the cursor to the start of a line.
+
+    Parameters:
+    line (int): The screen line, counting from 0 at the top.
+
+    Returns:
+    str: The escape sequence.
+    """
+    return f"\033[{line + 1};1H"
+
+
+class TermRenderer:
+    """
+    Draws frames of text lines to a terminal, rewriting only the lines that changed.
+
+    A frame is composed in memory as a list of lines (the back buffer) and compared
+    with the lines already on the screen (the front buffer). Changed lines are
+    redrawn in place using ANSI cursor movement, and everything below the frame is
+    cleared, all in a single write. The screen is only wiped when the terminal is
+    resized or `invalidate` is called.
+
+    Cursor addressing only works while every line is on screen, so a frame that is
+    taller than the terminal, or has a line that would wrap, is drawn in full by
+    clearing the screen and letting it scroll.
+
+    Attributes:
+        stream (file): Where to write the escape sequences. Default is `sys.stdout`.
+        front (list of str): The lines currently on the screen.
+        back (list of str): The frame being composed.
+    """
+    def __init__(self, stream=None):
+        """
+        Initializes a renderer with an unknown screen, so the first frame is drawn in full.
+
+        Parameters:
+        stream (file): Where to write. Default is `sys.stdout`.
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.front = None
+        self.back = []
+        self._size = None
+
+    def write(self, text=""):
+        """
+        Adds text to the frame being composed. Newlines start new lines.
+
+        Parameters:
+        text (str): The text to add. Default is an empty line.
+        """
+        self.back.extend(str(text).split("\n"))
+
+    def new_frame(self):
+        """
+        Starts composing a new, empty frame. The screen keeps showing the last
+        presented frame until `present` is called.
+        """
+        self.back = []
+
+    def invalidate(self):
+        """
+        Forgets what is on the screen, so the next frame is drawn in full.
+        """
+        self.front = None
+
+    def present(self):
+        """
+        Shows the composed frame, writing only the lines that differ from the screen.
+        The cursor is left on the line below the frame, ready for input.
+
+        Returns:
+        int: The number of lines that were redrawn.
+        """
+        size = shutil.get_terminal_size()
+        if size != self._size:
+            self._size = size
+            self.front = None
+
+        # Leave a line below the frame for the cursor
+        if (len(self.back) >= size.lines
+                or any(ansi_str_length(line) > size.columns for line in self.back)):
+            self.stream.write(CLEAR_SCREEN + "\n".join(self.back) + "\n")
+            self.stream.flush()
+            # The screen may have scrolled, so nothing on it can be addressed
+            self.front = None
+            return len(self.back)
+
+        output = []
+        if self.front is None:
+            output.append(CLEAR_SCREEN)
+            front = []
+        else:
+            front = self.front
+
+        redrawn = 0
+        for line_index, line in enumerate(self.back):
+            if line_index >= len(front) or front[line_index] != line:
+                output.append(move_to(line_index) + line + CLEAR_LINE)
+                redrawn += 1
+        output.append(move_to(len(self.back)) + CLEAR_BELOW)
+
+        self.stream.write("".join(output))
+        self.stream.flush()
+        self.front = list(self.back)
+        return redrawn
@@ -0,0 +1,186 @@
+from bitboard import BitBoard
+from dice import game_rng
+from qwixx_sim import QwixxSim
+from strategies import greedy_strategy
+import math
+import random
+import statistics
+
+
+class Evaluation:
+    """
+    The result of `RolloutEvaluator.evaluate` for one decision.
+
+    Attributes:
+        means (dict: tuple -> float): The mean final-score margin after each candidate
+            move, where None is the pass. The margin is the player's final score minus
+            the best final score among the other players.
+        rollouts (dict: tuple -> int): The continuations played after each candidate.
+        best (tuple): The candidate with the highest mean margin.
+    """
+    def __init__(self, means, rollouts, best):
+        self.means = means
+        self.rollouts = rollouts
+        self.best = best
+
+
+class RolloutEvaluator:
+    """
+    Values candidate moves by playing out continuations of the game with a default
+    policy, and is itself a strategy that picks the best of them.
+
+    Every candidate is played out with the same dice sequences (common random
+    numbers), so the difference between two candidates is measured on identical
+    rolls and varies far less than either result alone. Rollouts are played in
+    rounds; after each round, a candidate stops being played once its paired
+    difference from the leader is `confidence` standard errors below `tolerance`,
+    and the evaluation ends when a single candidate is left.
+
+    Continuations restore the game with `QwixxGame.encode_state` into a reused
+    headless game, then resume its `QwixxGame.turn_steps` at the decision and play
+    on until the game ends.
+
+    Attributes:
+        policy (callable): The strategy playing every seat during rollouts.
+        board_type (type): The board backend for rollouts.
+        max_rollouts (int): Most continuations per candidate.
+        min_rollouts (int): Continuations per candidate before any is dropped.
+        round_size (int): Continuations per candidate in each round.
+        confidence (float): Standard errors of the paired difference needed to drop
+            a candidate. Infinity turns early stopping off.
+        tolerance (float): Margin points by which a dropped candidate may still beat
+            the leader; candidates closer than this count as equally good.
+        seed (int): Master seed of the rollout dice.
+        decisions (int): Number of decisions evaluated.
+        total_rollouts (int): Number of continuations played.
+    """
+    def __init__(self, policy=greedy_strategy, board_type=BitBoard, max_rollouts=256,
+                 min_rollouts=16, round_size=8, confidence=3.0, tolerance=1.0, seed=0):
+        self.policy = policy
+        self.board_type = board_type
+        self.max_rollouts = max_rollouts
+        self.min_rollouts = min_rollouts
+        self.round_size = round_size
+        self.confidence = confidence
+        self.tolerance = tolerance
+        self.seed = seed
+        self.decisions = 0
+        self.total_rollouts = 0
+        self._sims = {}
+
+    def _simulator(self, n_players):
+        # One headless game per player count, restored before every continuation
+        if n_players not in self._sims:
+            self._sims[n_players] = QwixxSim([str(seat) for seat in range(n_players)],
+                                             [self.policy] * n_players, self.board_type,
+                                             random.Random())
+        return self._sims[n_players]
+
+    def rollout(self, game, player, white_turn, move, rng_state):
+        """
+        Plays one continuation of a game after a move.
+
+        Parameters:
+        game (QwixxGame): The game, at `player`'s decision. It is not changed.
+        player (Player): The deciding player.
+        white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+        move (tuple): The (row, col) to mark, or None to pass.
+        rng_state (tuple): The `random.Random` state to roll the later dice from.
+
+        Returns:
+        int: The player's final score minus the best final score of the others.
+        """
+        sim = self._simulator(game.N_players)
+        sim.decode_state(game.encode_state())
+        # Part of the turn in progress, which the encoded state leaves out
+        sim.white_passed = game.white_passed
+        sim.pending_locks = list(game.pending_locks)
+        sim.rng.setstate(rng_state)
+        # The policy's own stream, derived the way QwixxSim derives it
+        sim.strategy_rng.seed(sim.rng.getrandbits(128))
+        players = sim.players
+        deciding = players[game.seats[player]]
+        order = [players[game.seats[p]] for p in game.player_order]
+
+        # Resume the turn at this decision, with the policy making every other one
+        policy = self.policy
+        steps = sim.turn_steps(order, game.decision_phase(player, white_turn))
+        requests = next(steps)
+        moves = [move if p is deciding else policy(sim, p, options, white)
+                 for p, white, options in requests]
+        try:
+            while True:
+                requests = steps.send(moves)
+                moves = [policy(sim, p, options, white) for p, white, options in requests]
+        except StopIteration:
+            pass
+        self.total_rollouts += 1
+        return deciding.score() - max(p.score() for p in players if p is not deciding)
+
+    def _survivors(self, alive, outcomes):
+        # Drops the candidates whose paired difference from the leader is significant
+        n = len(outcomes[alive[0]])
+        if n < 2:
+            return alive
+        leader = max(alive, key=lambda move: sum(outcomes[move]))
+        survivors = [leader]
+        for move in alive:
+            if move == leader:
+                continue
+            differences = [a - b for a, b in zip(outcomes[leader], outcomes[move])]
+            mean = sum(differences) / n
+            spread = statistics.stdev(differences)
+            # Drop the move once it is confidently no better than the leader by more
+            # than the tolerance
+            if (mean + self.tolerance) * math.sqrt(n) > self.confidence * spread:
+                continue
+            survivors.append(move)
+        return survivors
+
+    def evaluate(self, game, player, placements, white_turn):
+        """
+        Values passing and each placement by rollouts.
+
+        Parameters:
+        game (QwixxGame): The game, at `player`'s decision, from `turn_steps`.
+        player (Player): The deciding player.
+        placements (list of tuple): The valid placements, from `Player.valid_placements`.
+        white_turn (bool): True if it's the white dice turn, False for colored dice turn.
+
+        Returns:
+        Evaluation: The mean margin and rollout count of each candidate, and the best one.
+        """
+        candidates = [None] + list(placements)
+        outcomes = {move: [] for move in candidates}
+        # Each decision rolls from its own block of game_rng streams
+        first = self.decisions * self.max_rollouts
+        self.decisions += 1
+
+        alive = candidates
+        played = 0
+        while len(alive) > 1 and played < self.max_rollouts:
+            round_end = min(played + self.round_size, self.max_rollouts)
+            for index in range(played, round_end):
+                rng_state = game_rng(self.seed, first + index).getstate()
+                for move in alive:
+                    outcomes[move].append(self.rollout(game, player, white_turn, move, rng_state))
+            played = round_end
+            if played >= self.min_rollouts:
+                alive = self._survivors(alive, outcomes)
+
+        means = {move: sum(results) / len(results) for move, results in outcomes.items()
+                 if results}
+        best = max(alive, key=lambda move: means.get(move, 0.0))
+        return Evaluation(means, {move: len(results) for move, results in outcomes.items()},
+                          best)
+
+    def __call__(self, game, player, placements, white_turn):
+        """
+        Decides one move, as a strategy.
+
+        Returns:
+        tuple or None: The best placement, or None to pass.
+        """
+        if not placements:
+            return None
+        return self.evaluate(game, player, placements, white_turn).best
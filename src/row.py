@@ -1,48 +1,114 @@
-from square import Square
+from square import RowSquare
+from square import square_term_rep
+from functools import lru_cache
 from color import Color
 from utils import strikethrough
 from utils import ansi_center
+from zobrist import SQUARE_KEYS
 
 class Row:
     """ 
     A row of squares for a Qwixx board.
+
+    The colors, values and scoring table are immutable and may be shared by
+    every row built from the same layout; the row's own state is a bitmask of
+    marked squares. Indexing or iterating a row yields RowSquare views.
     
     Attributes:
-        squares (list of Squares): A list of Qwixx board squares.
-        scoring (dict: int -> int): A dictionary mapping marks to scores based on default metrics.
+        colors (tuple of Color): The color of each square.
+        values (tuple of int): The dice sum required to mark each square.
+        scoring (tuple of int): Maps a number of marks, as an index, to a score based on default metrics.
         locked_colors (set of Color): A set of colors that are locked for marking in this row.
+        mask (int): Bit `i` is set if square `i` is marked.
+        rightmost (int): Index of the rightmost marked square, or -1.
+        n_marked (int): Number of marked squares.
+        on_lock (callable): Called with the row's color when its last square is marked, or None.
+        board (Board): The board whose running score the row updates as its marks
+            change, or None for a row on its own.
+        zobrist (int): The XOR of the Zobrist keys of the marked squares, kept up to date
+            by every change to the marks.
+        keys (tuple of int): The Zobrist key of each square, from `zobrist.SQUARE_KEYS`,
+            or zeros for a row built without a row index.
     """
-    def __init__(self, squares, locked_colors):
+    __slots__ = ("colors", "values", "scoring", "lock_min", "locked_colors",
+                 "mask", "rightmost", "n_marked", "on_lock", "board", "zobrist", "keys")
+
+    def __init__(self, squares, locked_colors, row_index=None):
         """
         Initializes a Row instance with a list of squares and locked colors.
 
         Parameters:
-        squares (list of Square): The squares in the row.
+        squares (list of Square): The squares in the row. Marked squares start out marked.
         locked_colors (set of Color): The colors that are locked for marking in this row.
+        row_index (int): Index of the row within its board, which selects its Zobrist keys.
+            Default is None, for a row on its own: it has no Zobrist keys and its
+            `zobrist` stays 0.
+        """
+        self._init(tuple(sq.color for sq in squares), tuple(sq.value for sq in squares),
+                   Row.default_metric(len(squares)), locked_colors, row_index)
+        for index, square in enumerate(squares):
+            if square.marked:
+                self.set_mark(index)
+
+    @classmethod
+    def from_layout(cls, layout, row_index, locked_colors):
         """
-        self.squares = squares
+        Creates an unmarked row that shares its colors, values and scoring with a layout.
+
+        Parameters:
+        layout (BoardLayout): The board layout.
+        row_index (int): Index of the row within the layout.
+        locked_colors (set of Color): The colors that are locked for marking in this row.
+
+        Returns:
+        Row: The new row.
+        """
+        row = cls.__new__(cls)
+        row._init(layout.square_colors[row_index], layout.values[row_index],
+                  layout.scoring, locked_colors, row_index)
+        return row
+
+    def _init(self, colors, values, scoring, locked_colors, row_index):
+        self.colors = colors
+        self.values = values
         # Default scoring metric
-        self.scoring = Row.default_metric(len(self.squares))
+        self.scoring = scoring
         self.lock_min = 5
         self.locked_colors = locked_colors
+        self.mask = 0
+        self.rightmost = -1
+        self.n_marked = 0
+        self.on_lock = None
+        self.board = None
+        self.zobrist = 0
+        self.keys = SQUARE_KEYS[row_index] if row_index is not None else (0,) * len(values)
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def default_metric(n_squares):
         """
         Generates a default scoring metric based on the number of squares.
+        Each size is built once and shared, so the result is an immutable tuple.
 
         Parameters:
         n_squares (int): The number of squares in the row.
 
         Returns:
-        dict: A dictionary mapping marks to scores based on default metrics.
+        tuple of int: The score for each number of marks, indexed by marks.
         """
-        scoring = dict()
+        scoring = []
         curr_val = 0
         for index in range(n_squares + 2):  # +2 because of the possibility of locking
             curr_val += index
-            scoring[index] = curr_val
-        return scoring
+            scoring.append(curr_val)
+        return tuple(scoring)
+
+    @property
+    def squares(self):
+        """
+        list of RowSquare: Views of the squares in the row.
+        """
+        return list(self)
 
     def score(self):
         """
@@ -51,9 +117,9 @@ class Row:
         Returns:
         int: The current score of the row.
         """
-        marks = sum([sq.marked for sq in self.squares])
+        marks = self.n_marked
         # Add locking bonus
-        if self.squares[-1].marked:
+        if (self.mask >> (len(self.values) - 1)) & 1:
             marks += 1
 
         return self.scoring[marks]
@@ -74,14 +140,16 @@ class Row:
         Returns:
         Color or None: The color that is locked or None if no color is locked.
         """
-        if self.squares[-1].marked:
-            return self.squares[-1].color
+        if (self.mask >> (len(self.values) - 1)) & 1:
+            return self.colors[-1]
         else:
             return None
     
     def mark(self, index):
         """
-        Implements marking rules for a square in the row.
+        Implements marking rules for a square in the row. Marking the last square
+        raises a lock event through `on_lock`; the color itself is locked when the
+        game resolves the event.
 
         Parameters:
         index (int): The index of the square to mark.
@@ -89,21 +157,101 @@ class Row:
         Returns:
         bool: True if marking is successful, False otherwise.
         """
-        marks = [sq.marked for sq in self.squares]
         # Do not allow marking a locked color
-        if self.squares[index].color in self.locked_colors:
+        if self.colors[index] in self.locked_colors:
             return False
         # Do not allow marking on or to the left of other marks
-        if True in marks[index:]:
+        if index <= self.rightmost:
             return False
         # Do not allow locking with less than self.lock_min marks
-        if (index == len(self.squares)-1) and (sum(marks) < self.lock_min):
+        if (index == len(self.values)-1) and (self.n_marked < self.lock_min):
             return False
         
         # Otherwise, proceed with the mark
-        self.squares[index].mark()
+        marks = self.n_marked
+        self.mask |= 1 << index
+        self.rightmost = index
+        self.n_marked = marks + 1
+        self.zobrist ^= self.keys[index]
+        if index == len(self.values) - 1:
+            # Marking the last square also earns the locking bonus
+            if self.board is not None:
+                self.board.current_score += self.scoring[marks + 2] - self.scoring[marks]
+            if self.on_lock is not None:
+                self.on_lock(self.colors[index])
+        elif self.board is not None:
+            self.board.current_score += self.scoring[marks + 1] - self.scoring[marks]
         return True
 
+    def unmark(self, index, rightmost):
+        """
+        Undoes the most recent mark of the row, for search that explores moves in place.
+
+        Parameters:
+        index (int): The index of the square to unmark; must be the row's rightmost mark.
+        rightmost (int): The rightmost marked index from before that mark, or -1.
+        """
+        marks = self.n_marked - 1
+        self.mask &= ~(1 << index)
+        self.rightmost = rightmost
+        self.n_marked = marks
+        self.zobrist ^= self.keys[index]
+        if self.board is not None:
+            gained = 2 if index == len(self.values) - 1 else 1
+            self.board.current_score -= self.scoring[marks + gained] - self.scoring[marks]
+
+    def set_mark(self, index):
+        """
+        Marks a square without applying any marking rules.
+
+        Parameters:
+        index (int): The index of the square to mark.
+        """
+        if not (self.mask >> index) & 1:
+            before = self.score()
+            self.mask |= 1 << index
+            self.n_marked += 1
+            self.rightmost = max(self.rightmost, index)
+            self.zobrist ^= self.keys[index]
+            self._report_score(before)
+
+    def clear_mark(self, index):
+        """
+        Unmarks a square without applying any marking rules.
+
+        Parameters:
+        index (int): The index of the square to unmark.
+        """
+        if (self.mask >> index) & 1:
+            before = self.score()
+            self.mask &= ~(1 << index)
+            self.n_marked -= 1
+            self.rightmost = self.mask.bit_length() - 1
+            self.zobrist ^= self.keys[index]
+            self._report_score(before)
+
+    def load_mask(self, mask):
+        """
+        Replaces the row's marks with a bitmask, such as one saved from `mask`.
+
+        Parameters:
+        mask (int): Bit `i` is set if square `i` is marked.
+        """
+        before = self.score()
+        self.mask = mask
+        self.rightmost = mask.bit_length() - 1
+        self.n_marked = mask.bit_count()
+        self.zobrist = 0
+        for index in range(mask.bit_length()):
+            if (mask >> index) & 1:
+                self.zobrist ^= self.keys[index]
+        self._report_score(before)
+
+    def _report_score(self, before):
+        # Adds the change of the row's score since `before` to its board's score
+        if self.board is not None:
+            self.board.current_score += self.score() - before
+
     def __len__(self):
         """
         Returns the number of squares in the row.
@@ -111,28 +259,32 @@ class Row:
         Returns:
         int: The number of squares in the row.
         """
-        return len(self.squares)
+        return len(self.values)
     
     def __iter__(self):
         """
         Returns an iterator over the squares in the row.
 
         Returns:
-        iterator: An iterator over the squares in the row.
+        iterator: An iterator over RowSquare views of the squares in the row.
         """
-        return iter(self.squares)
+        return (RowSquare(self, index) for index in range(len(self.values)))
     
     def __getitem__(self, index):
         """
         Returns the square at the specified index in the row.
 
         Parameters:
-        index (int): The index of the square to retrieve.
+        index (int): The index of the square to retrieve. Negative indices count from the end.
 
         Returns:
-        Square: The square at the specified index.
+        RowSquare: A view of the square at the specified index.
         """
-        return self.squares[index]
+        if index < 0:
+            index += len(self.values)
+        if not 0 <= index < len(self.values):
+            raise IndexError("Row index out of range")
+        return RowSquare(self, index)
     
 
     def term_rep(self, sq_width=6):
@@ -145,26 +297,12 @@ class Row:
         Returns:
         str: A terminal-friendly string representation of the row.
         """
-        text = ""
-        row_len = len(self)
-        # Display each square
-        for square in self.squares:
-            text += ansi_center(square.term_rep(), sq_width)
-        
-        # Display lock icon
-        lock_icon = Color.color_text(self.squares[-1].color, "L")
-        if self.squares[-1].marked: 
-            text += strikethrough(lock_icon)
-        else:
-            text += lock_icon
-        
-        return text
+        return row_term_rep(self.colors, self.values, self.mask, sq_width)
 
     def __str__(self): 
         """
-        Returns a string representation of the row.
-
-        TODO: Implement crossing out for marked squares.
+        Returns a string representation of the row. Crossed out squares,
+        and the lock once the row is locked, show "x" in place of the color.
 
         Returns:
         str: A string representation of the row.
@@ -173,10 +311,40 @@ class Row:
         sq_size = 4
         row_len = len(self)
         # Display each square
-        for square in self.squares:
+        for square in self:
             text += str(square).ljust(sq_size)
         
         # Display lock icon
-        text += str(self.squares[-1].color) + "L"
+        text += ("x" if self.what_is_locked() else str(self.colors[-1])) + "L"
         
         return text  
+
+
+@lru_cache(maxsize=4096)
+def row_term_rep(colors, values, mask, sq_width=6):
+    """
+    Returns the colored terminal representation of a row in a given state. Cached
+    by state, so an unchanged row is never rebuilt.
+
+    Parameters:
+    colors (tuple of Color): The color of each square.
+    values (tuple of int): The dice sum of each square.
+    mask (int): Bit `i` is set if square `i` is marked.
+    sq_width (int): The width of each square representation. Default is 6.
+
+    Returns:
+    str: A terminal-friendly string representation of the row.
+    """
+    text = ""
+    # Display each square
+    for index, (color, value) in enumerate(zip(colors, values)):
+        text += ansi_center(square_term_rep(color, value, bool(mask >> index & 1)), sq_width)
+
+    # Display lock icon, struck through once the last square is marked
+    lock_icon = Color.color_text(colors[-1], "L")
+    if mask >> (len(values) - 1) & 1:
+        text += strikethrough(lock_icon)
+    else:
+        text += lock_icon
+
+    return text
@@ -0,0 +1,267 @@
+from layout import standard_layout
+from itertools import product
+import mmap
+import struct
+
+# File format: MAGIC, the _HEADER fields, zero padding to _DATA_OFFSET, then native
+# doubles indexed as [row][rightmost + 1][marks][locked][field], where field 0 is the
+# expected final row score and field 1 the probability the row ends up locked.
+MAGIC = b"QWXR\x01"
+_HEADER = struct.Struct("<dBBBB")  # end_probability, n_players, max_skip, n_rows, width
+_DATA_OFFSET = 24
+_FIELDS = 2
+
+# Chance that the game ends after any given turn. Greedy two-player games last
+# about 28 turns, so their length is modelled as geometric with this mean.
+DEFAULT_END_PROBABILITY = 1 / 28
+
+
+def row_values(values, scoring, lock_min=5, n_players=2,
+               end_probability=DEFAULT_END_PROBABILITY, max_skip=1):
+    """
+    Computes the expected final score and lock probability of every state of one row,
+    with the row played alone against the dice by a reference policy.
+
+    Each turn the row may take the white sum, and with chance 1 / `n_players` (when
+    its owner is the active player) either white die plus its colored die instead.
+    Like `strategies.greedy_strategy`, the policy marks the offered square that skips
+    the fewest unmarked squares, if it skips at most `max_skip`. After every turn the
+    game ends with chance `end_probability`.
+
+    Parameters:
+    values (tuple of int): The dice sum of each square in the row.
+    scoring (tuple of int): The scoring table, from `Row.default_metric`.
+    lock_min (int): Marks needed before the last square can be marked. Default is 5.
+    n_players (int): Number of players sharing the dice. Default is 2.
+    end_probability (float): Chance the game ends after each turn. Default is
+        `DEFAULT_END_PROBABILITY`.
+    max_skip (int): Largest skip the policy accepts. Default is 1.
+
+    Returns:
+    dict: Maps (rightmost, marks, locked) to (expected score, lock probability), for
+        every reachable state.
+    """
+    last = len(values) - 1
+    columns = {value: col_index for col_index, value in enumerate(values)}
+    active = 1 / n_players
+
+    # The squares each roll of the two white dice and the row's die offers
+    offers = []
+    for w1, w2, c in product(range(1, 7), repeat=3):
+        white = columns.get(w1 + w2, -1)
+        offers.append((white, (white, columns.get(w1 + c, -1), columns.get(w2 + c, -1))))
+
+    def choose(rightmost, marks, cols):
+        best = None
+        for col in cols:
+            if col > rightmost and (col != last or marks >= lock_min):
+                if best is None or col < best:
+                    best = col
+        if best is not None and best - rightmost - 1 <= max_skip:
+            return best
+        return None
+
+    table = {}
+    for rightmost in range(last, -2, -1):
+        for marks in range(0, rightmost + 2):
+            if rightmost >= 0 and marks == 0:
+                continue
+            score = scoring[marks + (rightmost == last)]
+            # Locked rows, by this player or another, take no more marks
+            table[(rightmost, marks, True)] = (float(score), 1.0)
+            if rightmost == last:
+                table[(rightmost, marks, False)] = (float(score), 1.0)
+                continue
+
+            stay, expected, locks = 0.0, 0.0, 0.0
+            for white, colored in offers:
+                for cols, weight in ((white,), 1 - active), (colored, active):
+                    weight /= len(offers)
+                    col = choose(rightmost, marks, cols)
+                    if col is None:
+                        stay += weight
+                    else:
+                        next_score, next_lock = table[(col, marks + 1, col == last)]
+                        expected += weight * next_score
+                        locks += weight * next_lock
+            carry = 1 - end_probability
+            table[(rightmost, marks, False)] = (
+                (end_probability * score + carry * expected) / (1 - carry * stay),
+                carry * locks / (1 - carry * stay),
+            )
+    return table
+
+
+def build_row_table(path, layout=None, n_players=2, end_probability=DEFAULT_END_PROBABILITY,
+                    max_skip=1):
+    """
+    Computes the table of every row of a layout with `row_values` and writes it to disk.
+
+    Parameters:
+    path (str): The file to write.
+    layout (BoardLayout): The rows to evaluate. Default is `standard_layout()`.
+    n_players (int): Number of players sharing the dice. Default is 2.
+    end_probability (float): Chance the game ends after each turn.
+    max_skip (int): Largest skip the reference policy accepts. Default is 1.
+
+    Returns:
+    RowTable: The written table, memory-mapped.
+    """
+    layout = layout if layout is not None else standard_layout()
+    width = max(len(values) for values in layout.values)
+    data = [0.0] * (layout.n_rows() * (width + 1) * (width + 1) * 2 * _FIELDS)
+    for row_index, values in enumerate(layout.values):
+        for (rightmost, marks, locked), fields in row_values(
+                values, layout.scoring, 5, n_players, end_probability, max_skip).items():
+            index = _index(width, row_index, rightmost, marks, locked)
+            data[index:index + _FIELDS] = fields
+
+    with open(path, "wb") as f:
+        header = MAGIC + _HEADER.pack(end_probability, n_players, max_skip,
+                                      layout.n_rows(), width)
+        f.write(header.ljust(_DATA_OFFSET, b"\0"))
+        f.write(struct.pack(f"={len(data)}d", *data))
+    return RowTable(path)
+
+
+def _index(width, row_index, rightmost, marks, locked):
+    return (((row_index * (width + 1) + rightmost + 1) * (width + 1) + marks) * 2
+            + locked) * _FIELDS
+
+
+class RowTable:
+    """
+    A row expected-value table written by `build_row_table`, memory-mapped from disk.
+
+    Every lookup is a single index into the mapped doubles, so heuristic strategies
+    can value a candidate mark without simulating the rest of the game.
+
+    Attributes:
+        path (str): The table's file.
+        end_probability (float): The game-end chance the table was built with.
+        n_players (int): The number of players the table was built for.
+        max_skip (int): The reference policy's largest skip.
+    """
+    def __init__(self, path):
+        """
+        Opens a table.
+
+        Parameters:
+        path (str): The file written by `build_row_table`.
+
+        Raises:
+        ValueError: If the file is not a row table.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a row table.")
+        (self.end_probability, self.n_players, self.max_skip,
+         self._n_rows, self._width) = _HEADER.unpack_from(self._map, len(MAGIC))
+        self._data = memoryview(self._map)[_DATA_OFFSET:].cast("d")
+
+    def expected(self, row_index, rightmost, marks, locked=False):
+        """
+        Returns the expected final score of a row.
+
+        Parameters:
+        row_index (int): Index of the row.
+        rightmost (int): Column of the rightmost mark, or -1 if unmarked.
+        marks (int): Number of marks.
+        locked (bool): Whether the row's color is locked. Default is False.
+
+        Returns:
+        float: The expected score of the row when the game ends.
+        """
+        return self._data[_index(self._width, row_index, rightmost, marks, locked)]
+
+    def lock_probability(self, row_index, rightmost, marks, locked=False):
+        """
+        Returns the probability that a row ends the game locked. See `expected`.
+
+        Returns:
+        float: The probability, which is 1 for a locked row.
+        """
+        return self._data[_index(self._width, row_index, rightmost, marks, locked) + 1]
+
+    def row_expected(self, board, row_index):
+        """
+        Returns the expected final score of one row of a board.
+
+        Parameters:
+        board (Board or BitBoard): The board.
+        row_index (int): Index of the row.
+
+        Returns:
+        float: The expected score of the row.
+        """
+        locked = board.layout.colors[row_index] in board.locked_colors
+        return self._data[_index(self._width, row_index, board.last_marked(row_index),
+                                 board.n_marked(row_index), locked)]
+
+    def mark_gain(self, board, row_index, col_index):
+        """
+        Returns how much marking a square changes the expected final score of its row.
+        Does not check that the mark is valid.
+
+        Parameters:
+        board (Board or BitBoard): The board.
+        row_index (int): Index of the row containing the square.
+        col_index (int): Index of the square within the row.
+
+        Returns:
+        float: The change in expected row score.
+        """
+        locks = col_index == len(board.layout.values[row_index]) - 1
+        after = self._data[_index(self._width, row_index, col_index,
+                                  board.n_marked(row_index) + 1, locks)]
+        return after - self.row_expected(board, row_index)
+
+    def close(self):
+        """
+        Releases the memory map.
+        """
+        if self._map is not None:
+            self._data.release()
+            self._map.close()
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RowTableStrategy:
+    """
+    A strategy that marks the placement with the largest `RowTable.mark_gain`, if
+    the gain is positive. Passing on the color roll after passing on the white roll
+    costs the penalty, so then any mark worth more than that is taken.
+
+    Attributes:
+        table (RowTable): The row values.
+        penalty (int): Points lost per penalty. Default is 5.
+    """
+    def __init__(self, table, penalty=5):
+        self.table = table
+        self.penalty = penalty
+
+    def __call__(self, game, player, placements, white_turn):
+        """
+        Decides one move.
+
+        Returns:
+        tuple or None: The chosen placement, or None to pass.
+        """
+        board = player.board
+        best, best_gain = None, 0.0
+        if not white_turn and game.active_player is player and game.white_passed:
+            best_gain = -self.penalty
+        for (row_index, col_index) in placements:
+            gain = self.table.mark_gain(board, row_index, col_index)
+            if gain > best_gain:
+                best, best_gain = (row_index, col_index), gain
+        return best
@@ -0,0 +1,417 @@
+from layout import standard_layout
+from bisect import bisect_right
+import dbm
+import struct
+
+# How each memoized value is stored on disk
+_VALUE = struct.Struct("<d")
+# Disk key recording the rules a memo was solved under
+_CONFIG_KEY = b"config"
+# Part of those rules; raised whenever the solved values change, so older memos
+# are refused rather than resumed
+_RULES_VERSION = 2
+
+
+class DiskMemo:
+    """
+    Memoized state values that spill from RAM to a `dbm` database on disk.
+
+    Values are kept in a dict until it holds `max_entries`, then written to the
+    database and dropped from RAM. A memo opened on an existing database sees every
+    value spilled to it before, so an interrupted solve picks up where it stopped.
+
+    Attributes:
+        path (str): The database, or None to keep everything in RAM.
+        max_entries (int): Values to hold in RAM before spilling.
+        spills (int): Number of times values were spilled to disk.
+    """
+    def __init__(self, path=None, max_entries=1 << 20, config=b""):
+        """
+        Opens a memo, creating its database if needed.
+
+        Parameters:
+        path (str): The database file, or None for RAM only. Default is None.
+        max_entries (int): Values to hold in RAM before spilling. Default is 1,048,576.
+        config (bytes): Describes what the values are for. Default is empty.
+
+        Raises:
+        ValueError: If the database was made with a different `config`.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.spills = 0
+        self._ram = {}
+        self._disk = None
+        if path is not None:
+            self._disk = dbm.open(path, "c")
+            saved = self._disk.get(_CONFIG_KEY)
+            if saved is None:
+                self._disk[_CONFIG_KEY] = config
+            elif saved != config:
+                self._disk.close()
+                raise ValueError(f"{path} was solved for other rules: {saved!r}.")
+
+    def get(self, key):
+        """
+        Looks up a value.
+
+        Parameters:
+        key (bytes): The encoded state.
+
+        Returns:
+        float or None: The value, or None if it has not been stored.
+        """
+        value = self._ram.get(key)
+        if value is None and self._disk is not None:
+            raw = self._disk.get(key)
+            if raw is not None:
+                value = _VALUE.unpack(raw)[0]
+        return value
+
+    def __setitem__(self, key, value):
+        self._ram[key] = value
+        if len(self._ram) >= self.max_entries and self._disk is not None:
+            self.spill()
+
+    def __len__(self):
+        # Entries in RAM, and on disk less the config record; spilled keys are never in both
+        return len(self._ram) + (len(self._disk) - 1 if self._disk is not None else 0)
+
+    def spill(self):
+        """
+        Writes the values held in RAM to disk and frees them.
+        """
+        if self._disk is None or not self._ram:
+            return
+        for key, value in self._ram.items():
+            self._disk[key] = _VALUE.pack(value)
+        self._ram.clear()
+        self.spills += 1
+        if hasattr(self._disk, "sync"):
+            self._disk.sync()
+
+    def close(self):
+        """
+        Spills what is left and closes the database.
+        """
+        if self._disk is not None:
+            self.spill()
+            self._disk.close()
+            self._disk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# The 21 unordered rolls of the white dice, with their probabilities
+_WHITE_PAIRS = tuple((w1, w2, (1 if w1 == w2 else 2) / 36)
+                     for w1 in range(1, 7) for w2 in range(w1, 7))
+
+
+def _expected_max(floor, rows):
+    # E[max(floor, x_1, ..., x_k)] for independent x_i, each uniform over six values
+    # of at least `floor`, from the product of their CDFs
+    rows = [sorted(values) for values in rows if max(values) > floor]
+    levels = sorted({value for values in rows for value in values if value > floor})
+    total = 0.0
+    below = 0.0
+    for level in [floor] + levels:
+        cdf = 1.0
+        for values in rows:
+            cdf *= bisect_right(values, level) / 6
+        total += level * (cdf - below)
+        below = cdf
+    return total
+
+
+class SoloSolver:
+    """
+    Finds the expected-score-maximizing policy for solo Qwixx: one board against the
+    dice, where every turn the player may mark the white sum, then one white die plus
+    a colored die, and takes a penalty if they mark neither. The game ends after the
+    turn that brings the penalties or the locked rows to their limits, as in
+    `Board.get_state`.
+
+    States are compact tuples, (rightmost, marks) for each row then the penalty count.
+    Every turn marks a square or adds a penalty, so no state repeats and the values
+    follow by memoized recursion over the exact roll distribution. Rather than list
+    the joint rolls of all six dice, a state's value is taken over the 21 rolls of
+    the white dice; given those, each row's options depend only on its own colored
+    die, so the best move is the maximum of independent per-row values, whose
+    expectation is exact from the product of their distributions.
+
+    Attributes:
+        layout (BoardLayout): The board's rows, each with its own colored die.
+        lock_min (int): Marks needed before a row's last square can be marked.
+        penalties_to_end (int): Penalties that end the game.
+        locks_to_end (int): Locked rows that end the game.
+        penalty_val (int): Points lost per penalty.
+        memo (DiskMemo): The solved values.
+        solved (int): Number of states solved by this solver, excluding resumed ones.
+    """
+    def __init__(self, layout=None, lock_min=5, penalties_to_end=4, locks_to_end=2,
+                 penalty_val=5, path=None, max_entries=1 << 20):
+        """
+        Initializes a solver.
+
+        Parameters:
+        layout (BoardLayout): The board's rows. Default is `standard_layout()`.
+        lock_min (int): Marks needed before locking a row. Default is 5.
+        penalties_to_end (int): Penalties that end the game. Default is 4.
+        locks_to_end (int): Locked rows that end the game. Default is 2.
+        penalty_val (int): Points lost per penalty. Default is 5.
+        path (str): Database to keep the memo in, and resume from. Default is RAM only.
+        max_entries (int): Values to hold in RAM before spilling to `path`.
+        """
+        self.layout = layout if layout is not None else standard_layout()
+        self.lock_min = lock_min
+        self.penalties_to_end = penalties_to_end
+        self.locks_to_end = locks_to_end
+        self.penalty_val = penalty_val
+        self.solved = 0
+        self._lasts = tuple(len(values) - 1 for values in self.layout.values)
+        # For each white sum, its column in each row, then for each white roll with
+        # that sum, its probability and for each row the columns offered by each
+        # face of the row's colored die
+        column = self.layout.column
+        rows = range(self.layout.n_rows())
+        self._rolls = tuple(
+            (tuple(column(row_index, total) for row_index in rows),
+             tuple((probability,
+                    tuple(tuple(tuple(sorted({column(row_index, w1 + face),
+                                              column(row_index, w2 + face)} - {-1}))
+                                for face in range(1, 7))
+                          for row_index in rows))
+                   for w1, w2, probability in _WHITE_PAIRS if w1 + w2 == total))
+            for total in range(2, 13)
+        )
+        config = repr((_RULES_VERSION, self.layout.colors, self.layout.values, lock_min,
+                       penalties_to_end, locks_to_end, penalty_val)).encode()
+        self.memo = DiskMemo(path, max_entries, config)
+
+    def start(self):
+        """
+        Returns the state of an empty board.
+
+        Returns:
+        tuple: The start state.
+        """
+        return (-1, 0) * self.layout.n_rows() + (0,)
+
+    def state(self, board):
+        """
+        Returns the solver state of a board with this solver's layout.
+
+        Parameters:
+        board (Board or BitBoard): The board.
+
+        Returns:
+        tuple: The board's state.
+        """
+        state = []
+        for row_index in range(self.layout.n_rows()):
+            state += [board.last_marked(row_index), board.n_marked(row_index)]
+        return tuple(state) + (board.penalties,)
+
+    def options(self, white, colored):
+        """
+        Returns the squares a roll offers, in the form `best_moves` takes.
+
+        Parameters:
+        white (int): The sum of the white dice.
+        colored (list of list of int): For each row, the sums of either white die
+            and the row's colored die.
+
+        Returns:
+        tuple: The white sum's column in each row, and each row's colored columns.
+        """
+        white_cols = tuple(self.layout.column(row_index, white)
+                           for row_index in range(self.layout.n_rows()))
+        colored_cols = tuple(tuple(sorted({self.layout.column(row_index, value)
+                                           for value in values} - {-1}))
+                             for row_index, values in enumerate(colored))
+        return white_cols, colored_cols
+
+    def score(self, state):
+        """
+        Returns the score of a state.
+
+        Returns:
+        int: The board's score.
+        """
+        scoring = self.layout.scoring
+        total = -self.penalty_val * state[-1]
+        for row_index, last in enumerate(self._lasts):
+            rightmost, marks = state[2 * row_index], state[2 * row_index + 1]
+            total += scoring[marks + (rightmost == last)]
+        return total
+
+    def finished(self, state):
+        """
+        Checks whether the game is over in a state.
+
+        Returns:
+        bool: True if the penalties or locked rows have reached their limit.
+        """
+        if state[-1] >= self.penalties_to_end:
+            return True
+        locked = sum(state[2 * row_index] == last for row_index, last in enumerate(self._lasts))
+        return locked >= self.locks_to_end
+
+    def mark(self, state, row_index, col_index):
+        """
+        Returns the state after marking a square.
+
+        Parameters:
+        state (tuple): The state before the mark.
+        row_index (int): Index of the row.
+        col_index (int): Index of the square, or -1 for none.
+
+        Returns:
+        tuple or None: The new state, or None if the mark is not allowed.
+        """
+        rightmost, marks = state[2 * row_index], state[2 * row_index + 1]
+        last = self._lasts[row_index]
+        if col_index < 0 or col_index <= rightmost or rightmost == last:
+            return None
+        if col_index == last and marks < self.lock_min:
+            return None
+        state = list(state)
+        state[2 * row_index] = col_index
+        state[2 * row_index + 1] = marks + 1
+        return tuple(state)
+
+    def _key(self, state):
+        return bytes(value + 1 for value in state)
+
+    def best_moves(self, state, white_cols, colored):
+        """
+        Finds the optimal decisions for one roll.
+
+        Parameters:
+        state (tuple): The state before the roll.
+        white_cols (tuple of int): The white sum's column in each row, or -1.
+        colored (tuple of tuple of int): The columns each row's colored sums offer.
+
+        Returns:
+        tuple: The expected final score, the white mark as (row, col) or None, and
+            the colored mark as (row, col) or None.
+        """
+        # Passing both decisions costs a penalty
+        penalized = state[:-1] + (state[-1] + 1,)
+        best = (self.value(penalized), None, None)
+
+        white_moves = [(None, state)]
+        for row_index, col_index in enumerate(white_cols):
+            after = self.mark(state, row_index, col_index)
+            if after is not None:
+                white_moves.append(((row_index, col_index), after))
+
+        for white_move, after_white in white_moves:
+            if white_move is not None:
+                value = self.value(after_white)
+                if value > best[0]:
+                    best = (value, white_move, None)
+                # A white mark that ends the game ends the turn too
+                if self.finished(after_white):
+                    continue
+            for row_index, cols in enumerate(colored):
+                for col_index in cols:
+                    after = self.mark(after_white, row_index, col_index)
+                    if after is not None:
+                        value = self.value(after)
+                        if value > best[0]:
+                            best = (value, white_move, (row_index, col_index))
+        return best
+
+    def _sum_value(self, state, white_cols, rolls):
+        # The expected score of the best decisions for the white rolls of one sum,
+        # weighted by their probabilities, over the rows' colored dice.
+        # Marking nothing costs a penalty; a white mark alone may do better
+        floor = self.value(state[:-1] + (state[-1] + 1,))
+        starts = [state]
+        for row_index, col_index in enumerate(white_cols):
+            after = self.mark(state, row_index, col_index)
+            if after is not None:
+                floor = max(floor, self.value(after))
+                # A white mark that ends the game ends the turn too
+                if not self.finished(after):
+                    starts.append(after)
+
+        # The best score after marking each (row, col), after any white mark
+        marked = {}
+        total = 0.0
+        for probability, faces in rolls:
+            rows = []
+            for row_index, row_faces in enumerate(faces):
+                values = []
+                for cols in row_faces:
+                    best = floor
+                    for col_index in cols:
+                        value = marked.get((row_index, col_index))
+                        if value is None:
+                            value = floor
+                            for start in starts:
+                                after = self.mark(start, row_index, col_index)
+                                if after is not None:
+                                    after_value = self.value(after)
+                                    if after_value > value:
+                                        value = after_value
+                            marked[row_index, col_index] = value
+                        if value > best:
+                            best = value
+                    values.append(best)
+                rows.append(values)
+            total += probability * _expected_max(floor, rows)
+        return total
+
+    def value(self, state):
+        """
+        Returns the expected final score of a state under optimal play, solving
+        it and every state it can reach if they are not memoized yet.
+
+        Parameters:
+        state (tuple): The state.
+
+        Returns:
+        float: The expected final score.
+        """
+        if self.finished(state):
+            return float(self.score(state))
+        key = self._key(state)
+        value = self.memo.get(key)
+        if value is None:
+            value = 0.0
+            for white_cols, rolls in self._rolls:
+                value += self._sum_value(state, white_cols, rolls)
+            self.memo[key] = value
+            self.solved += 1
+        return value
+
+    def solve(self):
+        """
+        Solves every state reachable from an empty board. If interrupted, the states
+        solved so far are saved, and a solver opened on the same `path` resumes.
+
+        Returns:
+        float: The expected final score of optimal solo play.
+        """
+        try:
+            return self.value(self.start())
+        finally:
+            self.memo.spill()
+
+    def close(self):
+        """
+        Saves and closes the memo.
+        """
+        self.memo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,5 +1,28 @@
 from color import Color
 from utils import strikethrough
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def square_term_rep(color, value, marked, border="·"):
+    """
+    Returns the colored terminal representation of a square in a given state.
+    Cached, since a board only ever shows a few hundred distinct squares.
+
+    Parameters:
+    color (Color): The color of the square.
+    value (int): The dice sum of the square.
+    marked (bool): Whether the square is crossed out.
+    border (str): The character on either side of the value. Default is "·".
+
+    Returns:
+    str: The square, colored with ANSI escape sequences.
+    """
+    text = Color.color_text(color, str(border) + str(value) + str(border))
+    if marked:
+        text = strikethrough(text)
+    return text
+
 
 class Square:
     """ 
@@ -10,6 +33,8 @@ class Square:
         value (int): The dice sum required to mark this square
         marked (bool): If true, the square is marked.
     """
+    __slots__ = ("color", "value", "marked")
+
     def __init__(self, color, value):
         self.color = color
         self.value = value
@@ -18,19 +43,59 @@ class Square:
     def mark(self):
         if self.marked: raise(RuntimeError("Square already marked"))
         self.marked = True
+
+    def unmark(self):
+        self.marked = False
     
     def term_rep(self, border="·"):
         """
         A colored representation using ANSI escape sequences for terminals.
         """
-        text = Color.color_text(
-            self.color,
-            str(border) + str(self.value) + str(border)
-        )
-        if self.marked:
-            text = strikethrough(text)
-        return text
+        return square_term_rep(self.color, self.value, self.marked, border)
     
-    # TODO: Doesn't implement crossing out
     def __str__(self):
-        return (str(self.color) + str(self.value))
+        """
+        A plain representation: color letter and value, with the letter replaced
+        by "x" once the square is crossed out.
+        """
+        prefix = "x" if self.marked else str(self.color)
+        return (prefix + str(self.value))
+
+
+class RowSquare:
+    """
+    A square of a Row. Rows share their colors and values through the board layout
+    and keep their marks in a bitmask, so a RowSquare is a short-lived view that
+    reads and writes the mark stored in its row.
+
+    Attributes:
+        row (Row): The row holding the square.
+        index (int): The index of the square within the row.
+    """
+    __slots__ = ("row", "index")
+
+    def __init__(self, row, index):
+        self.row = row
+        self.index = index
+
+    @property
+    def color(self):
+        return self.row.colors[self.index]
+
+    @property
+    def value(self):
+        return self.row.values[self.index]
+
+    @property
+    def marked(self):
+        return bool((self.row.mask >> self.index) & 1)
+
+    def mark(self):
+        if self.marked: raise(RuntimeError("Square already marked"))
+        self.row.set_mark(self.index)
+
+    def unmark(self):
+        self.row.clear_mark(self.index)
+
+    term_rep = Square.term_rep
+    __str__ = Square.__str__
@@ -0,0 +1,64 @@
+"""
+Strategies for headless Qwixx games.
+
+A strategy is a callable `strategy(game, player, placements, white_turn)` that
+returns one (row_index, col_index) tuple from `placements`, or None to pass.
+`game.active_player` is the player whose turn it is, and during that player's
+color decision `game.white_passed` tells whether they passed on the white roll.
+Strategies that need randomness draw from `game.strategy_rng`, so seeded games replay
+exactly and their draws never change the dice.
+"""
+from decision_service import LinearModel
+
+def pass_strategy(game, player, placements, white_turn):
+    """
+    Never marks a square.
+
+    Returns:
+    None: Always passes.
+    """
+    return None
+
+def random_strategy(game, player, placements, white_turn):
+    """
+    Marks a uniformly random placement, or passes, with equal weight.
+
+    Returns:
+    tuple or None: The chosen placement, or None to pass.
+    """
+    return game.strategy_rng.choice(placements + [None])
+
+def greedy_strategy(game, player, placements, white_turn, max_skip=1):
+    """
+    Marks the placement that skips the fewest unmarked squares, if it skips at most
+    `max_skip` squares. The active player always marks something on the color roll
+    rather than take a penalty.
+
+    Parameters:
+    max_skip (int): The largest number of squares to skip voluntarily. Default is 1.
+
+    Returns:
+    tuple or None: The chosen placement, or None to pass.
+    """
+    best = None
+    best_skip = None
+    for (row_index, col_index) in placements:
+        skip = col_index - player.board.last_marked(row_index) - 1
+        if best is None or skip < best_skip:
+            best, best_skip = (row_index, col_index), skip
+
+    if best is None:
+        return None
+    if best_skip <= max_skip:
+        return best
+    # Avoid a penalty when the white roll was already passed
+    if game.active_player is player and not white_turn and game.white_passed:
+        return best
+    return None
+
+STRATEGIES = {
+    "pass": pass_strategy,
+    "random": random_strategy,
+    "greedy": greedy_strategy,
+    "linear": LinearModel(),
+}
@@ -0,0 +1,244 @@
+from board import Board
+from board import BoardState
+from bitboard import BitBoard
+from dice import game_rng
+from metrics import Metrics
+from qwixx_sim import QwixxSim
+from strategies import STRATEGIES
+from collections import Counter
+from fractions import Fraction
+from multiprocessing import Pool
+import argparse
+import math
+import os
+
+BOARD_TYPES = {
+    "board": Board,
+    "bitboard": BitBoard,
+}
+
+
+class TournamentResult:
+    """
+    Merged statistics of many headless games between the same seats.
+
+    Attributes:
+        strategies (list of str): The strategy name of each seat.
+        games (int): Number of games played.
+        wins (list of Fraction): Wins of each seat. A tie splits one win between the tied
+            seats. Fractions keep the sums exact, so they do not depend on the order
+            in which games and shards are added.
+        scores (list of Counter): For each seat, a count of games by final score.
+        lengths (Counter): A count of games by number of turns.
+        endings (Counter): A count of games by the BoardState that ended them.
+        metrics (Metrics): Turn phase measurements of the games, or None if not collected.
+    """
+    def __init__(self, strategies, metrics=None):
+        self.strategies = list(strategies)
+        self.games = 0
+        self.wins = [Fraction(0) for s in self.strategies]
+        self.scores = [Counter() for s in self.strategies]
+        self.lengths = Counter()
+        self.endings = Counter()
+        self.metrics = metrics
+
+    def add(self, result):
+        """
+        Adds one game to the statistics.
+
+        Parameters:
+        result (GameResult): The outcome of a game, with players in seat order.
+        """
+        self.games += 1
+        for seat in result.winners:
+            self.wins[seat] += Fraction(1, len(result.winners))
+        for seat, score in enumerate(result.scores):
+            self.scores[seat][score] += 1
+        self.lengths[result.turns] += 1
+        self.endings[result.end_state] += 1
+
+    def merge(self, other):
+        """
+        Adds the statistics of another result for the same seats.
+
+        Parameters:
+        other (TournamentResult): The result to merge in.
+
+        Returns:
+        TournamentResult: This result, updated.
+        """
+        if other.strategies != self.strategies:
+            raise ValueError("Cannot merge results for different seats.")
+        self.games += other.games
+        for seat in range(len(self.strategies)):
+            self.wins[seat] += other.wins[seat]
+            self.scores[seat].update(other.scores[seat])
+        self.lengths.update(other.lengths)
+        self.endings.update(other.endings)
+        if other.metrics is not None:
+            self.metrics = (self.metrics or Metrics()).merge(other.metrics)
+        return self
+
+    def win_rate(self, seat):
+        """
+        Returns a seat's win rate and the half-width of its 95% confidence interval.
+
+        Parameters:
+        seat (int): The seat to report.
+
+        Returns:
+        tuple: (win rate, confidence half-width).
+        """
+        if self.games == 0:
+            return (0.0, 0.0)
+        p = float(self.wins[seat] / self.games)
+        return (p, 1.96 * math.sqrt(p * (1 - p) / self.games))
+
+    def mean_score(self, seat):
+        """
+        Returns a seat's mean final score.
+
+        Parameters:
+        seat (int): The seat to report.
+
+        Returns:
+        float: The mean score, or 0.0 if no games were played.
+        """
+        if self.games == 0:
+            return 0.0
+        return sum(score * n for score, n in self.scores[seat].items()) / self.games
+
+    def mean_length(self):
+        """
+        Returns the mean number of turns per game.
+
+        Returns:
+        float: The mean game length, or 0.0 if no games were played.
+        """
+        if self.games == 0:
+            return 0.0
+        return sum(turns * n for turns, n in self.lengths.items()) / self.games
+
+    def __str__(self):
+        """
+        Returns a text summary of the tournament.
+
+        Returns:
+        str: Win rates, mean scores, mean game length and endings.
+        """
+        lines = [f"{self.games} games"]
+        for seat, strategy in enumerate(self.strategies):
+            p, half_width = self.win_rate(seat)
+            lines.append(f"  seat {seat + 1} ({strategy}): win rate {p:.4f} ± {half_width:.4f}, "
+                         f"mean score {self.mean_score(seat):.2f}")
+        lines.append(f"  mean length {self.mean_length():.2f} turns")
+        for state in BoardState:
+            if state != BoardState.CONTINUE:
+                lines.append(f"  ended by {state.name}: {self.endings[state]}")
+        return "\n".join(lines)
+
+
+def play_shard(shard):
+    """
+    Plays a contiguous range of games of a seeded run. Runs in worker processes.
+
+    Parameters:
+    shard (tuple): (strategy names, board type name, master seed, first game index, stop index,
+        whether to collect metrics).
+
+    Returns:
+    TournamentResult: The statistics of the games in the range.
+    """
+    strategies, board_name, seed, start, stop, collect_metrics = shard
+    names = [f"{seat + 1}:{strategy}" for seat, strategy in enumerate(strategies)]
+    callables = [STRATEGIES[strategy] for strategy in strategies]
+    board_type = BOARD_TYPES[board_name]
+
+    result = TournamentResult(strategies, Metrics() if collect_metrics else None)
+    for game_index in range(start, stop):
+        game = QwixxSim(names, callables, board_type, game_rng(seed, game_index),
+                        metrics=result.metrics)
+        result.add(game.play_game())
+    return result
+
+
+def shards(n_games, shard_size):
+    """
+    Splits game indices 0..n_games into contiguous ranges.
+
+    Parameters:
+    n_games (int): Number of games.
+    shard_size (int): Largest number of games per range.
+
+    Returns:
+    list of tuple: (start, stop) index pairs covering every game once.
+    """
+    return [(start, min(start + shard_size, n_games))
+            for start in range(0, n_games, shard_size)]
+
+
+def simulate(strategies, n_games, seed=0, processes=None, board="bitboard", shard_size=None,
+             metrics=False):
+    """
+    Plays `n_games` headless games between the given strategies across a process pool.
+
+    Game `i` always uses `game_rng(seed, i)`, so the merged result depends only on
+    the seed and the number of games, not on the number of processes.
+
+    Parameters:
+    strategies (list of str): Names from `strategies.STRATEGIES`, one per seat.
+    n_games (int): Number of games to play.
+    seed (int): The master seed. Default is 0.
+    processes (int): Number of worker processes. Default is every core; 1 runs in-process.
+    board (str): The board backend, "board" or "bitboard". Default is "bitboard".
+    shard_size (int): Games per work unit. Default splits the run into about 4 units per process.
+    metrics (bool): Whether to time the turn phases into `TournamentResult.metrics`.
+        Default is False.
+
+    Returns:
+    TournamentResult: The merged statistics.
+    """
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}. Choose from {sorted(STRATEGIES)}.")
+    if board not in BOARD_TYPES:
+        raise ValueError(f"Unknown board {board!r}. Choose from {sorted(BOARD_TYPES)}.")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, math.ceil(n_games / (4 * processes)))
+
+    work = [(tuple(strategies), board, seed, start, stop, metrics)
+            for (start, stop) in shards(n_games, shard_size)]
+    result = TournamentResult(strategies, Metrics() if metrics else None)
+    if processes == 1:
+        for shard in work:
+            result.merge(play_shard(shard))
+    else:
+        with Pool(processes) as pool:
+            for shard_result in pool.imap_unordered(play_shard, work):
+                result.merge(shard_result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless Qwixx games between strategies.")
+    parser.add_argument("strategies", nargs="+", choices=sorted(STRATEGIES),
+                        help="one strategy per seat")
+    parser.add_argument("-n", "--games", type=int, default=1000, help="number of games")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="worker processes (default: every core)")
+    parser.add_argument("--board", choices=sorted(BOARD_TYPES), default="bitboard",
+                        help="board backend")
+    parser.add_argument("--metrics", choices=["json", "prometheus"], default=None,
+                        help="also time the turn phases and print them in this format")
+    args = parser.parse_args()
+
+    result = simulate(args.strategies, args.games, args.seed, args.processes, args.board,
+                      metrics=args.metrics is not None)
+    print(result)
+    if args.metrics == "json":
+        print(result.metrics.to_json())
+    elif args.metrics == "prometheus":
+        print(result.metrics.to_prometheus(), end="")
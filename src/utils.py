@@ -1,5 +1,17 @@
 import re
 import os
+import sys
+from functools import lru_cache
+
+# Matches ANSI escape sequences
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+
+# Clears the screen and moves the cursor to the top left corner
+CLEAR_SCREEN = "\033[2J\033[H"
+
+if os.name == 'nt':
+    # Running any command once turns on ANSI escape handling in Windows consoles
+    os.system('')
 
 def strikethrough(text):
     """ 
@@ -105,16 +117,16 @@ def ansi_str_length(text):
     Returns:
     int: The length of the text without ANSI escape sequences.
     """
-    # Regular expression to match ANSI escape sequences
-    ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
     # Remove ANSI escape sequences
-    text_without_ansi = ansi_escape.sub('', text)
+    text_without_ansi = ANSI_ESCAPE.sub('', text)
     # Return the length of the cleaned text
     return len(text_without_ansi)
 
+@lru_cache(maxsize=4096)
 def ansi_center(text, width, spacer=' '):
     """
     Centers text within a specified width, accounting for ANSI escape sequences.
+    Results are cached, since the same lines are centered on every redraw.
 
     Parameters:
     text (str): The input text to be centered.
@@ -128,26 +140,25 @@ def ansi_center(text, width, spacer=' '):
     RuntimeError: If the centering calculation fails.
     """
     # Calculate the padding on each side
-    padding = (width - ansi_str_length(text)) // 2
+    text_length = ansi_str_length(text)
+    padding = (width - text_length) // 2
     spacer_string = spacer * padding
 
     centered = f"{spacer_string}{text}{spacer_string}"
+    centered_length = text_length + 2 * len(spacer_string)
     # If the centering cannot be perfect, length will be one less than it should.
-    if ansi_str_length(centered) == width:
+    if centered_length == width:
         return centered
-    elif ansi_str_length(centered) == width - 1:
+    elif centered_length == width - 1:
         return centered + spacer
     else:
         raise(RuntimeError("Centering failed, system error"))
 
 def clear_terminal():
     """
-    Clears the terminal screen.
+    Clears the terminal screen with an ANSI escape sequence.
 
     Works on both Windows and Unix-like systems.
     """
-    # Check the operating system
-    if os.name == 'nt':  # For Windows
-        os.system('cls')
-    else:  # For Mac and Linux
-        os.system('clear')
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
@@ -0,0 +1,199 @@
+from collections import OrderedDict
+import random
+
+# Zobrist keys: one random 64-bit number per feature of a position, so a position's
+# hash is the XOR of the keys of its features and each change is one XOR.
+# The generator is seeded, so hashes are the same in every process and run.
+_rng = random.Random(0x51577)
+MAX_ROWS = 8
+MAX_COLS = 16
+# SQUARE_KEYS[row][col]: the square is marked
+SQUARE_KEYS = tuple(tuple(_rng.getrandbits(64) for col in range(MAX_COLS))
+                    for row in range(MAX_ROWS))
+# PENALTY_KEYS[n]: the board has n penalties. No penalties hash to 0, so an empty
+# board hashes to 0.
+PENALTY_KEYS = (0,) + tuple(_rng.getrandbits(64) for n in range(1, 256))
+# LOCK_KEYS[row]: the row's color is locked
+LOCK_KEYS = tuple(_rng.getrandbits(64) for row in range(MAX_ROWS))
+# Game keys: SEAT_MULTIPLIERS[seat] scrambles each board's hash, so equal boards in
+# different seats do not cancel out; ACTIVE_KEYS[seat] marks the active player, and
+# DIE_KEYS[die][face] the dice.
+SEAT_MULTIPLIERS = tuple(_rng.getrandbits(64) | 1 for seat in range(8))
+ACTIVE_KEYS = tuple(_rng.getrandbits(64) for seat in range(8))
+DIE_KEYS = tuple(tuple(_rng.getrandbits(64) for face in range(7)) for die in range(6))
+del _rng
+
+_MASK = (1 << 64) - 1
+
+
+def lock_hash(layout, locked_colors):
+    """
+    Returns the part of a board's hash that comes from locked colors. Locks are
+    read from the locked colors set, which every board of a game shares.
+
+    Parameters:
+    layout (BoardLayout): The board's layout.
+    locked_colors (set of Color): The locked colors.
+
+    Returns:
+    int: The XOR of the lock keys of the locked rows.
+    """
+    h = 0
+    for row_index, color in enumerate(layout.colors):
+        if color in locked_colors:
+            h ^= LOCK_KEYS[row_index]
+    return h
+
+
+def game_hash(game):
+    """
+    Returns a 64-bit hash of a game position: every board in its seat, the active
+    player and the dice, as `QwixxGame.encode_state` would encode them apart from
+    the turn count.
+
+    Parameters:
+    game (QwixxGame): The game.
+
+    Returns:
+    int: The hash.
+    """
+    h = 0
+    for seat, player in enumerate(game.players):
+        h ^= (player.board.zobrist_hash() * SEAT_MULTIPLIERS[seat]) & _MASK
+    if game.active_player is not None:
+        h ^= ACTIVE_KEYS[game.seats[game.active_player]]
+    for die_index, die in enumerate(game.dice):
+        h ^= DIE_KEYS[die_index][die.last_roll]
+    return h
+
+
+class TranspositionTable:
+    """
+    A memory-bounded cache of search results keyed by Zobrist hashes.
+
+    It holds at most `capacity` entries. With the "lru" policy the least recently
+    used entry is evicted to make room. With the "depth" policy each hash maps to
+    one of `capacity` slots, and a new entry only replaces a slot's entry, for the
+    same position or another, if it was searched at least as deep, so costly results
+    survive.
+
+    An entry stored with a search depth only answers lookups that ask for that depth
+    or less.
+
+    Attributes:
+        capacity (int): Most entries held.
+        policy (str): "lru" or "depth".
+        hits (int): Lookups answered.
+        misses (int): Lookups not answered.
+        evictions (int): Entries dropped to make room for others.
+        rejected (int): Stores refused by the depth policy.
+    """
+    POLICIES = ("lru", "depth")
+
+    def __init__(self, capacity=1 << 16, policy="lru"):
+        """
+        Initializes an empty table.
+
+        Parameters:
+        capacity (int): Most entries held. Default is 65536.
+        policy (str): The replacement policy, "lru" or "depth". Default is "lru".
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}. Choose from {list(self.POLICIES)}.")
+        if capacity < 1:
+            raise ValueError("A transposition table needs a capacity of at least 1.")
+        self.capacity = capacity
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        if policy == "lru":
+            self._entries = OrderedDict()  # key -> (depth, value)
+        else:
+            self._slots = [None] * capacity  # (key, depth, value) or None
+
+    def get(self, key, depth=0):
+        """
+        Looks up a position.
+
+        Parameters:
+        key (int): The position's hash.
+        depth (int): The least search depth wanted. Default is 0.
+
+        Returns:
+        object: The stored value, or None if there is no deep enough entry.
+        """
+        if self.policy == "lru":
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= depth:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        else:
+            entry = self._slots[key % self.capacity]
+            if entry is not None and entry[0] == key and entry[1] >= depth:
+                self.hits += 1
+                return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, key, value, depth=0):
+        """
+        Stores the result of searching a position, subject to the replacement policy.
+
+        Parameters:
+        key (int): The position's hash.
+        value (object): The result. None cannot be stored.
+        depth (int): How deep the position was searched. Default is 0.
+        """
+        if self.policy == "lru":
+            entries = self._entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+            entries[key] = (depth, value)
+        else:
+            slot = key % self.capacity
+            entry = self._slots[slot]
+            if entry is not None:
+                if depth < entry[1]:
+                    self.rejected += 1
+                    return
+                if entry[0] != key:
+                    self.evictions += 1
+            self._slots[slot] = (key, depth, value)
+
+    def __len__(self):
+        if self.policy == "lru":
+            return len(self._entries)
+        return sum(entry is not None for entry in self._slots)
+
+    def clear(self):
+        """
+        Removes every entry. The statistics are kept.
+        """
+        if self.policy == "lru":
+            self._entries.clear()
+        else:
+            self._slots = [None] * self.capacity
+
+    def stats(self):
+        """
+        Returns the table's statistics.
+
+        Returns:
+        dict: Entries, capacity, hits, misses, hit rate, evictions and rejected stores.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,106 @@
+import pytest
+import random
+from color import Color
+from board import Board
+from board import BoardState
+from bitboard import BitBoard
+
+def test_mark():
+    lc = {Color.GREEN} # locked colors
+    board = BitBoard(lc)
+    assert board.mark(0, 7)  == True
+    assert board.marked(0, 7)
+
+    assert board.mark(1, 1)  == True
+    assert board.mark(1, 0)  == False # Can't mark to the left
+    assert not board.marked(1, 0)
+    assert board.mark(1, 1)  == False # Can't re-mark
+
+    assert board.mark(1, 2)  == True
+    assert board.mark(1, 4)  == True
+    assert board.mark(1, 5)  == True
+    assert board.mark(1, 10) == False # Can't lock yet
+    assert board.mark(1, 9)  == True
+    assert board.mark(1, 10) == True # Lock
+
+    assert board.mark(2, 1) == False
+    assert board.mark(3, 1) == True
+
+def test_score_and_lock():
+    lc = set()
+    board = BitBoard(lc)
+    board.add_penalty()
+    assert board.score() == -5
+    for col in [0, 1, 2, 3, 4]:
+        board.mark(1, col)
+    assert board.score() == 10
+    board.mark(1, 10)
+    assert board.score() == 23
+
+    assert board.update_lock() == {Color.YELLOW}
+    assert board.get_state() == BoardState.CONTINUE
+    board.color_lock(Color.RED)
+    assert board.get_state() == BoardState.LOCKED
+
+def test_matches_board():
+    rng = random.Random(0)
+    for _ in range(20):
+        lc_board, lc_bits = set(), set()
+        board, bits = Board(lc_board), BitBoard(lc_bits)
+        for _ in range(60):
+            r, c = rng.randrange(4), rng.randrange(11)
+            assert board.mark(r, c) == bits.mark(r, c)
+            if rng.random() < 0.05:
+                assert board.add_penalty() == bits.add_penalty()
+            board.update_lock()
+            bits.update_lock()
+            assert lc_board == lc_bits
+            assert board.score() == bits.score()
+            assert board.get_state() == bits.get_state()
+
+            option = (rng.choice([Color.NO_COLOR, Color.RED, Color.YELLOW,
+                                  Color.GREEN, Color.BLUE]), rng.randrange(2, 13))
+            for white_turn in (True, False):
+                assert (sorted(board.placements(option, white_turn))
+                        == sorted(bits.placements(option, white_turn)))
+
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_make_unmake(board_type):
+    def snapshot(board):
+        marks = [[board.last_marked(r), board.n_marked(r)]
+                 + [board.marked(r, c) for c in range(11)]
+                 + [board.score_delta(r, c) for c in range(11)] for r in range(4)]
+        return (marks, board.score(), board.penalties, set(board.locked_colors),
+                board.get_state())
+
+    rng = random.Random(5)
+    for _ in range(50):
+        board = board_type(set())
+        before = snapshot(board)
+        states = [before]
+        made = 0
+        for _ in range(40):
+            choice = rng.random()
+            if choice < 0.1:
+                board.make_penalty()
+            elif choice < 0.15:
+                board.make_lock(rng.choice([Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE]))
+            elif not board.make_mark(rng.randrange(4), rng.randrange(11)):
+                continue
+            made += 1
+            states.append(snapshot(board))
+        for _ in range(made):
+            assert snapshot(board) == states.pop()
+            board.unmake()
+        assert snapshot(board) == before
+        assert board.history == []
+
+def test_row_views():
+    board = BitBoard(set())
+    assert isinstance(board, Board)
+    for col in (0, 2, 3):
+        board.mark(1, col)
+    assert board.masks == [0, 0b1101, 0, 0]
+    assert board.rightmost == [-1, 3, -1, -1]
+    assert board.counts == [0, 3, 0, 0]
+    assert board.what_is_locked(1) is None
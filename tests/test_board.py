@@ -1,6 +1,7 @@
 import pytest
 from color import Color
 from board import Board
+from board import BoardState
 
 def test_indexing():
     lc = {} # locked colors
@@ -87,4 +88,76 @@ def test_mark():
 #    assert board.score() == 19
 #
 #
-    
\ No newline at end of file
+    
+def test_placements():
+    lc = {Color.GREEN} # locked colors
+    board = Board(lc)
+    board.mark(0, 3)
+
+    assert board.placements((Color.NO_COLOR, 5), True) == [(1, 3), (3, 7)]
+    assert board.placements((Color.NO_COLOR, 6), True) == [(0, 4), (1, 4), (3, 6)]
+    assert board.placements((Color.RED, 6), True) == []
+    assert board.placements((Color.RED, 6), False) == [(0, 4)]
+    assert board.placements((Color.RED, 12), False) == [] # Can't lock yet
+    assert board.placements((Color.GREEN, 6), False) == []
+
+def test_incremental_score():
+    lc = set() # locked colors
+    board = Board(lc)
+    assert board.score() == 0
+    board.add_penalty()
+    assert board.score() == -5
+
+    for col in [0, 1, 2, 3, 4]:
+        assert board.score_delta(1, col) == col + 1
+        board.mark(1, col)
+    assert board.score() == 10
+    assert board.score_delta(1, 10) == 13
+    board.mark(1, 10) # Lock
+    assert board.score() == 23
+    assert board.score() == sum(row.score() for row in board) - 5
+
+    board.update_lock()
+    assert board.get_state() == BoardState.CONTINUE
+    board.color_lock(Color.RED)
+    assert board.get_state() == BoardState.LOCKED
+
+def test_encode():
+    lc = {Color.GREEN} # locked colors
+    board = Board(lc)
+    for (r, c) in [(0, 1), (0, 4), (3, 0), (3, 2)]:
+        board.mark(r, c)
+    board.add_penalty()
+    data = board.encode()
+    assert len(data) == 9
+
+    decoded = Board.decode(data, lc)
+    assert decoded.encode() == data
+    assert decoded.score() == board.score()
+    assert decoded.penalties == 1
+    assert decoded[0].rightmost == 4 and decoded[3].n_marked == 2
+    assert not decoded.mark(0, 3)
+
+def test_str():
+    board = Board(set())
+    board.mark(0, 1)
+    lines = str(board).split("\n")
+    assert lines[0].split()[:3] == ["A", "R2", "x3"]
+    assert lines[-1] == "Penalties: 0"
+
+def test_score_through_rows_and_squares():
+    board = Board(set())
+    board.add_penalty()
+    assert board[0].mark(3)      # Row.mark, with the rules
+    board[1][4].mark()           # RowSquare.mark, without them
+    board[2].set_mark(0)
+    board[2].set_mark(1)
+    for col in range(5):
+        board[3].set_mark(col)
+    assert board[3].mark(10)     # Lock
+    assert board.score() == 1 + 1 + 3 + 28 - 5
+    board[2][1].unmark()
+    board[3].clear_mark(10)
+    assert board.score() == 1 + 1 + 1 + 15 - 5
+    board[1].load_mask(0b111)
+    assert board.score() == sum(row.score() for row in board) - 5
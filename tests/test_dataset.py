@@ -0,0 +1,78 @@
+import ast
+import os
+import pytest
+from dataset import COLUMNS
+from dataset import DatasetWriter
+from dataset import export
+from qwixx_sim import QwixxSim
+from replay import ReplayWriter
+from replay import read_games
+from strategies import greedy_strategy
+from strategies import random_strategy
+
+def play(log, n_games):
+    results = []
+    for game_index in range(n_games):
+        game = QwixxSim(["one", "two"], [random_strategy, greedy_strategy],
+                        seed=5, game_index=game_index, log=log)
+        results.append(game.play_game())
+    return results
+
+def npy_shape(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:8] == b"\x93NUMPY\x01\x00"
+    header_len = int.from_bytes(data[8:10], "little")
+    header = ast.literal_eval(data[10:10 + header_len].decode("latin1"))
+    assert (10 + header_len) % 64 == 0
+    return header["shape"], len(data) - 10 - header_len
+
+def test_writer_files(tmp_path):
+    with DatasetWriter(str(tmp_path), chunk_rows=50) as writer:
+        play(writer, 6)
+    assert writer.games == 6
+    item_sizes = {"game": 8, "turn": 4, "score": 2, "final_score": 2, "board": 9}
+    for name, (descr, typecode, width) in COLUMNS.items():
+        shape, n_bytes = npy_shape(os.path.join(tmp_path, name + ".npy"))
+        assert shape[0] == writer.rows
+        assert shape[1:] == (() if width == 1 else (width,))
+        assert n_bytes == writer.rows * width * item_sizes.get(name, 1)
+
+def test_export_matches_live(tmp_path):
+    log_path = str(tmp_path / "games.qlog")
+    with ReplayWriter(log_path) as log:
+        play(log, 4)
+    with DatasetWriter(str(tmp_path / "live")) as live:
+        play(live, 4)
+    rows = export(read_games(log_path), str(tmp_path / "exported"))
+    assert rows == live.rows == sum(len(g.decisions) for g in read_games(log_path))
+    for name in COLUMNS:
+        with open(tmp_path / "live" / (name + ".npy"), "rb") as a, \
+             open(tmp_path / "exported" / (name + ".npy"), "rb") as b:
+            assert a.read() == b.read()
+
+def test_dataset_load(tmp_path):
+    np = pytest.importorskip("numpy")
+    from dataset import Dataset
+    with DatasetWriter(str(tmp_path), chunk_rows=30) as writer:
+        results = play(writer, 5)
+    data = Dataset(str(tmp_path))
+    assert len(data) == writer.rows
+    assert isinstance(data["game"], np.memmap)
+    assert data["dice"].shape == (writer.rows, 6)
+    assert data["board"]["masks"].shape == (writer.rows, 4)
+    assert ((data["dice"] >= 1) & (data["dice"] <= 6)).all()
+    for game_index, result in enumerate(results):
+        rows = data["game"] == game_index
+        seats = data["seat"][rows]
+        assert (data["final_score"][rows] == np.array(result.scores)[seats]).all()
+        assert set(seats[data["won"][rows] == 1]) == set(result.winners)
+
+def test_live_games_are_not_replayed(tmp_path, monkeypatch):
+    import dataset
+    def no_replay(*args):
+        raise AssertionError("A live game was replayed.")
+    monkeypatch.setattr(dataset, "replay", no_replay)
+    with DatasetWriter(str(tmp_path)) as writer:
+        play(writer, 3)
+    assert writer.games == 3 and writer.rows > 0
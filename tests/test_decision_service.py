@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from bitboard import BitBoard
+from decision_service import DecisionService
+from decision_service import LinearModel
+from decision_service import play_batched
+from dice import game_rng
+from metrics import Metrics
+from qwixx_server import QwixxServer
+from qwixx_sim import QwixxSim
+
+np = pytest.importorskip("numpy")
+
+def games(model, n_games, board_type=BitBoard):
+    return [QwixxSim(["one", "two", "three"], [model, model, model], board_type,
+                     rng=game_rng(42, index)) for index in range(n_games)]
+
+@pytest.mark.parametrize("weights", [(1.0, -1.5, 0.0, -5.0), (2.0, -1.0, 3.0, -1.0),
+                                     (0.5, -2.0, -1.0, 0.0)])
+def test_batched_matches_scalar(weights):
+    model = LinearModel(weights)
+    expected = [game.play_game() for game in games(model, 30)]
+    batched = play_batched(games(model, 30), model)
+    assert [(r.scores, r.turns, r.end_state) for r in batched] == \
+           [(r.scores, r.turns, r.end_state) for r in expected]
+
+def test_batched_counts_decisions():
+    metrics = Metrics()
+    sims = [QwixxSim(["one", "two"], [None, None], rng=game_rng(3, index), metrics=metrics)
+            for index in range(4)]
+    play_batched(sims, LinearModel())
+    assert metrics.games == 4
+    decisions = metrics.calls["offturn"] + metrics.calls["white"] + metrics.calls["color"]
+    assert metrics.decisions == {"LinearModel": decisions}
+
+def test_evaluate_edge_cases():
+    model = LinearModel()
+    game = QwixxSim(["one", "two"], [model, model])
+    one, two = game.players
+    game.active_player = one
+    game.white_passed = True
+    assert model.evaluate([]) == []
+    # No options, and a color decision after a white pass with only a skipping option
+    requests = [(game, one, [], True), (game, one, [(0, 1)], False), (game, two, [(0, 1)], True)]
+    assert model.evaluate(requests) == [model(*request) for request in requests] == \
+           [None, (0, 1), None]
+
+def test_service_batches():
+    async def run():
+        model = LinearModel()
+        service = DecisionService(model)
+        sims = games(model, 8)
+        requests = [(sim, sim.players[0], [(0, 0), (1, 2)], True) for sim in sims]
+        moves = await asyncio.gather(*[service.decide(*request) for request in requests])
+        assert moves == [model(*request) for request in requests]
+        assert (service.batches, service.decisions) == (1, 8)
+    asyncio.run(run())
+
+def test_service_errors_reach_every_request():
+    class BrokenModel(LinearModel):
+        def evaluate(self, requests):
+            raise RuntimeError("broken model")
+    async def run():
+        service = DecisionService(BrokenModel())
+        sims = games(LinearModel(), 3)
+        requests = [(sim, sim.players[0], [(0, 0)], True) for sim in sims]
+        results = await asyncio.wait_for(
+            asyncio.gather(*[service.decide(*request) for request in requests],
+                           return_exceptions=True), 1)
+        assert [str(result) for result in results] == ["broken model"] * 3
+        assert service.batches == 0
+    asyncio.run(run())
+
+def test_server_batched_bots():
+    async def run():
+        service = DecisionService()
+        server = QwixxServer(service=service)
+        port = await server.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for seed in range(3):
+                writer.write(b'{"type": "create", "seed": %d, "seats": '
+                             b'[{"name": "a", "strategy": "batched"}, '
+                             b'{"name": "b", "strategy": "batched"}]}\n' % seed)
+            ends = 0
+            while ends < 3:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                ends += b'"type": "end"' in line
+            writer.close()
+        finally:
+            await server.close()
+        assert service.decisions > 0
+        assert service.batches < service.decisions
+    asyncio.run(run())
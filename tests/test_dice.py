@@ -0,0 +1,82 @@
+import pytest
+import random
+from color import Color
+from dice import Die
+from dice import DiceSet
+from dice import game_rng
+
+def test_die_rng():
+    die = Die(Color.RED, 6, random.Random(3))
+    rolls = [die.roll() for _ in range(100)]
+    assert set(rolls) == {1, 2, 3, 4, 5, 6}
+    assert die.color == Color.RED
+
+def test_game_rng_reproducible():
+    dice1 = DiceSet(game_rng(42, 7))
+    dice2 = DiceSet(game_rng(42, 7))
+    rolls1 = [dice1.roll() for _ in range(50)]
+    rolls2 = [dice2.roll() for _ in range(50)]
+    assert rolls1 == rolls2
+
+def test_game_rng_independent():
+    streams = [[game_rng(42, i).random() for _ in range(5)] for i in range(4)]
+    streams.append([game_rng(43, 0).random() for _ in range(5)])
+    assert len({tuple(s) for s in streams}) == len(streams)
+
+def test_options():
+    dice = DiceSet(game_rng(0))
+    dice.roll()
+    white = dice.white_options()
+    assert white == [(Color.NO_COLOR, dice.white_dice[0] + dice.white_dice[1])]
+    colored = dice.color_options()
+    assert len(colored) == 8
+    assert {color for color, value in colored} == {Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE}
+
+def test_roll_batch():
+    np = pytest.importorskip("numpy")
+    from dice import RollBatch
+    batch = RollBatch(4, 30, seed=9)
+    assert batch.rolls.shape == (4, 30, 6)
+    assert batch.white_sums.shape == (4, 30)
+    assert batch.color_sums.shape == (4, 30, 8)
+    assert np.array_equal(batch.rolls, RollBatch(4, 30, seed=9).rolls)
+    # A game's rolls do not depend on the batch shape or chunking
+    assert np.array_equal(batch.rolls[2], RollBatch(1, 30, seed=9, first_game=2).rolls[0])
+    assert np.array_equal(batch.rolls[:, :10], RollBatch(4, 10, seed=9).rolls)
+    assert not np.array_equal(batch.rolls[0], batch.rolls[1])
+
+    dice = DiceSet(game_rng(0), batch, 2)
+    for turn in range(30):
+        dice.throw()
+        assert [d.last_roll for d in dice] == batch.rolls[2, turn].tolist()
+        assert dice.white_options()[0][1] == batch.white_sums[2, turn]
+        assert [v for c, v in dice.color_options()] == batch.color_sums[2, turn].tolist()
+    # Falls back to live rolling once the batch runs out
+    dice.throw()
+    assert all(1 <= d.last_roll <= 6 for d in dice)
+
+def test_roll_outcomes():
+    from dice import roll_outcomes
+    from dice import expectation
+    outcomes = roll_outcomes()
+    assert len(outcomes) == 21 * 6 ** 4
+    assert sum(o.count for o in outcomes) == 6 ** 6
+    assert roll_outcomes() is outcomes
+
+    locked = roll_outcomes({Color.GREEN})
+    assert len(locked) == 21 * 6 ** 3
+    assert sum(o.count for o in locked) == 6 ** 6
+    assert all(color != Color.GREEN for o in locked for color, value in o.color_options)
+
+    assert expectation(lambda o: o.white_options[0][1]) == pytest.approx(7)
+    assert expectation(lambda o: o.white_options[0][1] == 7) == pytest.approx(6 / 36)
+
+def test_roll_outcomes_match_dice():
+    from dice import roll_outcomes
+    dice = DiceSet(game_rng(5))
+    classes = {(o.white_options, o.color_options) for o in roll_outcomes()}
+    for _ in range(50):
+        dice.throw()
+        colored = tuple(sorted(set(dice.color_options()),
+                               key=lambda option: ("RYGB".index(option[0].value), option[1])))
+        assert (tuple(dice.white_options()), colored) in classes
@@ -0,0 +1,43 @@
+import pytest
+from color import Color
+from layout import standard_layout
+from board import Board
+
+def test_column():
+    layout = standard_layout()
+    assert layout is standard_layout()
+    assert layout.column(0, 2) == 0
+    assert layout.column(1, 12) == 10
+    assert layout.column(2, 12) == 0
+    assert layout.column(3, 5) == 7
+    assert layout.column(0, 13) == -1
+    assert layout.rows_by_color[Color.GREEN] == 2
+
+def test_matches_squares():
+    layout = standard_layout()
+    board = Board(set())
+    for row_index, row in enumerate(board):
+        for col_index, square in enumerate(row):
+            assert layout.column(row_index, square.value) == col_index
+            assert layout.colors[row_index] == square.color
+
+def test_shared_layout():
+    import copy
+    import pickle
+    layout = standard_layout()
+    board1, board2 = Board(set()), Board(set())
+    assert board1.layout is board2.layout is layout
+    assert board1[0].values is board2[0].values
+    assert board1[0].scoring is layout.scoring
+    with pytest.raises(AttributeError):
+        layout.colors = ()
+    with pytest.raises(AttributeError):
+        board1.extra = 1 # boards use __slots__
+
+    board1.mark(0, 3)
+    copied = copy.deepcopy(board1)
+    assert copied.layout is layout
+    assert copied.marked(0, 3) and not board2.marked(0, 3)
+    restored = pickle.loads(pickle.dumps(board1))
+    assert restored.marked(0, 3)
+    assert restored.layout.columns == layout.columns
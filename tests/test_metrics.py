@@ -0,0 +1,56 @@
+import json
+from bitboard import BitBoard
+from dice import game_rng
+from metrics import PHASES
+from metrics import Metrics
+from qwixx_sim import QwixxSim
+from strategies import greedy_strategy
+from strategies import random_strategy
+from tournament import simulate
+
+def play(index, metrics=None):
+    game = QwixxSim(["one", "two", "three"], [greedy_strategy, random_strategy, greedy_strategy],
+                    BitBoard, game_rng(11, index), metrics=metrics)
+    return game.play_game()
+
+def test_game_metrics():
+    metrics = Metrics()
+    results = [play(index, metrics) for index in range(20)]
+    # Measuring does not change the games
+    assert [r.scores for r in results] == [play(index).scores for index in range(20)]
+
+    assert metrics.games == 20
+    assert metrics.turns == sum(r.turns for r in results) == metrics.calls["roll"]
+    decisions = metrics.calls["offturn"] + metrics.calls["white"] + metrics.calls["color"]
+    assert sum(metrics.decisions.values()) == decisions
+    assert set(metrics.decisions) == {"greedy_strategy", "random_strategy"}
+    # Every decision had its moves generated
+    assert metrics.calls["movegen"] == decisions
+    assert metrics.calls["penalty"] == sum(sum(r.penalties) for r in results)
+    assert all(metrics.nanoseconds[phase] >= 0 for phase in PHASES)
+
+def test_export_and_merge():
+    first, second = Metrics(), Metrics()
+    play(0, first)
+    play(1, second)
+    total = Metrics().merge(first).merge(second)
+    assert total.games == 2 and total.turns == first.turns + second.turns
+    assert total.decisions == first.decisions + second.decisions
+
+    data = json.loads(total.to_json())
+    assert data["games"] == 2
+    assert data["phases"]["roll"]["calls"] == total.calls["roll"]
+    assert data["decisions"] == dict(total.decisions)
+
+    text = total.to_prometheus()
+    assert text.endswith("\n")
+    assert "qwixx_games_total 2\n" in text
+    assert f'qwixx_phase_calls_total{{phase="movegen"}} {total.calls["movegen"]}\n' in text
+    for line in text.splitlines():
+        assert line.startswith("# ") or line.startswith("qwixx_")
+
+def test_tournament_metrics():
+    result = simulate(["greedy", "random"], 30, seed=2, processes=1, shard_size=7, metrics=True)
+    assert result.metrics.games == 30
+    assert result.metrics.turns == sum(turns * n for turns, n in result.lengths.items())
+    assert simulate(["greedy", "random"], 5, processes=1).metrics is None
@@ -0,0 +1,71 @@
+import pytest
+import copy
+import random
+from color import Color
+from board import Board
+from board import BoardState
+from bitboard import BitBoard
+from dice import DiceSet
+from dice import game_rng
+from player import Player
+
+def brute_force_moves(player, dice, pending_locks):
+    """ Joint moves found by marking copies of the board. """
+    moves = {(None, None)}
+    for white_move in player.valid_placements(dice, True) + [None]:
+        copied = Player(player.name, copy.deepcopy(player.board))
+        if white_move:
+            assert copied.board.mark(*white_move)
+        for color in pending_locks:
+            copied.board.color_lock(color)
+        copied.board.update_lock()
+        if copied.board.get_state() != BoardState.CONTINUE:
+            # The game ends before the color roll
+            moves.add((white_move, None))
+            continue
+        for color_move in copied.valid_placements(dice, False) + [None]:
+            moves.add((white_move, color_move))
+    return moves
+
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_turn_moves(board_type):
+    rng = random.Random(11)
+    dice = DiceSet(game_rng(11))
+    for _ in range(200):
+        player = Player("one", board_type(set()))
+        for _ in range(rng.randrange(30)):
+            player.board.mark(rng.randrange(4), rng.randrange(11))
+        pending_locks = [Color.YELLOW] if rng.random() < 0.2 else []
+        if rng.random() < 0.3:
+            player.board.color_lock(Color.GREEN)
+        dice.throw()
+
+        moves = list(player.turn_moves(dice, pending_locks))
+        assert moves[0] == (None, None)
+        assert len(moves) == len(set(moves))
+        assert set(moves) == brute_force_moves(player, dice, pending_locks)
+
+def test_turn_moves_unlock_lock_square():
+    player = Player("one", Board(set()))
+    for col in [0, 1, 2, 3]:
+        player.board.mark(0, col)
+    dice = DiceSet(game_rng(0))
+    for die, face in zip(dice, [6, 3, 6, 1, 1, 1]):
+        die.last_roll = face
+    moves = list(player.turn_moves(dice))
+    # White 9 marks red 9, then red 6 + white 6 locks the row
+    assert ((0, 7), (0, 10)) in moves
+    assert (None, (0, 10)) not in moves
+
+def test_turn_moves_end_on_white_lock():
+    player = Player("one", Board({Color.GREEN}))
+    for col in [0, 1, 2, 3, 4]:
+        player.board.mark(0, col)
+    dice = DiceSet(game_rng(0))
+    for die, face in zip(dice, [6, 6, 1, 2, 3, 4]):
+        die.last_roll = face
+    moves = list(player.turn_moves(dice))
+    # White 12 locks red, the second locked row, so the game ends before the color roll
+    assert ((0, 10), None) in moves
+    assert not [move for move in moves if move[0] == (0, 10) and move[1] is not None]
+    assert (None, (1, 6)) in moves
@@ -1,6 +1,11 @@
+import io
 import pytest
+import qwixx_term
+from renderer import TermRenderer
+from board import BoardState
 from qwixx_game import QwixxGame
 from qwixx_term import QwixxTerm
+from color import Color
 
 def test_get_other_players():
     names = ["one", "two", "three"]
@@ -25,4 +30,63 @@ def test_get_other_players():
     this_player = player_order[1]
     others = game.get_other_players(player_order, this_player)
     assert len(others) == len(names) - 1
-    assert others[-1] == player_order[0]
\ No newline at end of file
+    assert others[-1] == player_order[0]
+
+def test_lock_events():
+    game = QwixxTerm(["one", "two"])
+    first, second = game.players
+    for col in [0, 1, 2, 3, 4]:
+        first.board.mark(0, col)
+        second.board.mark(0, col)
+    assert game.pending_locks == []
+
+    # Both players lock red on the same roll
+    assert first.board.mark(0, 10)
+    assert second.board.mark(0, 10)
+    assert game.pending_locks == [Color.RED]
+    assert game.locked_colors == set()
+
+    assert game.resolve_locks() == [Color.RED]
+    assert game.pending_locks == []
+    assert game.locked_colors == {Color.RED}
+    assert first.board.score() == second.board.score() == 28
+    assert not second.board.mark(0, 10)
+
+
+def test_encode_state():
+    game = QwixxTerm(["one", "two", "three"])
+    game.players[0].board.mark(0, 2)
+    game.players[2].board.mark(3, 5)
+    game.players[1].board.add_penalty()
+    game.lock(Color.YELLOW)
+    game.roll_dice()
+    game.turn = 17
+    game.active_player = game.players[2]
+    data = game.encode_state()
+    assert len(data) == 13 + 3 * 9
+
+    other = QwixxTerm(["a", "b", "c"])
+    other.decode_state(data)
+    assert other.encode_state() == data
+    assert other.locked_colors == {Color.YELLOW}
+    assert other.turn == 17
+    assert other.active_player is other.players[2]
+    assert [d.last_roll for d in other.dice] == [d.last_roll for d in game.dice]
+    assert [p.score() for p in other.players] == [p.score() for p in game.players]
+    assert other.players[0].board[0][2].marked
+    assert not other.players[0].board.mark(1, 3) # yellow is locked
+    assert {data: 1}[other.encode_state()] == 1
+
+    with pytest.raises(ValueError):
+        QwixxTerm(["a", "b"]).decode_state(data)
+
+def test_term_game(monkeypatch):
+    # Everyone always passes, so the game ends on penalties
+    monkeypatch.setattr("builtins.input", lambda message: "-")
+    monkeypatch.setattr(qwixx_term.time, "sleep", lambda seconds: None)
+    game = QwixxTerm(["one", "two"])
+    stream = io.StringIO()
+    game.screen = TermRenderer(stream)
+    game.play_game(game.players)
+    assert game.players[0].board.get_state() == BoardState.PENALTIES
+    assert "PODIUM" in stream.getvalue()
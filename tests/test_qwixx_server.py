@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import pytest
+from qwixx_server import QwixxServer
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self, kind=None):
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 10))
+            if kind is None or message["type"] == kind:
+                return message
+
+def serve(test):
+    async def run():
+        server = QwixxServer()
+        port = await server.start(port=0)
+        async def connect():
+            return Client(*await asyncio.open_connection("127.0.0.1", port))
+        try:
+            await test(server, connect)
+        finally:
+            await server.close()
+    asyncio.run(run())
+
+def test_bot_table():
+    async def test(server, connect):
+        client = await connect()
+        await client.send({"type": "create", "seed": 3, "seats": [
+            {"name": "a", "strategy": "greedy"}, {"name": "b", "strategy": "random"}]})
+        table = (await client.receive("created"))["table"]
+        state = await client.receive("state")
+        assert state["table"] == table and len(state["boards"]) == 2
+        end = await client.receive("end")
+        assert len(end["scores"]) == 2
+        assert end["end_state"] in ("LOCKED", "PENALTIES")
+    serve(test)
+
+def test_human_seat():
+    async def test(server, connect):
+        host = await connect()
+        await host.send({"type": "create", "seats": [
+            {"name": "ann"}, {"name": "bot", "strategy": "greedy"}]})
+        table = (await host.receive("created"))["table"]
+
+        await host.send({"type": "list"})
+        listing = (await host.receive("tables"))["tables"]
+        assert listing == [{"table": table, "seats": ["ann", "bot"], "open": [0], "started": False}]
+
+        player = await connect()
+        await player.send({"type": "join", "table": table, "name": "nobody"})
+        assert (await player.receive())["type"] == "error"
+        await player.send({"type": "join", "table": table, "name": "ann"})
+        assert (await player.receive("joined"))["seat"] == 0
+
+        decide = await player.receive("decide")
+        await player.send({"type": "move", "table": table, "seat": 0, "move": [9, 9]})
+        assert (await player.receive())["type"] == "error"
+        # Ann passes every decision until the game ends on her penalties
+        while True:
+            await player.send({"type": "move", "table": table, "seat": 0, "move": None})
+            message = await player.receive()
+            while message["type"] == "state":
+                message = await player.receive()
+            if message["type"] == "end":
+                break
+            assert message["type"] == "decide" and message["seat"] == 0
+        assert message["end_state"] in ("LOCKED", "PENALTIES")
+        assert table not in server.tables
+    serve(test)
+
+def test_many_tables():
+    async def test(server, connect):
+        client = await connect()
+        for seed in range(50):
+            await client.send({"type": "create", "seed": seed, "seats": [
+                {"name": "a", "strategy": "greedy"}, {"name": "b", "strategy": "greedy"}]})
+        ends = set()
+        while len(ends) < 50:
+            ends.add((await client.receive("end"))["table"])
+        assert not server.tables
+    serve(test)
+
+def test_bad_requests():
+    async def test(server, connect):
+        client = await connect()
+        client.writer.write(b"not json\n")
+        assert (await client.receive())["type"] == "error"
+        await client.send({"type": "dance"})
+        assert (await client.receive())["type"] == "error"
+        await client.send({"type": "create", "seats": [{"name": "a", "strategy": "nope"},
+                                                      {"name": "b"}]})
+        assert (await client.receive())["type"] == "error"
+        await client.send({"type": "move", "table": 99, "seat": 0, "move": None})
+        assert (await client.receive())["type"] == "error"
+        # Malformed seats are refused without dropping the connection
+        for seats in [["ann", "bob"], "annbob", [{"name": "a"}, {"name": 3}],
+                      [{"name": "a"}, {"name": "b", "strategy": ["greedy"]}], None]:
+            await client.send({"type": "create", "seats": seats})
+            assert (await client.receive())["type"] == "error"
+        await client.send({"type": "list"})
+        assert (await client.receive())["tables"] == []
+    serve(test)
+
+def test_decision_timeout():
+    async def test(server, connect):
+        server.decision_timeout = 0.05
+        host = await connect()
+        await host.send({"type": "create", "seed": 1, "seats": [
+            {"name": "ann"}, {"name": "bob"}, {"name": "bot", "strategy": "greedy"}]})
+        table_id = (await host.receive("created"))["table"]
+        ann, bob = await connect(), await connect()
+        await ann.send({"type": "join", "table": table_id, "name": "ann"})
+        await bob.send({"type": "join", "table": table_id, "name": "bob"})
+        await ann.receive("joined")
+        await bob.receive("joined")
+        table = server.tables[table_id]
+
+        # Nobody answers: every human decision times out as a pass, and on the
+        # bot's turns both humans are asked at once.
+        both_waiting = False
+        while table_id in server.tables:
+            both_waiting = both_waiting or len(table._waiting) == 2
+            await asyncio.sleep(0.01)
+        assert both_waiting
+        assert (await ann.receive("timeout"))["seat"] == 0
+        end = await host.receive("end")
+        assert end["end_state"] in ("LOCKED", "PENALTIES")
+    serve(test)
+
+def test_moves_name_their_seat():
+    async def test(server, connect):
+        host = await connect()
+        await host.send({"type": "create", "seed": 2, "seats": [
+            {"name": "ann"}, {"name": "bob"}, {"name": "bot", "strategy": "greedy"}]})
+        table = (await host.receive("created"))["table"]
+        await host.send({"type": "join", "table": table, "name": "ann"})
+        await host.send({"type": "join", "table": table, "name": "bob"})
+        await host.receive("joined")
+        await host.receive("joined")
+        # One client holds both human seats, so every move says which seat it is for
+        pending = [await host.receive("decide")]
+        async def error():
+            while True:
+                message = await host.receive()
+                if message["type"] == "error":
+                    return message
+                if message["type"] == "decide":
+                    pending.append(message)
+        await host.send({"type": "move", "table": table, "move": None})
+        assert (await error())["message"] == "'seat'"
+        await host.send({"type": "move", "table": table, "seat": 2, "move": None})
+        assert "seat 2" in (await error())["message"]
+        while True:
+            for decide in pending:
+                await host.send({"type": "move", "table": table, "seat": decide["seat"],
+                                 "move": None})
+            pending = []
+            message = await host.receive()
+            if message["type"] == "end":
+                break
+            if message["type"] == "decide":
+                pending.append(message)
+        assert message["end_state"] in ("LOCKED", "PENALTIES")
+    serve(test)
+
+def test_table_errors_are_logged(caplog):
+    def broken(game, player, options, white_turn):
+        raise RuntimeError("broken bot")
+    async def test(server, connect):
+        server.strategies["broken"] = broken
+        client = await connect()
+        await client.send({"type": "create", "seats": [
+            {"name": "a", "strategy": "broken"}, {"name": "b", "strategy": "broken"}]})
+        await client.receive("created")
+        while server.tables:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+    with caplog.at_level(logging.ERROR, logger="qwixx_server"):
+        serve(test)
+    [record] = [record for record in caplog.records if record.name == "qwixx_server"]
+    assert record.getMessage() == "table 1 failed"
+    assert str(record.exc_info[1]) == "broken bot"
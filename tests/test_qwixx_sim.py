@@ -0,0 +1,110 @@
+import pytest
+from board import BoardState
+from color import Color
+from bitboard import BitBoard
+from qwixx_sim import QwixxSim
+from strategies import pass_strategy
+from strategies import random_strategy
+from strategies import greedy_strategy
+from dice import game_rng
+from qwixx_game import WHITE
+
+def test_pass_game():
+    game = QwixxSim(["one", "two"], [pass_strategy, pass_strategy])
+    result = game.play_game(game.players)
+    assert result.end_state == BoardState.PENALTIES
+    assert result.scores == [-20, -15]
+    assert result.winners == [1]
+    assert result.turns == 7
+
+def test_mismatched_strategies():
+    with pytest.raises(ValueError):
+        QwixxSim(["one", "two"], [pass_strategy])
+
+@pytest.mark.parametrize("board_type", [None, BitBoard])
+def test_strategy_games(board_type):
+    kwargs = {"board_type": board_type} if board_type else {}
+    for _ in range(20):
+        game = QwixxSim(["one", "two", "three"],
+                        [random_strategy, greedy_strategy, greedy_strategy], **kwargs)
+        result = game.play_game()
+        assert result.end_state in (BoardState.LOCKED, BoardState.PENALTIES)
+        assert result.scores == [p.score() for p in game.players]
+        assert result.turns > 0
+
+def test_seeded_replay():
+    def play(index):
+        game = QwixxSim(["one", "two"], [random_strategy, greedy_strategy],
+                        rng=game_rng(1234, index))
+        return game.play_game()
+    first, again, other = play(5), play(5), play(6)
+    assert (first.scores, first.turns) == (again.scores, again.turns)
+    assert (first.scores, first.turns) != (other.scores, other.turns)
+
+def test_bitboard_lock_events():
+    game = QwixxSim(["one", "two"], [pass_strategy, pass_strategy], board_type=BitBoard)
+    board = game.players[1].board
+    for col in [0, 1, 2, 3, 4, 10]:
+        board.mark(3, col)
+    assert game.pending_locks == [Color.BLUE]
+    game.resolve_locks()
+    assert game.locked_colors == {Color.BLUE}
+
+def test_offturn_batch():
+    game = QwixxSim(["one", "two", "three"], [pass_strategy] * 3, rng=game_rng(4))
+    steps = game.turn_steps(game.players)
+    offturn = next(steps)
+    assert [(player, white) for player, white, options in offturn] == \
+        [(game.players[1], True), (game.players[2], True)]
+    # Every player in the batch was offered moves against the same boards
+    move = offturn[0][2][0]
+    active = steps.send([move, move])
+    assert active == [(game.players[0], True, active[0][2])]
+    assert game.players[1].board.marked(*move) and game.players[2].board.marked(*move)
+
+def test_strategies_do_not_shift_dice():
+    def dice_seen(strategies):
+        seen = {}
+        def watch(strategy):
+            def watched(game, player, placements, white_turn):
+                seen[game.turn] = tuple(die.last_roll for die in game.dice)
+                return strategy(game, player, placements, white_turn)
+            return watched
+        game = QwixxSim(["one", "two"], [watch(s) for s in strategies], rng=game_rng(8))
+        game.play_game()
+        return seen
+    random_dice = dice_seen([random_strategy, random_strategy])
+    pass_dice = dice_seen([pass_strategy, pass_strategy])
+    turns = random_dice.keys() & pass_dice.keys()
+    assert len(turns) > 3
+    assert all(random_dice[turn] == pass_dice[turn] for turn in turns)
+
+def test_resume_turn_steps():
+    saved = {}
+    def probe(game, player, placements, white_turn):
+        if game.turn == 9 and not saved and game.decision_phase(player, white_turn) == WHITE:
+            saved.update(state=game.encode_state(), white_passed=game.white_passed,
+                         pending_locks=list(game.pending_locks), rng=game.rng.getstate(),
+                         strategy_rng=game.strategy_rng.getstate(),
+                         order=[game.seats[p] for p in game.player_order])
+        return random_strategy(game, player, placements, white_turn)
+    game = QwixxSim(["one", "two", "three"], [probe] * 3, rng=game_rng(6))
+    result = game.play_game()
+
+    # The rest of the game plays out the same from the restored decision
+    copy = QwixxSim(["one", "two", "three"], [random_strategy] * 3)
+    copy.decode_state(saved["state"])
+    copy.white_passed = saved["white_passed"]
+    copy.pending_locks = saved["pending_locks"]
+    copy.rng.setstate(saved["rng"])
+    copy.strategy_rng.setstate(saved["strategy_rng"])
+    steps = copy.turn_steps([copy.players[seat] for seat in saved["order"]], WHITE)
+    try:
+        requests = next(steps)
+        while True:
+            requests = steps.send([random_strategy(copy, player, options, white_turn)
+                                   for player, white_turn, options in requests])
+    except StopIteration as stop:
+        resumed = copy.result(stop.value)
+    assert (resumed.scores, resumed.turns, resumed.end_state) == \
+        (result.scores, result.turns, result.end_state)
@@ -0,0 +1,36 @@
+import builtins
+import qwixx_term
+from board import BoardState
+from metrics import Metrics
+from qwixx_term import QwixxTerm
+from replay import ReplayWriter
+from replay import read_games
+from replay import replay
+
+def test_keyboard_game(tmp_path, monkeypatch, capsys):
+    # Every move prompt is answered with a square off the board, then a pass
+    answers = []
+    def keyboard(message):
+        if "move" not in message:
+            return ""
+        answers.append("Z9" if len(answers) % 2 == 0 else "-")
+        return answers[-1]
+    monkeypatch.setattr(builtins, "input", keyboard)
+    monkeypatch.setattr(qwixx_term.time, "sleep", lambda seconds: None)
+
+    path = str(tmp_path / "games.qlog")
+    metrics = Metrics()
+    with ReplayWriter(path) as log:
+        game = QwixxTerm(["one", "two"], log=log, metrics=metrics)
+        state = game.play_game(game.players)
+
+    assert state == BoardState.PENALTIES
+    assert [p.score() for p in game.players] == [-20, -15]
+    assert game.turn == 7
+    assert metrics.games == 1 and metrics.turns == 7
+    assert "PODIUM" in capsys.readouterr().out
+    # The log replays to the same game
+    logged = next(read_games(path))
+    assert len(logged.decisions) == len(answers) // 2
+    assert metrics.decisions == {"human": len(logged.decisions)}
+    assert replay(logged).scores == [-20, -15]
@@ -0,0 +1,70 @@
+import io
+import os
+import shutil
+from renderer import TermRenderer
+from renderer import move_to
+from utils import CLEAR_SCREEN
+
+def test_first_frame_is_full():
+    stream = io.StringIO()
+    screen = TermRenderer(stream)
+    screen.write("one\ntwo")
+    assert screen.present() == 2
+    assert stream.getvalue().startswith(CLEAR_SCREEN)
+
+def test_only_changed_lines_are_redrawn():
+    stream = io.StringIO()
+    screen = TermRenderer(stream)
+    screen.write("one\ntwo\nthree")
+    screen.present()
+
+    stream.seek(0)
+    stream.truncate()
+    screen.new_frame()
+    screen.write("one\nTWO\nthree")
+    assert screen.present() == 1
+    output = stream.getvalue()
+    assert CLEAR_SCREEN not in output
+    assert move_to(1) + "TWO" in output
+    assert "one" not in output and "three" not in output
+
+    # Adding lines to the same frame only draws the new ones
+    screen.write("four")
+    assert screen.present() == 1
+
+def test_invalidate():
+    screen = TermRenderer(io.StringIO())
+    screen.write("one")
+    screen.present()
+    screen.invalidate()
+    assert screen.present() == 1
+
+def test_full_redraw_when_frame_does_not_fit(monkeypatch):
+    size = os.terminal_size((20, 4))
+    monkeypatch.setattr(shutil, "get_terminal_size", lambda *args: size)
+    stream = io.StringIO()
+    screen = TermRenderer(stream)
+
+    # Taller than the terminal
+    screen.write("\n".join(str(line) for line in range(6)))
+    for _ in range(2):
+        stream.seek(0)
+        stream.truncate()
+        assert screen.present() == 6
+        assert stream.getvalue() == CLEAR_SCREEN + "0\n1\n2\n3\n4\n5\n"
+
+    # A line wider than the terminal would wrap
+    screen.new_frame()
+    screen.write("short\n" + "x" * 21)
+    stream.seek(0)
+    stream.truncate()
+    assert screen.present() == 2
+    assert move_to(1) not in stream.getvalue()
+
+    # A frame that fits is drawn in full once, then diffed
+    screen.new_frame()
+    screen.write("one\ntwo")
+    screen.present()
+    screen.new_frame()
+    screen.write("one\nTWO")
+    assert screen.present() == 1
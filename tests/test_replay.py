@@ -0,0 +1,88 @@
+import pytest
+from bitboard import BitBoard
+from board import BoardState
+from qwixx_game import OFFTURN
+from qwixx_game import WHITE
+from qwixx_game import COLOR
+from qwixx_sim import QwixxSim
+from replay import ReplayWriter
+from replay import read_games
+from replay import replay
+from strategies import greedy_strategy
+from strategies import random_strategy
+
+def play_logged(path, n_games, buffer_size=1 << 16):
+    results = []
+    with ReplayWriter(path, buffer_size) as log:
+        for game_index in range(n_games):
+            game = QwixxSim(["one", "two", "three"],
+                            [random_strategy, greedy_strategy, greedy_strategy],
+                            BitBoard, seed=99, game_index=game_index, log=log)
+            results.append(game.play_game())
+    return results
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "games.qlog"
+    results = play_logged(str(path), 5, buffer_size=64)
+    games = list(read_games(str(path)))
+    assert len(games) == 5
+    for game_index, (game, result) in enumerate(zip(games, results)):
+        assert game.seed == 99
+        assert game.game_index == game_index
+        assert game.names == ["one", "two", "three"]
+        assert sorted(game.order) == [0, 1, 2]
+        assert len(game.rolls) == result.turns == game.turns
+        assert game.scores == result.scores
+        assert game.end_state == result.end_state != BoardState.CONTINUE
+        assert {phase for seat, phase, row, col in game.decisions} <= {OFFTURN, WHITE, COLOR}
+
+def test_replay(tmp_path):
+    path = tmp_path / "games.qlog"
+    results = play_logged(str(path), 5)
+    for game, result in zip(read_games(str(path)), results):
+        replayed = replay(game)
+        assert replayed.scores == result.scores
+        assert replayed.penalties == result.penalties
+        assert replayed.end_state == result.end_state
+
+def test_replay_detects_divergence(tmp_path):
+    path = tmp_path / "games.qlog"
+    play_logged(str(path), 1)
+    game = next(read_games(str(path)))
+    seat, phase, row, col = game.decisions[0]
+    game.decisions[0] = (seat + 1, phase, row, col)
+    with pytest.raises(ValueError):
+        replay(game)
+
+def test_reader_is_lazy(tmp_path):
+    path = tmp_path / "games.qlog"
+    play_logged(str(path), 3)
+    data = path.read_bytes()
+    # A game cut short only raises once the reader reaches it
+    path.write_bytes(data[:-3])
+    games = read_games(str(path))
+    first = next(games)
+    assert first.game_index == 0
+    with pytest.raises(ValueError):
+        list(games)
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
+
+def test_large_seeds_and_long_names(tmp_path):
+    path = tmp_path / "games.qlog"
+    name = "é" * 200  # 400 bytes of UTF-8
+    seeds = [2 ** 64 + 5, -3, 0, None]
+    with ReplayWriter(str(path)) as log:
+        for seed in seeds:
+            game = QwixxSim([name, "two"], [greedy_strategy, greedy_strategy],
+                            seed=seed, log=log)
+            game.play_game()
+    games = list(read_games(str(path)))
+    assert [game.seed for game in games] == seeds
+    assert games[0].names == ["é" * 127, "two"]
+    for game in games:
+        replay(game)
@@ -0,0 +1,85 @@
+import pytest
+from bitboard import BitBoard
+from color import Color
+from dice import game_rng
+from qwixx_sim import QwixxSim
+from rollout import RolloutEvaluator
+from strategies import greedy_strategy
+
+def decision_points(n_points, min_options=2):
+    """
+    Plays seeded games and captures (game, player, placements, white_turn) at
+    decisions with several options, restored into fresh games.
+    """
+    points = []
+    def probe(game, player, placements, white_turn):
+        if len(placements) >= min_options and game.turn % 4 == 0 and len(points) < n_points:
+            copy = QwixxSim(["a", "b", "c"], [greedy_strategy] * 3, BitBoard)
+            copy.decode_state(game.encode_state())
+            copy.white_passed = game.white_passed
+            copy.pending_locks = list(game.pending_locks)
+            copy.player_order = [copy.players[game.seats[p]] for p in game.player_order]
+            points.append((copy, copy.players[game.seats[player]], placements, white_turn))
+        return greedy_strategy(game, player, placements, white_turn)
+
+    index = 0
+    while len(points) < n_points:
+        QwixxSim(["a", "b", "c"], [probe, greedy_strategy, probe], BitBoard,
+                 rng=game_rng(7, index)).play_game()
+        index += 1
+    return points
+
+def test_rollouts_leave_game_unchanged():
+    game, player, placements, white_turn = decision_points(1)[0]
+    before = game.encode_state()
+    evaluation = RolloutEvaluator(max_rollouts=8).evaluate(game, player, placements, white_turn)
+    assert game.encode_state() == before
+    assert set(evaluation.means) == set(placements) | {None}
+    assert evaluation.best in evaluation.means
+
+def test_common_random_numbers():
+    game, player, placements, white_turn = decision_points(1)[0]
+    first = RolloutEvaluator(max_rollouts=16, seed=3)
+    again = RolloutEvaluator(max_rollouts=16, seed=3)
+    a = first.evaluate(game, player, placements, white_turn)
+    b = again.evaluate(game, player, placements, white_turn)
+    assert a.means == b.means and a.rollouts == b.rollouts
+    # Every candidate sees the same dice, so a move compared with itself never differs
+    rng_state = game_rng(3, 0).getstate()
+    move = placements[0]
+    assert first.rollout(game, player, white_turn, move, rng_state) == \
+           first.rollout(game, player, white_turn, move, rng_state)
+
+def test_early_stopping():
+    full = RolloutEvaluator(max_rollouts=64, confidence=float("inf"))
+    early = RolloutEvaluator(max_rollouts=64)
+    full_rollouts = early_rollouts = 0
+    for game, player, placements, white_turn in decision_points(4, min_options=3):
+        exact = full.evaluate(game, player, placements, white_turn)
+        quick = early.evaluate(game, player, placements, white_turn)
+        full_rollouts += sum(exact.rollouts.values())
+        early_rollouts += sum(quick.rollouts.values())
+        assert exact.means[exact.best] - exact.means[quick.best] <= 2 * early.tolerance
+    assert early_rollouts < full_rollouts
+    assert early.total_rollouts == early_rollouts
+
+def test_strategy_game():
+    evaluator = RolloutEvaluator(max_rollouts=8, min_rollouts=4, round_size=4)
+    game = QwixxSim(["one", "two"], [evaluator, greedy_strategy], BitBoard, rng=game_rng(2))
+    result = game.play_game()
+    assert result.scores == [p.score() for p in game.players]
+    assert evaluator.decisions > 0
+
+def test_pending_locks_carry_into_rollouts():
+    game = QwixxSim(["a", "b"], [greedy_strategy] * 2, BitBoard, rng=game_rng(1))
+    steps = game.turn_steps(game.players)
+    active, other = game.players
+    next(steps)
+    # The other player locks blue on the white roll, before the active player decides
+    for col in [0, 1, 2, 3, 4, 10]:
+        other.board.mark(3, col)
+    [(player, white_turn, placements)] = steps.send([None])
+    assert player is active and game.pending_locks == [Color.BLUE]
+    evaluator = RolloutEvaluator()
+    evaluator.rollout(game, active, white_turn, None, game_rng(0).getstate())
+    assert Color.BLUE in evaluator._simulator(2).locked_colors
@@ -2,6 +2,7 @@ import pytest
 from row import Row
 from square import Square
 from color import Color
+import utils
 
 def test_default_metric():
     locked_colors = {}
@@ -19,4 +20,31 @@ def test_score():
     row1[0].mark()
     row1[1].mark()
 
-    assert row1.score() == 3
\ No newline at end of file
+    assert row1.score() == 3
+
+def test_square_views():
+    locked_colors = set()
+    squares = [Square(Color.RED, val) for val in range(2, 13)]
+    squares[2].mark()
+    row = Row(squares, locked_colors)
+    assert row[2].marked and row.rightmost == 2 and row.n_marked == 1
+    assert row[-1].value == 12
+    assert [sq.value for sq in row] == list(range(2, 13))
+    with pytest.raises(RuntimeError):
+        row[2].mark()
+    assert row.mark(1) == False # Can't mark to the left
+    assert row.mark(4) == True
+    assert row.score() == 3
+    with pytest.raises(IndexError):
+        row[11]
+
+def test_term_rep():
+    row = Row([Square(Color.RED, val) for val in range(2, 13)], set())
+    blank = row.term_rep()
+    assert utils.ansi_str_length(blank) == 6 * 11 + 1
+    row[0].mark()
+    marked = row.term_rep()
+    assert marked != blank
+    assert row[0].term_rep() == utils.strikethrough(Color.color_text(Color.RED, "·2·"))
+    assert marked.startswith(utils.ansi_center(row[0].term_rep(), 6))
+    assert marked.endswith(Color.color_text(Color.RED, "L"))
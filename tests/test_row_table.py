@@ -0,0 +1,60 @@
+import pytest
+from bitboard import BitBoard
+from board import Board
+from dice import game_rng
+from qwixx_sim import QwixxSim
+from row import Row
+from row_table import RowTable
+from row_table import RowTableStrategy
+from row_table import build_row_table
+from row_table import row_values
+from strategies import greedy_strategy
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    with build_row_table(str(tmp_path_factory.mktemp("table") / "rows.bin")) as table:
+        yield table
+
+def test_row_values():
+    scoring = Row.default_metric(11)
+    # A game that always ends at once leaves every row at its current score
+    final = row_values(range(2, 13), scoring, end_probability=1.0)
+    for (rightmost, marks, locked), (value, lock) in final.items():
+        assert value == scoring[marks + (rightmost == 10)]
+        assert lock == (1.0 if locked or rightmost == 10 else 0.0)
+
+    values = row_values(range(2, 13), scoring)
+    assert values[(10, 6, True)] == (scoring[7], 1.0)
+    assert values[(3, 2, True)] == (scoring[2], 1.0)
+    empty, empty_lock = values[(-1, 0, False)]
+    assert 0 < empty < scoring[12] and 0 < empty_lock < 1
+    # More marks in the same place are worth more
+    assert values[(5, 4, False)][0] > values[(5, 3, False)][0]
+
+def test_table_lookups(table, tmp_path):
+    scoring = Row.default_metric(11)
+    descending = row_values(range(12, 1, -1), scoring)
+    assert table.expected(2, 4, 3) == descending[(4, 3, False)][0]
+    assert table.lock_probability(3, -1, 0) == descending[(-1, 0, False)][1]
+    assert table.expected(0, -1, 0) == pytest.approx(table.expected(2, -1, 0))
+    assert table.expected(1, 4, 3, locked=True) == scoring[3]
+
+    for board_type in (Board, BitBoard):
+        board = board_type(set())
+        board.mark(0, 0)
+        board.mark(0, 2)
+        assert table.row_expected(board, 0) == table.expected(0, 2, 2)
+        assert table.mark_gain(board, 0, 3) == table.expected(0, 3, 3) - table.expected(0, 2, 2)
+
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"not a table" * 4)
+    with pytest.raises(ValueError):
+        RowTable(str(bad))
+
+def test_strategy_games(table):
+    strategy = RowTableStrategy(table)
+    for index in range(20):
+        game = QwixxSim(["one", "two"], [strategy, greedy_strategy], BitBoard,
+                        rng=game_rng(9, index))
+        result = game.play_game()
+        assert result.scores == [p.score() for p in game.players]
@@ -0,0 +1,83 @@
+import itertools
+import random
+import pytest
+from color import Color
+from layout import BoardLayout
+from solo_solver import SoloSolver
+
+# Two short rows, so the whole game solves in a moment
+LAYOUT = BoardLayout([Color.RED, Color.GREEN], [(5, 6, 7, 8, 9), (9, 8, 7, 6, 5)])
+
+def solver(**kwargs):
+    return SoloSolver(LAYOUT, lock_min=2, **kwargs)
+
+def test_finished_and_score():
+    s = solver()
+    assert s.start() == (-1, 0, -1, 0, 0)
+    assert not s.finished(s.start())
+    assert s.finished((-1, 0, -1, 0, 4))
+    assert s.finished((4, 3, 4, 2, 0))
+    assert not s.finished((4, 3, 3, 2, 0))
+    # Locked rows earn the bonus mark
+    assert s.score((4, 3, 2, 2, 1)) == LAYOUT.scoring[4] + LAYOUT.scoring[2] - 5
+    assert s.value((4, 3, 4, 2, 0)) == s.score((4, 3, 4, 2, 0))
+
+def test_policy_matches_value():
+    s = solver()
+    expected = s.solve()
+    rng = random.Random(4)
+    total, n_games = 0, 3000
+    for _ in range(n_games):
+        state = s.start()
+        while not s.finished(state):
+            w1, w2, red, green = [rng.randint(1, 6) for _ in range(4)]
+            options = s.options(w1 + w2, [[w1 + red, w2 + red], [w1 + green, w2 + green]])
+            value, white_move, color_move = s.best_moves(state, *options)
+            if white_move is None and color_move is None:
+                state = state[:-1] + (state[-1] + 1,)
+            for move in (white_move, color_move):
+                if move is not None:
+                    state = s.mark(state, *move)
+        total += s.score(state)
+    assert total / n_games == pytest.approx(expected, abs=0.6)
+
+def test_resume(tmp_path):
+    path = str(tmp_path / "memo")
+    layout = BoardLayout([Color.RED, Color.GREEN], [(6, 7, 8), (8, 7, 6)])
+    full = SoloSolver(layout, lock_min=1)
+    expected = full.solve()
+
+    with SoloSolver(layout, lock_min=1, path=path, max_entries=8) as partial:
+        partial.value((0, 1, -1, 0, 1))
+        assert partial.memo.spills > 0
+    with SoloSolver(layout, lock_min=1, path=path, max_entries=8) as resumed:
+        assert resumed.solve() == pytest.approx(expected)
+        assert 0 < resumed.solved < full.solved
+    with SoloSolver(layout, lock_min=1, path=path) as again:
+        assert again.solve() == pytest.approx(expected)
+        assert again.solved == 0
+        assert len(again.memo) == full.solved
+
+    with pytest.raises(ValueError):
+        SoloSolver(layout, lock_min=2, path=path)
+
+# A third row, so a white mark can end the game while a colored mark is still open
+LAYOUT3 = BoardLayout([Color.RED, Color.GREEN, Color.YELLOW],
+                      [(5, 6, 7, 8, 9), (9, 8, 7, 6, 5), (6, 7, 8)])
+
+def test_value_matches_every_roll():
+    s = SoloSolver(LAYOUT3, lock_min=2)
+    for state in [(4, 3, 2, 2, -1, 0, 1), (2, 2, 3, 2, 1, 2, 2), (-1, 0, 1, 1, 0, 1, 0)]:
+        expected = 0.0
+        for w1, w2, red, green, yellow in itertools.product(range(1, 7), repeat=5):
+            options = s.options(w1 + w2, [[w1 + die, w2 + die] for die in (red, green, yellow)])
+            expected += s.best_moves(state, *options)[0] / 6 ** 5
+        assert s.value(state) == pytest.approx(expected)
+
+def test_second_lock_ends_the_turn():
+    s = SoloSolver(LAYOUT3, lock_min=2)
+    # Red is locked and the white 5 can lock green, ending the game
+    state = (4, 3, 3, 2, -1, 0, 0)
+    value, white_move, color_move = s.best_moves(state, *s.options(5, [[], [], [6, 7]]))
+    assert white_move == (1, 4) and color_move is None
+    assert value == s.score(s.mark(state, 1, 4))
@@ -0,0 +1,44 @@
+import pytest
+from fractions import Fraction
+from board import BoardState
+from tournament import simulate
+from tournament import shards
+
+def test_shards():
+    assert shards(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert shards(0, 4) == []
+
+def test_simulate():
+    result = simulate(["greedy", "random"], 40, seed=3, processes=1)
+    assert result.games == 40
+    assert sum(result.wins) == pytest.approx(40)
+    assert sum(result.lengths.values()) == 40
+    assert result.endings[BoardState.CONTINUE] == 0
+    assert sum(result.endings.values()) == 40
+    assert all(sum(counts.values()) == 40 for counts in result.scores)
+
+def test_sharding_is_deterministic():
+    one = simulate(["greedy", "greedy"], 30, seed=8, processes=1, shard_size=30)
+    many = simulate(["greedy", "greedy"], 30, seed=8, processes=2, shard_size=7)
+    assert one.wins == many.wins
+    assert one.scores == many.scores
+    assert one.lengths == many.lengths
+    assert one.endings == many.endings
+
+def test_tied_wins_are_exact():
+    one = simulate(["greedy"] * 3, 60, seed=2, processes=1, shard_size=60)
+    many = simulate(["greedy"] * 3, 60, seed=2, processes=3, shard_size=7)
+    assert one.wins == many.wins
+    assert sum(one.wins) == 60
+    assert all(isinstance(win, Fraction) for win in one.wins)
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        simulate(["greedy", "nope"], 1, processes=1)
+
+def test_metrics_without_games():
+    result = simulate(["greedy", "greedy"], 0, processes=1, metrics=True)
+    assert result.metrics.games == 0
+    assert '"games": 0' in result.metrics.to_json()
+    assert "qwixx_games_total 0" in result.metrics.to_prometheus()
+    assert simulate(["greedy", "greedy"], 0, processes=1).metrics is None
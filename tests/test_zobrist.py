@@ -0,0 +1,148 @@
+import pytest
+import random
+from color import Color
+from board import Board
+from layout import standard_layout
+from row import Row
+from square import Square
+from bitboard import BitBoard
+from dice import game_rng
+from qwixx_sim import QwixxSim
+from strategies import greedy_strategy
+from zobrist import TranspositionTable
+from zobrist import game_hash
+
+def test_matches_board():
+    rng = random.Random(0)
+    seen = {}
+    for _ in range(20):
+        lc_board, lc_bits = set(), set()
+        board, bits = Board(lc_board), BitBoard(lc_bits)
+        assert board.zobrist_hash() == bits.zobrist_hash() == 0
+        for _ in range(60):
+            r, c = rng.randrange(4), rng.randrange(11)
+            board.mark(r, c)
+            bits.mark(r, c)
+            if rng.random() < 0.05:
+                board.add_penalty()
+                bits.add_penalty()
+            board.update_lock()
+            bits.update_lock()
+            assert board.zobrist_hash() == bits.zobrist_hash()
+            # Equal hashes mean equal positions
+            key = (board.encode(), frozenset(lc_board))
+            assert seen.setdefault(board.zobrist_hash(), key) == key
+
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_make_unmake_and_load(board_type):
+    rng = random.Random(1)
+    lc = set()
+    board = board_type(lc)
+    hashes = []
+    for _ in range(80):
+        hashes.append(board.zobrist_hash())
+        roll = rng.random()
+        if roll < 0.1:
+            board.make_penalty()
+        elif roll < 0.15:
+            board.make_lock(rng.choice([Color.RED, Color.YELLOW, Color.GREEN, Color.BLUE]))
+        elif not board.make_mark(rng.randrange(4), rng.randrange(11)):
+            hashes.pop()
+            continue
+        copy = board_type.decode(board.encode(), set(lc))
+        assert copy.zobrist_hash() == board.zobrist_hash()
+    while board.history:
+        board.unmake()
+        assert board.zobrist_hash() == hashes.pop()
+    assert board.zobrist_hash() == 0
+
+def test_board_from_squares():
+    layout = standard_layout()
+    lc = set()
+    rows = []
+    for row_index in range(layout.n_rows()):
+        squares = [Square(color, value) for color, value
+                   in zip(layout.square_colors[row_index], layout.values[row_index])]
+        squares[3].mark()
+        rows.append(Row(squares, lc, row_index))
+    # The same marks in different rows do not cancel out
+    assert len({row.zobrist for row in rows}) == len(rows)
+    # A row built on its own has no keys
+    assert Row(squares, lc).zobrist == 0
+    board = Board(lc)
+    for row_index in range(board.n_rows()):
+        board.mark(row_index, 3)
+    expected = board.zobrist_hash()
+    assert expected != 0
+    board.rows = rows
+    assert board.zobrist_hash() == expected
+
+def test_game_hash():
+    game = QwixxSim(["one", "two"], [greedy_strategy] * 2, BitBoard, rng=game_rng(4))
+    game.play_game()
+    h = game_hash(game)
+    copy = QwixxSim(["one", "two"], [greedy_strategy] * 2, Board)
+    copy.decode_state(game.encode_state())
+    assert game_hash(copy) == h
+    # Swapping the boards' seats changes the hash
+    first, second = copy.players
+    first.board, second.board = second.board, first.board
+    assert game_hash(copy) != h
+
+def test_lru_table():
+    table = TranspositionTable(capacity=2)
+    table.put(1, "a")
+    table.put(2, "b")
+    assert table.get(1) == "a"    # 2 is now the least recently used
+    table.put(3, "c")
+    assert table.get(2) is None
+    assert table.get(1) == "a" and table.get(3) == "c"
+    assert len(table) == 2
+    assert table.stats() == {"entries": 2, "capacity": 2, "hits": 3, "misses": 1,
+                             "hit_rate": 0.75, "evictions": 1, "rejected": 0}
+
+def test_depth_table():
+    table = TranspositionTable(capacity=4, policy="depth")
+    table.put(1, "deep", depth=3)
+    table.put(5, "shallow", depth=1)  # Same slot, shallower: refused
+    assert table.get(1) == "deep" and table.get(5) is None
+    assert table.get(1, depth=4) is None  # Not searched deep enough
+    table.put(5, "deeper", depth=3)
+    assert table.get(5) == "deeper" and table.get(1) is None
+    table.put(5, "shallower", depth=0)  # The same position, shallower: refused
+    assert table.get(5) == "deeper"
+    table.put(5, "update", depth=3)     # The same position, as deep: replaced
+    assert table.get(5, depth=3) == "update"
+    stats = table.stats()
+    assert (stats["rejected"], stats["evictions"], stats["entries"]) == (2, 1, 1)
+    table.clear()
+    assert len(table) == 0
+    with pytest.raises(ValueError):
+        TranspositionTable(policy="fifo")
+
+def test_search_reuses_positions():
+    # Counts the ways to mark the next square of the red or yellow row `depth` times.
+    # Marking red then yellow reaches the same position as yellow then red, so the
+    # table answers the second visit.
+    def count(board, depth, table):
+        if depth == 0:
+            return 1
+        key = board.zobrist_hash()
+        cached = table.get(key, depth)
+        if cached is not None:
+            return cached
+        total = 0
+        for row_index in (0, 1):
+            board.make_mark(row_index, board.last_marked(row_index) + 1)
+            total += count(board, depth - 1, table)
+            board.unmake()
+        table.put(key, total, depth)
+        return total
+
+    table = TranspositionTable()
+    board = BitBoard(set())
+    assert count(board, 6, table) == 2 ** 6
+    assert board.zobrist_hash() == 0
+    # Only positions with fewer than six marks are stored: 1 + 2 + ... + 6 of them
+    assert len(table) == 21
+    assert table.hits > 0 and table.misses == 21